@@ -0,0 +1,59 @@
+"""
+Live-draft board cost on the full synthetic players index: building the per-position heaps,
+then the per-pick update and recommendation for a 12-team, 16-round snake draft, compared
+with re-ranking the undrafted pool after every pick.
+
+    python -m benchmarks.draft [--teams 12] [--rounds 16]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from ff_agent.draft_agent import DraftBoard
+from ff_agent.lineup_optimizer import build_projection_lookup, score_player
+from ff_agent.player_index import PlayerIndex
+
+from .synthetic import DEFAULT_ROSTER_POSITIONS, make_players_index, make_projections
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--rounds", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    raw = make_players_index()
+    players = PlayerIndex.from_players(raw)
+    for label, proj_lookup in (("projections", build_projection_lookup(make_projections(raw, coverage=0.9))), ("heuristic", {})):
+        board = DraftBoard(players, proj_lookup, DEFAULT_ROSTER_POSITIONS)
+        pool = [pid for heap in board.heaps.values() for _, pid in heap]
+        rng = random.Random(5)
+        # Drafters mostly take the best available, sometimes reach
+        ranked = sorted(set(pool), key=lambda pid: -score_player(pid, players, proj_lookup).score)
+        order = []
+        for _ in range(args.teams * args.rounds):
+            order.append(ranked.pop(min(len(ranked) - 1, int(rng.expovariate(0.3)))))
+
+        updates, recommends = [], []
+        for i, pid in enumerate(order):
+            updates.append(board.apply_pick(pid, mine=i % args.teams == 0))
+            start = time.perf_counter()
+            board.recommend(8)
+            recommends.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        taken = set(order)
+        sorted((pid for pid in set(pool) if pid not in taken), key=lambda pid: -score_player(pid, players, proj_lookup).score)
+        rerank = time.perf_counter() - start
+        print(
+            f"{label:11s} board of {len(set(pool))} players built in {board.stats.build_sec * 1e3:.1f} ms; "
+            f"{len(order)} picks: update median {statistics.median(updates) * 1e6:.1f} us max {max(updates) * 1e6:.1f} us, "
+            f"recommend median {statistics.median(recommends) * 1e6:.1f} us; full re-rank {rerank * 1e3:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+End-to-end input-fetch latency of weekly-report, sequential (the old call order) versus the
+FetchPlan thread pool, against a local stub server that adds a fixed per-request delay.
+
+    python -m benchmarks.fetch_plan [--latency-ms 80] [--runs 5]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ff_agent.inputs import build_fetch_plan
+from ff_agent.sleeper_client import SleeperClient
+
+from .synthetic import make_players_index
+
+
+def _routes(num_players: int):
+    players = make_players_index(num_players)
+    pids = list(players)
+    return {
+        "/v1/user/bench": {"user_id": "u1", "username": "bench"},
+        "/v1/state/nfl": {"week": 5, "season": "2025"},
+        "/v1/league/L1": {"league_id": "L1", "name": "Bench League", "roster_positions": ["QB", "RB", "RB", "WR", "WR", "TE", "FLEX"]},
+        "/v1/league/L1/rosters": [{"roster_id": 1, "owner_id": "u1", "players": pids[:16]}],
+        "/v1/players/nfl": players,
+        "/v1/players/nfl/trending/add": [{"player_id": pid, "count": 100 - i} for i, pid in enumerate(pids[:50])],
+        "/projections/nfl/regular/2025/5": [{"player_id": pid, "pts_ppr": 10.0} for pid in pids[:500]],
+    }
+
+
+def start_stub_server(latency_sec: float, num_players: int):
+    bodies = {path: json.dumps(body).encode("utf-8") for path, body in _routes(num_players).items()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Buffer so headers and body go out in one segment (avoids Nagle/delayed-ACK stalls)
+        wbufsize = -1
+
+        def do_GET(self):
+            time.sleep(latency_sec)
+            body = bodies.get(self.path.split("?", 1)[0])
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    server = start_stub_server(args.latency_ms / 1000.0, args.players)
+    client = SleeperClient(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        for label, workers in (("sequential", 1), ("fetch plan", 8)):
+            samples = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                build_fetch_plan(client, "bench", "L1", season=2025, trending=(48, 50), max_workers=workers).run()
+                samples.append(time.perf_counter() - start)
+            print(f"{label:>10}: median {statistics.median(samples) * 1000:7.1f} ms  min {min(samples) * 1000:7.1f} ms")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
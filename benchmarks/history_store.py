@@ -0,0 +1,80 @@
+"""
+Local history store: bulk write of a synthetic season (transactions and matchups for
+every week of several 12-team leagues) and the latency of the history queries.
+
+    python -m benchmarks.history_store [--leagues 20]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from ff_agent.history_store import HistoryStore
+
+from .synthetic import make_matchups, make_players_index, make_rosters
+
+
+class SyntheticClient:
+    def __init__(self, players, seed: int = 7):
+        self.rng = random.Random(seed)
+        self.pids = sorted(players)
+        self.rosters = make_rosters(players, num_rosters=12, seed=seed)
+
+    def get_transactions(self, league_id, week):
+        return [
+            {
+                "transaction_id": f"{league_id}-{week}-{i}",
+                "type": "free_agent",
+                "status": "complete",
+                "created": week * 1000 + i,
+                "roster_ids": [i % 12 + 1],
+                "adds": {self.rng.choice(self.pids): i % 12 + 1},
+                "drops": {self.rng.choice(self.pids): i % 12 + 1},
+            }
+            for i in range(25)
+        ]
+
+    def get_matchups(self, league_id, week):
+        rows = make_matchups(self.rosters, week=week)
+        for row in rows:
+            row["players_points"] = {pid: round(self.rng.uniform(0, 30), 2) for pid in row["players"]}
+            row["points"] = sum(row["players_points"][pid] for pid in row["starters"])
+        return rows
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leagues", type=int, default=20)
+    parser.add_argument("--weeks", type=int, default=17)
+    args = parser.parse_args(argv)
+
+    client = SyntheticClient(make_players_index())
+    with tempfile.TemporaryDirectory() as tmp, HistoryStore(Path(tmp) / "history.sqlite3") as store:
+        rows = write = 0.0
+        for i in range(args.leagues):
+            result = store.sync(client, f"L{i}", range(1, args.weeks + 1), current_week=args.weeks + 1, max_workers=1)
+            rows += result.rows
+            write += result.write_sec
+        print(f"{args.leagues} leagues x {args.weeks} weeks: {rows:.0f} rows written in {write * 1e3:.0f} ms")
+
+        start = time.perf_counter()
+        again = store.sync(client, "L0", range(1, args.weeks + 1), current_week=args.weeks + 1)
+        print(f"re-sync of a finished season: {len(again.fetched)} fetches, {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+        pid = client.pids[len(client.pids) // 2]
+        for name, query in (
+            ("player_transactions", lambda: store.player_transactions(pid, action="add")),
+            ("points_by_roster", lambda: store.points_by_roster("L3")),
+            ("player_points", lambda: store.player_points(client.rosters[0]["players"][0])),
+        ):
+            start = time.perf_counter()
+            for _ in range(100):
+                query()
+            print(f"{name:<20} {(time.perf_counter() - start) * 10:.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-roster time of the exact LineupSolver versus the previous greedy slot-order fill,
+and how often the greedy lineup was suboptimal.
+
+    python -m benchmarks.lineup_solver [--rosters 200]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+from ff_agent.lineup_optimizer import PlayerChoice, build_projection_lookup, get_solver, score_player
+from ff_agent.player_index import PlayerIndex
+
+from .synthetic import DEFAULT_ROSTER_POSITIONS, make_players_index, make_projections, make_rosters
+
+
+def greedy_lineup(candidates: List[PlayerChoice], roster_positions: List[str]) -> Dict[str, str]:
+    """
+    The pre-solver algorithm: fill slots in order from per-primary-position buckets.
+    """
+    buckets: Dict[str, List[PlayerChoice]] = {}
+    for pc in candidates:
+        buckets.setdefault(pc.position, []).append(pc)
+        if pc.position in {"RB", "WR", "TE"}:
+            buckets.setdefault("FLEX", []).append(pc)
+    for plist in buckets.values():
+        plist.sort(key=lambda x: x.score, reverse=True)
+    taken: set = set()
+    starters: Dict[str, str] = {}
+    for idx, slot in enumerate(roster_positions):
+        choice = next((pc for pc in buckets.get(slot, []) if pc.player_id not in taken), None)
+        starters[str(idx)] = choice.player_id if choice else ""
+        if choice:
+            taken.add(choice.player_id)
+    return starters
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rosters", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    raw = make_players_index()
+    players = PlayerIndex.from_players(raw)
+    proj_lookup = build_projection_lookup(make_projections(raw))
+    rosters = make_rosters(raw, num_rosters=min(args.rosters, 120))
+    rosters = (rosters * (args.rosters // len(rosters) + 1))[: args.rosters]
+    scored = [[score_player(pid, players, proj_lookup) for pid in r["players"]] for r in rosters]
+    solver = get_solver(tuple(DEFAULT_ROSTER_POSITIONS))
+
+    def points(starters: Dict[str, str], candidates: List[PlayerChoice]) -> float:
+        by_id = {pc.player_id: pc.score for pc in candidates}
+        return sum(by_id[pid] for pid in starters.values() if pid)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        greedy = [greedy_lineup(c, DEFAULT_ROSTER_POSITIONS) for c in scored]
+    greedy_sec = (time.perf_counter() - start) / (args.repeat * len(scored))
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        exact = [solver.solve(c)[0] for c in scored]
+    exact_sec = (time.perf_counter() - start) / (args.repeat * len(scored))
+
+    worse = [points(e, c) - points(g, c) for g, e, c in zip(greedy, exact, scored)]
+    improved = [w for w in worse if w > 1e-9]
+    print(f"slots: {' '.join(DEFAULT_ROSTER_POSITIONS)}")
+    print(f"greedy: {greedy_sec * 1e6:7.1f} us/roster")
+    print(f"exact:  {exact_sec * 1e6:7.1f} us/roster")
+    print(f"exact lineup better on {len(improved)}/{len(scored)} rosters (mean +{sum(improved) / max(len(improved), 1):.2f} pts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Offline load and latency test: replays a fixture archive from a local stand-in server
+(with latency, jitter, injected 5xx and 429 throttling) and drives both the SleeperClient
+from concurrent threads and whole CLI commands as concurrent processes.
+
+    python -m benchmarks.load [--archive fixtures.zip] [--threads 16] [--requests 50]
+                              [--latency-ms 40] [--jitter-ms 40] [--error-rate 0.01] [--rate 200]
+                              [--cli-runs 12] [--cli-concurrency 4] [--memo] [--client-rate 0]
+
+Without --archive a synthetic league is served. Record a real archive with
+    python -m ff_agent.cli --record fixtures.zip weekly-report --refresh-players
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Tuple
+from urllib.error import HTTPError
+
+from ff_agent.fixtures import FixtureArchive, ReplayServer
+from ff_agent.sleeper_client import SleeperClient
+
+from .synthetic import DEFAULT_ROSTER_POSITIONS, make_matchups, make_players_index, make_projections, make_rosters, make_trending
+
+SEASON = 2025
+WEEK = 5
+LEAGUE_ID = "L1"
+USERNAME = "loaduser"
+
+
+def synthetic_archive() -> FixtureArchive:
+    players = make_players_index()
+    rosters = make_rosters(players, num_rosters=12)
+    archive = FixtureArchive()
+    archive.add_json(f"/v1/user/{USERNAME}", {"user_id": "user1", "username": USERNAME})
+    archive.add_json("/v1/state/nfl", {"week": WEEK, "season": str(SEASON), "season_type": "regular"})
+    archive.add_json(f"/v1/user/user1/leagues/nfl/{SEASON}", [{"league_id": LEAGUE_ID, "name": "Load", "status": "in_season", "total_rosters": 12}])
+    archive.add_json(f"/v1/league/{LEAGUE_ID}", {"league_id": LEAGUE_ID, "name": "Load", "roster_positions": DEFAULT_ROSTER_POSITIONS})
+    archive.add_json(f"/v1/league/{LEAGUE_ID}/rosters", rosters)
+    archive.add_json(f"/v1/league/{LEAGUE_ID}/users", [{"user_id": r["owner_id"]} for r in rosters])
+    archive.add_json("/v1/players/nfl", players)
+    archive.add_json("/v1/players/nfl/trending/add", make_trending(players, limit=200))
+    for week in range(1, 19):
+        archive.add_json(f"/v1/league/{LEAGUE_ID}/matchups/{week}", make_matchups(rosters, week=week))
+        archive.add_json(f"/projections/nfl/regular/{SEASON}/{week}", make_projections(players, seed=week))
+    return archive
+
+
+def percentiles(samples: List[float]) -> Tuple[float, float, float]:
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return value, value, value
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return q[49], q[94], q[98]
+
+
+def report(label: str, samples: List[float], elapsed: float, errors: int) -> None:
+    p50, p95, p99 = percentiles(samples)
+    rate = len(samples) / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"{label:<22} n={len(samples):<5} p50 {p50 * 1e3:8.1f} ms  p95 {p95 * 1e3:8.1f} ms  p99 {p99 * 1e3:8.1f} ms  "
+        f"{rate:8.1f}/sec  errors={errors}"
+    )
+
+
+def client_load(
+    base_url: str, threads: int, requests: int, seed: int = 0, memo: bool = False, client_rate: float = 0.0
+) -> None:
+    # Memo off by default so every call reaches the stand-in; identical in-flight calls still coalesce
+    client = SleeperClient(
+        base_url=base_url, memo_ttls=None if memo else {}, rate_limit_per_sec=client_rate or None
+    )
+    calls: List[Callable[[], object]] = [
+        lambda: client.get_state("nfl"),
+        lambda: client.get_league(LEAGUE_ID),
+        lambda: client.get_rosters(LEAGUE_ID),
+        lambda: client.get_matchups(LEAGUE_ID, WEEK),
+        lambda: client.get_trending_players("nfl", limit=200),
+        lambda: client.get_projections(SEASON, WEEK),
+    ]
+    samples: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(i: int) -> None:
+        rng = random.Random(seed + i)
+        for _ in range(requests):
+            start = time.perf_counter()
+            try:
+                rng.choice(calls)()
+            except (HTTPError, OSError):
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    report(f"client x{threads} threads", samples, time.perf_counter() - start, errors[0])
+    stats = client.stats
+    shared = client.request_stats
+    print(
+        f"{'':<22} requests={stats.requests} retries={stats.retries} connections opened={stats.connections_opened} "
+        f"reused={stats.connections_reused} coalesced={shared.coalesced} memoized={shared.memoized} "
+        f"throttled={shared.throttled} ({shared.throttle_sec:.2f}s queued)"
+    )
+    client.close()
+
+
+def cli_load(base_url: str, runs: int, concurrency: int) -> None:
+    commands = [
+        ["recommend-lineup", "--week", str(WEEK)],
+        ["waivers"],
+        ["weekly-report", "--week", str(WEEK)],
+        ["simulate-matchup", "--week", str(WEEK), "--sims", "20000"],
+    ]
+    with tempfile.TemporaryDirectory() as home:
+        config = {"username": USERNAME, "season": SEASON, "league_id": LEAGUE_ID, "api_base_url": base_url}
+        (Path(home) / ".ff_agent").mkdir()
+        (Path(home) / ".ff_agent" / "config.json").write_text(json.dumps(config), encoding="utf-8")
+        env = {**os.environ, "HOME": home}
+        # Warm the players cache once so runs measure the steady state
+        subprocess.run([sys.executable, "-m", "ff_agent.cli", "waivers"], env=env, capture_output=True, check=True)
+
+        for command in commands:
+            samples: List[float] = []
+            errors = [0]
+            lock = threading.Lock()
+
+            def run(_: int) -> None:
+                start = time.perf_counter()
+                proc = subprocess.run([sys.executable, "-m", "ff_agent.cli", *command], env=env, capture_output=True)
+                with lock:
+                    if proc.returncode:
+                        errors[0] += 1
+                    else:
+                        samples.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(run, range(runs)))
+            report(f"cli {command[0]}", samples, time.perf_counter() - start, errors[0])
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archive", type=Path)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per client thread")
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--rate", type=float, default=200.0, help="Stand-in rate limit (requests/sec); 0 disables")
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--memo", action="store_true", help="Enable the client's per-endpoint response memo")
+    parser.add_argument("--client-rate", type=float, default=0.0, help="Client-side rate limit (requests/sec); 0 disables")
+    parser.add_argument("--cli-runs", type=int, default=12)
+    parser.add_argument("--cli-concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    archive = FixtureArchive.load(args.archive) if args.archive else synthetic_archive()
+    server = ReplayServer(
+        archive,
+        latency_sec=args.latency_ms / 1000.0,
+        jitter_sec=args.jitter_ms / 1000.0,
+        error_rate=args.error_rate,
+        rate_per_sec=args.rate or None,
+        burst=args.burst,
+    )
+    with server:
+        print(f"Replaying {len(archive)} fixtures at {server.url}")
+        client_load(server.url, args.threads, args.requests, memo=args.memo, client_rate=args.client_rate)
+        if args.cli_runs:
+            if args.archive:
+                print("CLI load uses the synthetic league; skipped for a recorded archive")
+            else:
+                cli_load(server.url, args.cli_runs, args.cli_concurrency)
+        stats = server.stats_dict()
+    print(
+        f"server: {stats['requests']} requests, {stats['throttled']} throttled, {stats['injected_errors']} injected errors, "
+        f"{stats['not_modified']} not modified, {stats['bytes_sent'] / 1e6:.1f} MB sent"
+    )
+
+
+if __name__ == "__main__":
+    main()
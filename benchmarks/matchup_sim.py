@@ -0,0 +1,50 @@
+"""
+Monte Carlo matchup simulation throughput: one 12-team league week at the default
+100k simulations, and a larger run across worker processes.
+
+    python -m benchmarks.matchup_sim [--sims 100000] [--big-sims 4000000] [--processes 1 2 4]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from ff_agent.lineup_optimizer import build_projection_lookup
+from ff_agent.matchup_sim import simulate_week
+from ff_agent.player_index import PlayerIndex
+
+from .synthetic import make_matchups, make_players_index, make_projections, make_rosters
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sims", type=int, default=100_000)
+    parser.add_argument("--big-sims", type=int, default=4_000_000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(argv)
+
+    raw = make_players_index()
+    players = PlayerIndex.from_players(raw)
+    proj_lookup = build_projection_lookup(make_projections(raw, coverage=0.9))
+    matchups = make_matchups(make_rosters(raw, num_rosters=12))
+
+    best = float("inf")
+    for _ in range(5):
+        week = simulate_week(matchups, players, proj_lookup, sims=args.sims)
+        best = min(best, week.elapsed_sec)
+    print(f"12-team week, {len(week.results)} matchups x {args.sims} sims: {best * 1e3:.1f} ms")
+    for r in week.results:
+        print(
+            f"  {r.team_a.roster_id:>2} vs {r.team_b.roster_id:>2}: {r.win_prob_a:6.1%}  "
+            f"{r.team_a.mean:6.1f}±{r.team_a.sd:4.1f} vs {r.team_b.mean:6.1f}±{r.team_b.sd:4.1f}"
+        )
+
+    for processes in args.processes:
+        start = time.perf_counter()
+        simulate_week(matchups, players, proj_lookup, sims=args.big_sims, processes=processes)
+        elapsed = time.perf_counter() - start
+        print(f"{args.big_sims} sims, {processes} process(es): {elapsed:.2f}s ({args.big_sims / elapsed:,.0f} sims/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compares resident memory and lookup time of the raw players dict against PlayerIndex.
+
+    python -m benchmarks.player_index [--players 11000]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from ff_agent.player_index import PlayerIndex
+
+from .synthetic import make_players_index
+
+
+def _retained_bytes(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, peak
+
+
+def _dict_primary(players, pid):
+    pdata = players.get(pid) or {}
+    pos_list = pdata.get("fantasy_positions") or ([pdata.get("position")] if pdata.get("position") else [])
+    return pos_list[0] if pos_list else None
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, default=11000)
+    parser.add_argument("--lookups", type=int, default=500_000)
+    args = parser.parse_args(argv)
+
+    payload = json.dumps(make_players_index(args.players)).encode("utf-8")
+    players, dict_bytes, _ = _retained_bytes(lambda: json.loads(payload))
+    # Build from a fresh parse so the retained figure includes the index's own id strings
+    index, index_bytes, _ = _retained_bytes(lambda: PlayerIndex.from_players(json.loads(payload)))
+
+    rng = random.Random(1)
+    pids = [rng.choice(index.ids) for _ in range(args.lookups)]
+
+    start = time.perf_counter()
+    for pid in pids:
+        _dict_primary(players, pid)
+    dict_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    primary = index.primary_position
+    for pid in pids:
+        primary(pid)
+    index_sec = time.perf_counter() - start
+
+    print(f"players: {len(index)}  payload: {len(payload) / 1e6:.1f} MB")
+    print(f"dict-of-dicts retained: {dict_bytes / 1e6:8.2f} MB")
+    print(f"PlayerIndex retained:   {index_bytes / 1e6:8.2f} MB  ({dict_bytes / max(index_bytes, 1):.1f}x smaller)")
+    print(f"primary position lookup: dict {dict_sec / args.lookups * 1e9:6.0f} ns  index {index_sec / args.lookups * 1e9:6.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Peak RSS and wall time of building the players index from a recorded /players/nfl payload,
+full json.loads versus the streaming field-projecting parser. Each mode runs in a fresh
+interpreter so peak RSS is not shared.
+
+    python -m benchmarks.players_stream [--payload players_nfl.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ff_agent.json_stream import iter_projected_records
+from ff_agent.player_index import PLAYER_FIELDS, PlayerIndex
+
+from .synthetic import make_players_index
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM is reset on exec; ru_maxrss can carry over the parent's peak from fork
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _run_mode(mode: str, payload: Path) -> None:
+    start = time.perf_counter()
+    with payload.open("rb") as fp:
+        if mode == "json":
+            # What get_all_players + PlayerIndex.from_players does: bytes -> str -> full object graph
+            index = PlayerIndex.from_players(json.loads(fp.read().decode("utf-8")))
+        else:
+            index = PlayerIndex.from_records(iter_projected_records(fp, PLAYER_FIELDS))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"mode": mode, "players": len(index), "sec": elapsed, "peak_rss_mb": _peak_rss_mb()}))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payload", type=Path, help="Recorded /players/nfl response body (default: synthetic)")
+    parser.add_argument("--players", type=int, default=11000)
+    parser.add_argument("--mode", choices=["json", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        _run_mode(args.mode, args.payload)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        payload = args.payload
+        if payload is None:
+            payload = Path(tmp) / "players_nfl.json"
+            payload.write_text(json.dumps(make_players_index(args.players)), encoding="utf-8")
+        print(f"payload: {payload.stat().st_size / 1e6:.1f} MB")
+        # Baseline interpreter + imports, for reference
+        baseline = subprocess.run(
+            [sys.executable, "-c", "from benchmarks.players_stream import _peak_rss_mb; print(_peak_rss_mb())"],
+            capture_output=True, text=True, check=True,
+        )
+        print(f"interpreter baseline: {float(baseline.stdout):.1f} MB")
+        for mode in ("json", "stream"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.players_stream", "--mode", mode, "--payload", str(payload)],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(out.stdout)
+            print(f"{mode:>6}: {result['players']} players  {result['sec']:.2f}s  peak RSS {result['peak_rss_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Historical points store: backfill of several synthetic seasons of a league's matchups into
+week columns, then the per-player aggregates (mean, spread, floor/ceiling, trend) over all
+of them.
+
+    python -m benchmarks.points_store [--seasons 3] [--teams 12]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from ff_agent.points_store import PointsStore
+
+from .synthetic import make_matchups, make_players_index, make_rosters
+
+
+class SyntheticClient:
+    def __init__(self, players, seasons: int, teams: int, weeks: int, seed: int = 7):
+        self.rng = random.Random(seed)
+        self.leagues = {}
+        self.rosters = {}
+        for i in range(seasons):
+            season = 2025 - i
+            lid = f"L{season}"
+            prev = f"L{season - 1}" if i + 1 < seasons else None
+            self.leagues[lid] = {"league_id": lid, "season": str(season), "previous_league_id": prev, "settings": {"last_scored_leg": weeks}}
+            self.rosters[lid] = make_rosters(players, num_rosters=teams, seed=seed + i)
+
+    def get_league(self, league_id):
+        return self.leagues.get(league_id)
+
+    def get_matchups(self, league_id, week):
+        rows = make_matchups(self.rosters[league_id], week=week)
+        for row in rows:
+            row["players_points"] = {pid: round(self.rng.uniform(0, 30), 2) for pid in row["players"]}
+        return rows
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--weeks", type=int, default=17)
+    args = parser.parse_args(argv)
+
+    client = SyntheticClient(make_players_index(), args.seasons, args.teams, args.weeks)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PointsStore("L2025", root=Path(tmp))
+        result = store.backfill(client, seasons=args.seasons, current=(2026, 1), max_workers=1)
+        print(
+            f"backfill: {len(result.fetched)} weeks, {result.rows} player-weeks written in {result.write_sec * 1e3:.1f} ms "
+            f"({result.rows / result.write_sec:,.0f}/sec)"
+        )
+
+        start = time.perf_counter()
+        again = store.backfill(client, seasons=args.seasons, current=(2026, 1))
+        print(f"re-backfill of final weeks: {len(again.fetched)} fetches, {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+        fresh = PointsStore("L2025", root=Path(tmp))
+        start = time.perf_counter()
+        summaries = fresh.aggregates()
+        elapsed = time.perf_counter() - start
+        print(
+            f"aggregates: {len(summaries)} players x {len(fresh.keys())} weeks in {elapsed * 1e3:.1f} ms "
+            f"({result.rows / elapsed:,.0f} player-weeks/sec)"
+        )
+
+
+if __name__ == "__main__":
+    main()
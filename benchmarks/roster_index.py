@@ -0,0 +1,78 @@
+"""
+Cross-league injury alerts: building the player -> roster index over many synthetic
+12-team leagues, re-applying roster payloads where a few rosters changed, and diffing two
+players-index snapshots plus the roster lookups for the changed players.
+
+    python -m benchmarks.roster_index [--leagues 300] [--flips 100]
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import time
+
+from ff_agent.player_index import PlayerIndex
+from ff_agent.roster_index import RosterIndex
+
+from .synthetic import make_players_index, make_rosters
+
+STATUSES = (None, "Questionable", "Doubtful", "Out", "IR")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leagues", type=int, default=300)
+    parser.add_argument("--flips", type=int, default=100, help="Players whose injury status changes")
+    parser.add_argument("--changed", type=float, default=0.05, help="Share of rosters changed between polls")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(3)
+    raw = make_players_index()
+    leagues = {f"L{i}": make_rosters(raw, num_rosters=12, seed=i) for i in range(args.leagues)}
+
+    index = RosterIndex()
+    start = time.perf_counter()
+    for lid, rosters in leagues.items():
+        index.update_league(lid, rosters)
+    build = time.perf_counter() - start
+
+    # Next poll: a few rosters swap a bench player for another or change a starter
+    pids = list(raw)
+    changed = 0
+    for rosters in leagues.values():
+        for roster in rosters:
+            if rng.random() < args.changed:
+                roster["players"] = roster["players"][:-1] + [rng.choice(pids)]
+                roster["starters"] = roster["players"][1:11]
+                changed += 1
+    start = time.perf_counter()
+    touched = sum(index.update_league(lid, rosters) for lid, rosters in leagues.items())
+    update = time.perf_counter() - start
+    print(
+        f"{index.roster_count} rosters, {len(index)} players: build {build * 1e3:.1f} ms, "
+        f"re-poll with {changed} changed rosters {update * 1e3:.2f} ms ({touched} entries touched)"
+    )
+
+    after_raw = copy.deepcopy(raw)
+    for pid in rng.sample(pids, args.flips):
+        after_raw[pid]["injury_status"] = rng.choice([s for s in STATUSES if s != raw[pid].get("injury_status")])
+    before, after = PlayerIndex.from_players(raw), PlayerIndex.from_players(after_raw)
+    samples = []
+    for _ in range(20):
+        scan = index.injury_alerts(before, after)
+        samples.append(scan)
+    best = min(samples, key=lambda s: s.diff_sec + s.lookup_sec)
+    fan_out = sum(len(a.rosters) for a in best.alerts)
+    print(
+        f"{best.changed_players} status changes over {len(after)} players -> {len(best.alerts)} alerts, {fan_out} roster notices: "
+        f"diff {best.diff_sec * 1e3:.2f} ms, lookup {best.lookup_sec * 1e3:.3f} ms"
+    )
+    unchanged = PlayerIndex.from_players(raw)
+    start = time.perf_counter()
+    unchanged.injury_changes(before)
+    print(f"diff of identical snapshots {(time.perf_counter() - start) * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
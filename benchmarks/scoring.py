@@ -0,0 +1,87 @@
+"""
+League scoring engine: compiling scoring_settings, scoring a full synthetic projections
+payload from raw stats, and scoring the stored stats matrix of a week versus reading the
+standard points column.
+
+    python -m benchmarks.scoring [--coverage 0.5]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from ff_agent.player_index import PlayerIndex
+from ff_agent.projection_store import ProjectionStore
+from ff_agent.scoring import _compile, compile_scoring
+
+from .synthetic import make_players_index, make_projections
+
+# A custom league: 6-point passing TDs, TE premium, fumble, first-down and yardage-bonus scoring
+SETTINGS = {
+    "pass_yd": 0.04, "pass_td": 6, "pass_int": -2, "pass_2pt": 2, "rush_yd": 0.1, "rush_td": 6, "rush_fd": 0.5,
+    "rec": 1, "rec_yd": 0.1, "rec_td": 6, "rec_fd": 0.5, "bonus_rec_te": 0.5, "fum_lost": -2, "xpm": 1,
+    "fgm_0_19": 3, "fgm_20_29": 3, "fgm_30_39": 3, "fgm_40_49": 4, "fgm_50p": 5, "fgmiss": -1,
+    "bonus_pass_yd_300": 3, "bonus_rush_yd_100": 3, "bonus_rec_yd_100": 3,
+}
+STAT_KEYS = [k for k in SETTINGS if not k.startswith("bonus")] + ["pass_att", "pass_cmp", "rush_att", "rec_tgt", "gp"]
+
+
+def _median_ms(fn, runs: int = 9) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(samples)
+
+
+class SyntheticClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.projections_url_variant = None
+
+    def get_projections(self, season, week, season_type="regular"):
+        return self.rows
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--coverage", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    raw = make_players_index()
+    players = PlayerIndex.from_players(raw)
+    rng = random.Random(11)
+    rows = []
+    for row in make_projections(raw, coverage=args.coverage):
+        stats = {key: round(rng.uniform(0, 5), 2) for key in rng.sample(STAT_KEYS, 15)}
+        stats["pts_ppr"] = row["pts_ppr"]
+        rows.append({"player_id": row["player_id"], "stats": stats})
+
+    def cold_compile():
+        _compile.cache_clear()
+        compile_scoring(SETTINGS)
+
+    scoring = compile_scoring(SETTINGS)
+    print(f"compile scoring_settings: cold {_median_ms(cold_compile):.3f} ms, cached {_median_ms(lambda: compile_scoring(SETTINGS)):.4f} ms")
+    print(f"score_rows, {len(rows)} raw rows: {_median_ms(lambda: scoring.score_rows(rows, players)):.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ProjectionStore(SyntheticClient(rows), 2025, root=Path(tmp))
+        start = time.perf_counter()
+        store.fetch_week(1)
+        print(f"store week (points column + stats matrix): {(time.perf_counter() - start) * 1e3:.1f} ms")
+        column = store.columns.column(1)
+        matrix = store.columns.stats(1)
+        print(
+            f"score_matrix, {matrix.rows} x {matrix.width}: {_median_ms(lambda: scoring.score_matrix(matrix, players)):.1f} ms  "
+            f"(standard column as dict {_median_ms(lambda: dict(column)):.1f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Rest-of-season playoff-odds simulation throughput versus worker count on a synthetic
+12-team league with 10 weeks left.
+
+    python -m benchmarks.season_sim [--sims 20000] [--processes 1 2 4]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+
+from ff_agent.lineup_optimizer import build_projection_lookup
+from ff_agent.player_index import PlayerIndex
+from ff_agent.season_sim import build_season_model, simulate_season
+
+from .synthetic import DEFAULT_ROSTER_POSITIONS, make_matchups, make_players_index, make_projections, make_rosters
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sims", type=int, default=20_000)
+    parser.add_argument("--weeks", type=int, default=10)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(argv)
+
+    raw = make_players_index()
+    players = PlayerIndex.from_players(raw)
+    rosters = make_rosters(raw, num_rosters=12)
+    for r in rosters:
+        r["settings"] = {"wins": r["roster_id"] % 5, "losses": 4 - r["roster_id"] % 5, "fpts": 400 + r["roster_id"] * 7}
+    first = 15 - args.weeks
+    weekly_matchups = {w: make_matchups(rosters, week=w) for w in range(first, 15)}
+    weekly_projections = {
+        w: build_projection_lookup(make_projections(raw, seed=w, coverage=0.9)) for w in weekly_matchups
+    }
+    model = build_season_model(rosters, weekly_matchups, weekly_projections, players, DEFAULT_ROSTER_POSITIONS)
+
+    print(f"12 teams, {args.weeks} weeks left, {args.sims} sims, {os.cpu_count()} CPU(s)")
+    baseline = None
+    for processes in args.processes:
+        odds = simulate_season(model, playoff_teams=6, byes=2, sims=args.sims, processes=processes)
+        baseline = baseline or odds.sims_per_sec
+        print(f"  {processes} worker(s): {odds.elapsed_sec:.2f}s  {odds.sims_per_sec:,.0f} sims/sec  ({odds.sims_per_sec / baseline:.2f}x)")
+    for t in odds.teams:
+        print(f"  roster {t.roster_id:>2}: playoffs {t.playoff_prob:6.1%}  bye {t.bye_prob:6.1%}  wins {t.projected_wins:.1f}")
+
+
+if __name__ == "__main__":
+    main()
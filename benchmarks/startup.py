@@ -0,0 +1,63 @@
+"""
+CLI startup cost: wall time of a fresh interpreter importing ff_agent.cli, and the time to
+get a players index from the cache as JSON (parse + build) versus the binary snapshot.
+
+    python -m benchmarks.startup [--players 11000] [--runs 7]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ff_agent.player_index import PLAYER_FIELDS, PlayerIndex
+
+from .synthetic import make_players_index
+
+
+def _median_ms(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(samples)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, default=11000)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    def spawn(code: str) -> None:
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    bare = _median_ms(lambda: spawn("pass"), args.runs)
+    cli = _median_ms(lambda: spawn("import ff_agent.cli"), args.runs)
+    print(f"interpreter alone        {bare:8.1f} ms")
+    print(f"import ff_agent.cli      {cli:8.1f} ms  (+{cli - bare:.1f} ms)")
+
+    records = {pid: {k: v for k, v in p.items() if k in PLAYER_FIELDS} for pid, p in make_players_index(args.players).items()}
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "records.json"
+        json_path.write_bytes(json.dumps(records, separators=(",", ":")).encode("utf-8"))
+        snapshot_path = Path(tmp) / "records.index.bin"
+        PlayerIndex.from_players(records).save_snapshot(snapshot_path, source="bench")
+
+        from_json = _median_ms(lambda: PlayerIndex.from_players(json.loads(json_path.read_bytes())), args.runs)
+        from_snapshot = _median_ms(lambda: PlayerIndex.load_snapshot(snapshot_path, source="bench"), args.runs)
+        print(
+            f"players index, {args.players} players: json {from_json:.1f} ms ({json_path.stat().st_size / 1e6:.1f} MB)  "
+            f"snapshot {from_snapshot:.1f} ms ({snapshot_path.stat().st_size / 1e6:.2f} MB)  "
+            f"speedup {from_json / from_snapshot:.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
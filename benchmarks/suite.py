@@ -0,0 +1,183 @@
+"""
+Benchmark suite for the agent hot paths on a deterministic synthetic league.
+
+    python -m benchmarks.suite                                   # run and print
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json --threshold 0.25
+
+With --compare the exit status is 1 when any case is slower than baseline * (1 + threshold).
+Baselines are machine-specific; record them on the machine that runs the comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from ff_agent.lineup_optimizer import build_projection_lookup, optimize_league_lineups, optimize_lineup
+from ff_agent.trade_agent import suggest_trade_targets
+from ff_agent.waiver_agent import compute_roster_needs, rank_free_agents, rostered_player_ids, suggest_trending_adds
+
+from .synthetic import SyntheticDataset, make_dataset
+
+
+SCALES = {
+    "small": {"num_rosters": 12},
+    "medium": {"num_rosters": 240},
+    "large": {"num_rosters": 2400},
+}
+
+
+def build_cases(data: SyntheticDataset) -> Dict[str, Tuple[Callable[[], object], int]]:
+    """
+    Returns case name -> (callable, units of work per call). Time is reported per unit.
+    """
+    proj_lookup = build_projection_lookup(data.projections)
+    rosters = data.rosters
+    roster_ids = [[str(pid) for pid in r["players"]] for r in rosters]
+    needs = [compute_roster_needs(data.roster_positions, pids, data.players) for pids in roster_ids]
+    league_rosters = [
+        ({r["roster_id"]: [str(pid) for pid in r["players"]] for r in league}, league) for league in data.leagues.values()
+    ]
+
+    def run_optimize() -> None:
+        for pids in roster_ids:
+            optimize_lineup(pids, data.roster_positions, data.players, proj_lookup=proj_lookup)
+
+    leagues = [(lid, data.roster_positions, league) for lid, league in data.leagues.items()]
+
+    def run_league_lineups() -> None:
+        optimize_league_lineups(leagues, data.players, proj_lookup)
+
+    def run_needs() -> None:
+        for pids in roster_ids:
+            compute_roster_needs(data.roster_positions, pids, data.players)
+
+    def run_trending() -> None:
+        for roster_needs in needs:
+            suggest_trending_adds(data.trending, data.players, roster_needs)
+
+    first_league = next(iter(data.leagues.values()))
+    league_rostered = rostered_player_ids(first_league)
+
+    def run_free_agents() -> None:
+        # One full-pool ranking for the first league's first roster
+        mine = [str(pid) for pid in first_league[0]["players"]]
+        rank_free_agents(mine, data.roster_positions, league_rostered, data.players, proj_lookup, len(first_league))
+
+    def run_trades() -> None:
+        i = 0
+        for all_team_rosters, league in league_rosters:
+            for roster in league:
+                suggest_trade_targets(needs[i], all_team_rosters, roster["roster_id"], data.players)
+                i += 1
+
+    return {
+        "build_projection_lookup": (lambda: build_projection_lookup(data.projections), len(data.projections)),
+        "optimize_lineup": (run_optimize, len(rosters)),
+        "optimize_league_lineups": (run_league_lineups, len(rosters)),
+        "compute_roster_needs": (run_needs, len(rosters)),
+        "suggest_trending_adds": (run_trending, len(rosters)),
+        "suggest_trade_targets": (run_trades, len(rosters)),
+        "rank_free_agents": (run_free_agents, 1),
+    }
+
+
+def time_case(fn: Callable[[], object], repeat: int, min_sec: float) -> List[float]:
+    fn()  # warm-up
+    samples: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        deadline = time.perf_counter() + min_sec
+        while len(samples) < repeat or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def run_suite(scale: str, repeat: int, min_sec: float, only: List[str]) -> Dict[str, Dict[str, float]]:
+    data = make_dataset(**SCALES[scale])
+    results: Dict[str, Dict[str, float]] = {}
+    for name, (fn, units) in build_cases(data).items():
+        if only and name not in only:
+            continue
+        samples = time_case(fn, repeat, min_sec)
+        best = min(samples)
+        results[name] = {
+            "units": units,
+            "runs": len(samples),
+            "min_sec": best,
+            "median_sec": statistics.median(samples),
+            "us_per_unit": best / max(units, 1) * 1e6,
+        }
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """
+    Prints a comparison table and returns the names of regressed cases.
+    """
+    regressed: List[str] = []
+    print(f"{'case':<26}{'baseline us/unit':>18}{'current us/unit':>18}{'change':>10}")
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<26}{'-':>18}{cur['us_per_unit']:>18.2f}{'new':>10}")
+            continue
+        ratio = cur["us_per_unit"] / base["us_per_unit"] if base["us_per_unit"] else float("inf")
+        flag = ""
+        if ratio > 1.0 + threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<26}{base['us_per_unit']:>18.2f}{cur['us_per_unit']:>18.2f}{(ratio - 1.0) * 100:>+9.1f}%{flag}")
+    return regressed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-sec", type=float, default=0.5, help="Keep sampling each case for at least this long")
+    parser.add_argument("--case", action="append", default=[], help="Only run these cases")
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.scale, args.repeat, args.min_sec, args.case)
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get("scale") != args.scale:
+            print(f"warning: baseline was recorded at scale {baseline.get('scale')!r}, running {args.scale!r}", file=sys.stderr)
+        regressed = compare(results, baseline.get("results", {}), args.threshold)
+    else:
+        regressed = []
+        print(f"{'case':<26}{'units':>8}{'runs':>6}{'min ms':>10}{'median ms':>11}{'us/unit':>10}")
+        for name, r in results.items():
+            print(f"{name:<26}{r['units']:>8}{r['runs']:>6}{r['min_sec'] * 1e3:>10.2f}{r['median_sec'] * 1e3:>11.2f}{r['us_per_unit']:>10.2f}")
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"scale": args.scale, "python": platform.python_version(), "machine": platform.machine(), "recorded_at": time.time()}
+        args.save_baseline.write_text(json.dumps({**meta, "results": results}, indent=2), encoding="utf-8")
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if regressed:
+        print(f"Regressions beyond {args.threshold:.0%}: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
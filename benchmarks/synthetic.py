@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from ff_agent.player_index import PlayerIndex
+
+
+TEAMS = [
+    "ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB", "HOU", "IND", "JAX", "KC",
+    "LAC", "LAR", "LV", "MIA", "MIN", "NE", "NO", "NYG", "NYJ", "PHI", "PIT", "SEA", "SF", "TB", "TEN", "WAS",
+]
+# Rough share of the Sleeper dump per position
+POSITION_WEIGHTS = {"QB": 8, "RB": 14, "WR": 20, "TE": 10, "K": 3, "DEF": 1, "DL": 16, "LB": 12, "DB": 16}
+INJURY_STATUSES = [None] * 12 + ["Questionable", "Doubtful", "Out", "IR"]
+
+
+def make_players_index(num_players: int = 11000, seed: int = 7) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns a players dict shaped like Sleeper's /players/nfl dump, including the
+    fields the agent never reads, so memory comparisons are realistic.
+    """
+    rng = random.Random(seed)
+    positions = list(POSITION_WEIGHTS)
+    weights = list(POSITION_WEIGHTS.values())
+    players: Dict[str, Dict[str, Any]] = {}
+    for i in range(num_players):
+        pid = str(1000 + i)
+        pos = rng.choices(positions, weights)[0]
+        team = rng.choice(TEAMS) if rng.random() < 0.6 else None
+        first = f"First{i}"
+        last = f"Last{i}"
+        players[pid] = {
+            "player_id": pid,
+            "first_name": first,
+            "last_name": last,
+            "full_name": f"{first} {last}",
+            "search_first_name": first.lower(),
+            "search_last_name": last.lower(),
+            "search_full_name": f"{first}{last}".lower(),
+            "search_rank": rng.randint(1, 9999999),
+            "position": pos,
+            "fantasy_positions": [pos],
+            "team": team,
+            "team_abbr": None,
+            "status": "Active" if team else "Inactive",
+            "active": team is not None,
+            "injury_status": rng.choice(INJURY_STATUSES),
+            "injury_body_part": None,
+            "injury_notes": None,
+            "injury_start_date": None,
+            "practice_participation": None,
+            "practice_description": None,
+            "depth_chart_order": rng.randint(1, 4) if team and rng.random() < 0.7 else None,
+            "depth_chart_position": pos if team else None,
+            "number": rng.randint(0, 99),
+            "age": rng.randint(21, 38),
+            "years_exp": rng.randint(0, 15),
+            "height": str(rng.randint(68, 79)),
+            "weight": str(rng.randint(170, 330)),
+            "college": f"College{rng.randint(1, 130)}",
+            "birth_date": f"19{rng.randint(85, 99)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+            "birth_city": None,
+            "birth_state": None,
+            "birth_country": None,
+            "high_school": None,
+            "hashtag": f"#{first}{last}-NFL-{team or 'FA'}-{rng.randint(0, 99)}",
+            "sport": "nfl",
+            "news_updated": rng.randint(1_600_000_000_000, 1_700_000_000_000),
+            "espn_id": rng.randint(1, 5_000_000),
+            "yahoo_id": rng.randint(1, 50_000),
+            "sportradar_id": f"{rng.getrandbits(128):032x}",
+            "gsis_id": None,
+            "rotowire_id": rng.randint(1, 20000),
+            "rotoworld_id": None,
+            "fantasy_data_id": rng.randint(1, 30000),
+            "stats_id": None,
+            "swish_id": None,
+            "pandascore_id": None,
+            "oddsjam_id": None,
+            "opta_id": None,
+            "metadata": {"channel_id": str(rng.getrandbits(60))} if rng.random() < 0.3 else None,
+            "competitions": [],
+        }
+    return players
+
+
+DEFAULT_ROSTER_POSITIONS = ["QB", "RB", "RB", "WR", "WR", "TE", "FLEX", "SUPER_FLEX", "K", "DEF"] + ["BN"] * 6
+# Per-position roster composition for a 16-man roster
+ROSTER_TEMPLATE = ["QB", "QB", "RB", "RB", "RB", "RB", "RB", "WR", "WR", "WR", "WR", "WR", "TE", "TE", "K", "DEF"]
+
+
+def make_projections(players: Dict[str, Dict[str, Any]], seed: int = 7, coverage: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    Sleeper-style weekly projection rows for a random share of offensive players.
+    """
+    rng = random.Random(seed)
+    base = {"QB": 17.0, "RB": 10.0, "WR": 10.0, "TE": 7.0, "K": 8.0, "DEF": 7.0}
+    rows: List[Dict[str, Any]] = []
+    for pid, pdata in players.items():
+        pos = pdata["position"]
+        if pos not in base or rng.random() > coverage:
+            continue
+        ppr = max(0.0, rng.gauss(base[pos], base[pos] * 0.5))
+        rows.append({"player_id": pid, "pts_ppr": round(ppr, 2), "pts_half_ppr": round(ppr * 0.9, 2), "pts_std": round(ppr * 0.8, 2)})
+    return rows
+
+
+def make_rosters(players: Dict[str, Dict[str, Any]], num_rosters: int = 12, seed: int = 7) -> List[Dict[str, Any]]:
+    """
+    Sleeper-style roster rows drawn without replacement from the players index.
+    """
+    rng = random.Random(seed)
+    by_pos: Dict[str, List[str]] = {}
+    for pid, pdata in players.items():
+        by_pos.setdefault(pdata["position"], []).append(pid)
+    for pids in by_pos.values():
+        rng.shuffle(pids)
+    rosters: List[Dict[str, Any]] = []
+    for roster_id in range(1, num_rosters + 1):
+        roster_players = [by_pos[pos].pop() for pos in ROSTER_TEMPLATE if by_pos.get(pos)]
+        rosters.append({"roster_id": roster_id, "owner_id": f"user{roster_id}", "players": roster_players, "starters": roster_players[:10]})
+    return rosters
+
+
+def make_matchups(rosters: List[Dict[str, Any]], week: int = 1) -> List[Dict[str, Any]]:
+    """
+    Sleeper-style /matchups/<week> rows: a round-robin pairing of the rosters.
+    """
+    ids = [r["roster_id"] for r in rosters]
+    n = len(ids)
+    shift = (week - 1) % max(1, n - 1)
+    order = ids[:1] + (ids[1:][shift:] + ids[1:][:shift])
+    matchup_of = {}
+    for i in range(n // 2):
+        matchup_of[order[i]] = matchup_of[order[n - 1 - i]] = i + 1
+    return [
+        {"roster_id": r["roster_id"], "matchup_id": matchup_of.get(r["roster_id"]), "starters": r["starters"], "players": r["players"], "points": 0.0}
+        for r in rosters
+    ]
+
+
+def make_trending(players: Dict[str, Dict[str, Any]], limit: int = 50, seed: int = 7) -> List[Dict[str, Any]]:
+    """
+    Sleeper-style trending-adds rows, most-added first.
+    """
+    rng = random.Random(seed)
+    pids = rng.sample(sorted(players), min(limit, len(players)))
+    counts = sorted((rng.randint(50, 50000) for _ in pids), reverse=True)
+    return [{"player_id": pid, "count": count} for pid, count in zip(pids, counts)]
+
+
+@dataclass
+class SyntheticDataset:
+    players_raw: Dict[str, Dict[str, Any]]
+    players: PlayerIndex
+    projections: List[Dict[str, Any]]
+    trending: List[Dict[str, Any]]
+    roster_positions: List[str]
+    leagues: Dict[str, List[Dict[str, Any]]]  # league_id -> rosters
+
+    @property
+    def rosters(self) -> List[Dict[str, Any]]:
+        return [r for rosters in self.leagues.values() for r in rosters]
+
+
+def make_dataset(
+    num_players: int = 11000,
+    num_rosters: int = 120,
+    teams_per_league: int = 12,
+    trending_limit: int = 200,
+    seed: int = 7,
+) -> SyntheticDataset:
+    """
+    Deterministic dataset for the agent hot paths. Rosters are split into leagues of
+    teams_per_league; players repeat across leagues but never within one.
+    """
+    players_raw = make_players_index(num_players, seed=seed)
+    leagues: Dict[str, List[Dict[str, Any]]] = {}
+    num_leagues = max(1, -(-num_rosters // teams_per_league))
+    remaining = num_rosters
+    for i in range(num_leagues):
+        teams = min(teams_per_league, remaining)
+        leagues[f"L{i + 1}"] = make_rosters(players_raw, num_rosters=teams, seed=seed + i)
+        remaining -= teams
+    return SyntheticDataset(
+        players_raw=players_raw,
+        players=PlayerIndex.from_players(players_raw),
+        projections=make_projections(players_raw, seed=seed),
+        trending=make_trending(players_raw, limit=trending_limit, seed=seed),
+        roster_positions=list(DEFAULT_ROSTER_POSITIONS),
+        leagues=leagues,
+    )
@@ -0,0 +1,63 @@
+"""
+League-wide trade search throughput (1-for-1 and 2-for-1, every pair of teams) on synthetic
+12- and 16-team leagues, and the incremental lineup delta versus re-solving each side.
+
+    python -m benchmarks.trades [--max-players 10]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from ff_agent.lineup_optimizer import build_projection_lookup, get_solver
+from ff_agent.trade_agent import build_team_indexes, evaluate_trades
+
+from .synthetic import DEFAULT_ROSTER_POSITIONS, make_players_index, make_projections, make_rosters
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-players", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    raw = make_players_index()
+    proj_lookup = build_projection_lookup(make_projections(raw, coverage=0.9))
+    for num_teams in (12, 16):
+        rosters = make_rosters(raw, num_rosters=num_teams)
+        all_team_rosters = {r["roster_id"]: r["players"] for r in rosters}
+
+        start = time.perf_counter()
+        teams = build_team_indexes(all_team_rosters, DEFAULT_ROSTER_POSITIONS, raw, proj_lookup)
+        index_sec = time.perf_counter() - start
+        result = evaluate_trades(teams, max_players_per_team=args.max_players, limit=None)
+        print(
+            f"{num_teams} teams: indexes {index_sec * 1e3:.1f} ms, {result.evaluated} trades in {result.elapsed_sec:.2f}s "
+            f"({result.per_sec:,.0f}/sec), {len(result.candidates)} mutually beneficial"
+        )
+
+        # Incremental value_after versus solving the post-trade roster from scratch
+        rng = random.Random(3)
+        solver = get_solver(tuple(DEFAULT_ROSTER_POSITIONS))
+        ids = list(teams)
+        cases = []
+        for _ in range(args.samples):
+            a, b = rng.sample(ids, 2)
+            gives = [pc.player_id for pc in rng.sample(teams[a].ranked[: args.max_players], 2)]
+            receive = [rng.choice(teams[b].ranked[: args.max_players])]
+            cases.append((teams[a], gives, receive))
+        start = time.perf_counter()
+        for team, gives, receive in cases:
+            team.value_after(gives, receive)
+        incremental = (time.perf_counter() - start) / len(cases)
+        start = time.perf_counter()
+        for team, gives, receive in cases:
+            roster = [pc for pc in team.ranked if pc.player_id not in gives] + receive
+            starters, _ = solver.solve(roster)
+        full = (time.perf_counter() - start) / len(cases)
+        print(f"          per side: incremental {incremental * 1e6:.1f} us vs full re-solve {full * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
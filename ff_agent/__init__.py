@@ -1,6 +1,7 @@
 __all__ = [
     "config",
     "sleeper_client",
+    "player_index",
     "lineup_optimizer",
     "waiver_agent",
     "trade_agent",
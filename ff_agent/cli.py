@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+import time
+
+# Taken first for --startup-profile: process CPU so far (interpreter startup) and the wall
+# clock at which this module started importing
+_CLI_STARTED_CPU = time.process_time()
+_CLI_IMPORT_STARTED = time.perf_counter()
+
 import argparse
-from typing import Optional
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
+from . import startup, tracing
 from .config import AgentConfig, load_config, save_config
-from .sleeper_client import SleeperClient
-from .lineup_optimizer import optimize_lineup
-from .waiver_agent import compute_roster_needs, suggest_trending_adds
-from .notifier import notify_console, notify_slack
+from .inputs import add_week_inputs, build_fetch_plan, find_my_roster, resolve_week
+
+# Subcommand dependencies are imported inside the functions that use them, so `ff-agent
+# <command>` only loads the modules that command needs (see --startup-profile).
+if TYPE_CHECKING:
+    from .fixtures import FixtureArchive
+    from .sleeper_client import SleeperClient
 
 
 def resolve_value(cli_value, cfg_value, name: str):
@@ -18,12 +33,33 @@ def resolve_value(cli_value, cfg_value, name: str):
     raise SystemExit(f"Missing required value for {name}. Provide via flag or config file.")
 
 
+# Set by main() for --record: every client made by make_client also records into it
+_recorder: Optional[FixtureArchive] = None
+
+
+def make_client(cfg: AgentConfig) -> SleeperClient:
+    from .sleeper_client import SLEEPER_RATE_LIMIT_PER_MIN, SleeperClient
+    from .utils import DEFAULT_PLAYERS_TTL_SEC, DiskCache
+
+    ttl_sec = DEFAULT_PLAYERS_TTL_SEC
+    if cfg.players_cache_ttl_hours is not None:
+        ttl_sec = float(cfg.players_cache_ttl_hours) * 3600.0
+    per_min = SLEEPER_RATE_LIMIT_PER_MIN if cfg.api_rate_limit_per_min is None else float(cfg.api_rate_limit_per_min)
+    return SleeperClient(
+        cache=DiskCache(),
+        players_ttl_sec=ttl_sec,
+        base_url=cfg.api_base_url or SleeperClient.BASE,
+        recorder=_recorder,
+        rate_limit_per_sec=per_min / 60.0 if per_min > 0 else None,
+    )
+
+
 def cmd_list_leagues(args):
     cfg = load_config()
     username = resolve_value(args.username, cfg.username, "username")
     season = resolve_value(args.season, cfg.season, "season")
 
-    client = SleeperClient()
+    client = make_client(cfg)
     user = client.get_user(username)
     leagues = client.get_user_leagues(user["user_id"], season)
     for lg in leagues:
@@ -36,61 +72,54 @@ def cmd_init(args):
         season=args.season,
         league_id=args.league_id,
         slack_webhook_url=args.slack_webhook_url,
+        api_base_url=args.api_base_url,
     )
     save_config(cfg)
     print("Saved configuration to ~/.ff_agent/config.json")
 
 
 def cmd_recommend_lineup(args):
+    from .lineup_optimizer import optimize_lineup
+    from .notifier import notify_console, notify_slack
+    from .player_index import format_player
+    from .points_store import PointsStore
+
     cfg = load_config()
     username = resolve_value(args.username, cfg.username, "username")
     season = resolve_value(args.season, cfg.season, "season")
     league_id = resolve_value(args.league_id, cfg.league_id, "league_id")
 
-    client = SleeperClient()
-    user = client.get_user(username)
-    state = client.get_state("nfl")
-    if args.week == "auto":
-        week_num = int(state.get("week") or state.get("leg") or 1)
-    else:
-        week_num = int(args.week)
-
-    league = client.get_league(league_id)
-    roster_positions = league.get("roster_positions", [])
-
-    rosters = client.get_rosters(league_id)
-    user_id = user["user_id"]
-
-    my_roster = next((r for r in rosters if r.get("owner_id") == user_id), None)
+    client = make_client(cfg)
+    inputs = build_fetch_plan(
+        client, username, league_id, season=season, week=args.week, refresh_players=args.refresh_players
+    ).run()
+    my_roster = inputs["my_roster"]
     if not my_roster:
         raise SystemExit(2)
-
-    players_index = client.get_all_players("nfl")
-
-    projections = client.get_projections(season=season, week=week_num)
+    week_num = inputs["week"]
+    roster_positions = inputs["league"].get("roster_positions", [])
+    players_index = inputs["players"]
+    projections = inputs["projections"]
+    # Backfilled actual points (see backfill-points) score players without a projection
+    points = PointsStore(league_id)
+    history = points.fallback_lookup() if points.keys() else None
 
     starters_map, bench_choices = optimize_lineup(
         roster_player_ids=[str(pid) for pid in (my_roster.get("players") or [])],
         roster_positions=roster_positions,
         players_index=players_index,
         projections=projections,
+        history=history,
     )
 
-    def fmt_player(pid: str) -> str:
-        pdata = players_index.get(str(pid), {})
-        name = f"{pdata.get('first_name','')} {pdata.get('last_name','')}".strip() or pid
-        pos = (pdata.get("fantasy_positions") or [pdata.get("position") or "-"])[0]
-        team = pdata.get("team") or "-"
-        return f"{name} ({pos} {team})"
-
     starter_lines = []
     for idx, pid in starters_map.items():
         if not pid:
             starter_lines.append(f"Slot {idx}: [empty]")
         else:
-            starter_lines.append(f"Slot {idx}: {fmt_player(pid)}")
+            starter_lines.append(f"Slot {idx}: {format_player(players_index, pid)}")
 
-    bench_lines = [f"{fmt_player(pc.player_id)}  score={pc.score:.2f}  reason={pc.reason}" for pc in bench_choices[:15]]
+    bench_lines = [f"{format_player(players_index, pc.player_id)}  score={pc.score:.2f}  reason={pc.reason}" for pc in bench_choices[:15]]
 
     title = f"Lineup recommendation - Week {week_num}"
     notify_console(title, starter_lines + ["", "Bench candidates:"] + bench_lines)
@@ -98,111 +127,712 @@ def cmd_recommend_lineup(args):
 
 
 def cmd_waivers(args):
+    from .lineup_optimizer import build_projection_lookup
+    from .notifier import notify_console, notify_slack
+    from .player_index import format_player
+    from .waiver_agent import rank_free_agents, rostered_player_ids
+
     cfg = load_config()
     username = resolve_value(args.username, cfg.username, "username")
     season = resolve_value(args.season, cfg.season, "season")
     league_id = resolve_value(args.league_id, cfg.league_id, "league_id")
 
-    client = SleeperClient()
-    user = client.get_user(username)
-    league = client.get_league(league_id)
-    roster_positions = league.get("roster_positions", [])
-    rosters = client.get_rosters(league_id)
-    my_roster = next((r for r in rosters if r.get("owner_id") == user["user_id"]), None)
+    client = make_client(cfg)
+    inputs = build_fetch_plan(
+        client,
+        username,
+        league_id,
+        season=season,
+        week=args.week,
+        refresh_players=args.refresh_players,
+        trending=(args.hours, args.limit),
+    ).run()
+    my_roster = inputs["my_roster"]
     if not my_roster:
         raise SystemExit(2)
+    rosters = inputs["rosters"] or []
+    players_index = inputs["players"]
 
-    players_index = client.get_all_players("nfl")
-
-    needs = compute_roster_needs(
-        roster_positions=roster_positions,
-        current_players=[str(pid) for pid in (my_roster.get("players") or [])],
+    search = rank_free_agents(
+        my_player_ids=[str(pid) for pid in (my_roster.get("players") or [])],
+        roster_positions=inputs["league"].get("roster_positions", []),
+        rostered=rostered_player_ids(rosters),
         players_index=players_index,
+        proj_lookup=build_projection_lookup(inputs["projections"]),
+        num_teams=len(rosters),
+        limit=args.top,
+        trending=inputs["trending"],
     )
 
-    trending = client.get_trending_players("nfl", trend_type="add", hours=args.hours, limit=args.limit)
-    suggestions = suggest_trending_adds(trending, players_index, needs)
+    lines = []
+    for fa in search.candidates:
+        line = f"{format_player(players_index, fa.player_id)}  gain={fa.gain:+.2f}  vor={fa.vor:+.2f}"
+        if fa.drop:
+            line += f"  drop {format_player(players_index, fa.drop)}"
+        if fa.trend_count:
+            line += f"  adds={fa.trend_count}"
+        lines.append(line)
+    title = f"Waiver suggestions - week {inputs['week']} ({search.pool_size} free agents)"
+    notify_console(title, lines + ["", f"Ranked in {search.elapsed_sec * 1e3:.0f} ms"])
+    notify_slack(cfg.slack_webhook_url, title, lines)
+
 
-    def fmt(pid: str) -> str:
-        pdata = players_index.get(str(pid), {})
-        name = f"{pdata.get('first_name','')} {pdata.get('last_name','')}".strip() or pid
-        pos = (pdata.get("fantasy_positions") or [pdata.get("position") or "-"])[0]
-        team = pdata.get("team") or "-"
-        return f"{name} ({pos} {team})"
+def cmd_draft_assist(args):
+    from .draft_agent import DraftBoard, draft_total_picks, new_picks
+    from .lineup_optimizer import build_projection_lookup
+    from .notifier import notify_console
+    from .player_index import format_player
 
-    lines = [f"{fmt(pid)}  adds={count}" for pid, pos, count in suggestions]
-    title = "Waiver suggestions (trending adds filtered by needs)"
+    cfg = load_config()
+    username = resolve_value(args.username, cfg.username, "username")
+    season = resolve_value(args.season, cfg.season, "season")
+    league_id = resolve_value(args.league_id, cfg.league_id, "league_id")
+
+    client = make_client(cfg)
+    inputs = build_fetch_plan(
+        client, username, league_id, season=season, week=args.week, refresh_players=args.refresh_players
+    ).run()
+    draft_id = args.draft_id
+    if not draft_id:
+        drafts = client.get_league_drafts(league_id) or []
+        if not drafts:
+            raise SystemExit(f"No draft found for league {league_id}")
+        draft_id = drafts[0]["draft_id"]
+    draft = client.get_draft(draft_id) or {}
+    total = draft_total_picks(draft)
+    user_id = inputs["user"]["user_id"]
+    players_index = inputs["players"]
+
+    board = DraftBoard(players_index, build_projection_lookup(inputs["projections"]), inputs["league"].get("roster_positions", []))
+    print(f"Board: {sum(len(h) for h in board.heaps.values())} entries built in {board.stats.build_sec * 1e3:.0f} ms", file=sys.stderr)
+    last_pick = 0
+    shown = False
+    failures = 0
+    try:
+        while True:
+            try:
+                fresh = new_picks(client.get_draft_picks(draft_id) or [], last_pick)
+            except (OSError, ValueError) as exc:
+                # Keep the board and retry; a draft room outage should not end the session
+                failures += 1
+                delay = min(args.max_backoff_sec, args.poll_sec * 2 ** failures)
+                print(f"draft-assist: poll failed ({type(exc).__name__}: {exc}), retrying in {delay:.0f}s", file=sys.stderr)
+                time.sleep(delay)
+                continue
+            failures = 0
+            for pick in fresh:
+                board.apply_pick(str(pick["player_id"]), mine=pick.get("picked_by") == user_id)
+                last_pick = int(pick["pick_no"])
+            if fresh or not shown:
+                shown = True
+                start = time.perf_counter()
+                choices = board.recommend(args.top)
+                recommend_ms = (time.perf_counter() - start) * 1e3
+                lines = [
+                    f"{format_player(players_index, c.player_id)}  score={c.score:.2f}" + (f"  need {c.position}" if c.need > 0 else "")
+                    for c in choices
+                ]
+                stats = board.stats
+                lines += [
+                    "",
+                    f"{len(fresh)} new picks, update {stats.last_update_sec * 1e6:.0f} us/pick "
+                    f"(avg {stats.avg_update_sec * 1e6:.0f} us, max {stats.max_update_sec * 1e6:.0f} us), "
+                    f"recommend {recommend_ms:.2f} ms",
+                ]
+                notify_console(f"Draft {draft_id} - pick {last_pick}/{total or '?'}", lines)
+            if args.once or (total is not None and last_pick >= total):
+                break
+            time.sleep(args.poll_sec)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = board.stats
+        print(
+            json.dumps(
+                {
+                    "picks": stats.picks,
+                    "my_picks": stats.my_picks,
+                    "stale_pops": stats.stale_pops,
+                    "build_ms": round(stats.build_sec * 1e3, 3),
+                    "avg_update_us": round(stats.avg_update_sec * 1e6, 3),
+                    "max_update_us": round(stats.max_update_sec * 1e6, 3),
+                }
+            ),
+            file=sys.stderr,
+        )
+        client.close()
+
+
+def cmd_weekly_report(args):
+    from .lineup_optimizer import build_projection_lookup
+    from .matchup_sim import simulate_week
+    from .notifier import notify_console, notify_slack
+    from .reports import weekly_report_lines
+
+    cfg = load_config()
+    username = resolve_value(args.username, cfg.username, "username")
+    season = resolve_value(args.season, cfg.season, "season")
+    league_id = resolve_value(args.league_id, cfg.league_id, "league_id")
+
+    client = make_client(cfg)
+    plan = build_fetch_plan(
+        client,
+        username,
+        league_id,
+        season=season,
+        week=args.week,
+        refresh_players=args.refresh_players,
+        trending=(48, 50),
+    )
+    plan.add("matchups", lambda week_num: client.get_matchups(league_id, week_num), "week")
+    inputs = plan.run()
+    my_roster = inputs["my_roster"]
+    if not my_roster:
+        raise SystemExit(2)
+    league = inputs["league"]
+    players_index = inputs["players"]
+    proj_lookup = build_projection_lookup(inputs["projections"])
+    week_sim = simulate_week(inputs["matchups"] or [], players_index, proj_lookup, league.get("roster_positions"), sims=20_000)
+    lines = weekly_report_lines(
+        league, my_roster, inputs["week"], players_index, proj_lookup, inputs["trending"], week_sim.for_roster(my_roster.get("roster_id"))
+    )
+
+    title = "Weekly Report"
     notify_console(title, lines)
     notify_slack(cfg.slack_webhook_url, title, lines)
 
 
-def cmd_weekly_report(args):
+def parse_pairs(path: Optional[Path], specs: List[str]) -> List[Tuple[str, str]]:
+    """
+    (username, league_id) pairs from a file with one "username league_id" (or comma-separated)
+    pair per line, # comments allowed, plus "username:league_id" specs.
+    """
+    pairs: List[Tuple[str, str]] = []
+    if path is not None:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            fields = line.split("#", 1)[0].replace(",", " ").split()
+            if len(fields) >= 2:
+                pairs.append((fields[0], fields[1]))
+    for spec in specs:
+        username, _, league_id = spec.partition(":")
+        if not league_id:
+            raise SystemExit(f"Expected USERNAME:LEAGUE_ID, got {spec!r}")
+        pairs.append((username, league_id))
+    return pairs
+
+
+def cmd_bulk_weekly_report(args):
+    from .notifier import notify_console
+    from .reports import run_bulk_weekly_reports
+
+    cfg = load_config()
+    season = resolve_value(args.season, cfg.season, "season")
+    pairs = parse_pairs(args.pairs, args.pair or [])
+    if not pairs:
+        raise SystemExit("No (username, league_id) pairs given; use --pairs FILE or --pair USER:LEAGUE")
+
+    client = make_client(cfg)
+    start = time.perf_counter()
+    reports = run_bulk_weekly_reports(
+        client, pairs, season, week=args.week, concurrency=args.concurrency, refresh_players=args.refresh_players
+    )
+    elapsed = time.perf_counter() - start
+
+    for report in reports:
+        if args.jsonl:
+            print(json.dumps(asdict(report)))
+        elif report.error:
+            print(f"==== Weekly Report: {report.username} / {report.league_id} ====\n- ERROR {report.error}")
+        else:
+            notify_console(f"Weekly Report: {report.username} / {report.league_id}", report.lines)
+    ok = sum(1 for r in reports if not r.error)
+    stats = client.stats
+    shared = client.request_stats
+    cache = client.cache.stats if client.cache is not None else None
+    print(
+        f"{ok}/{len(reports)} reports in {elapsed:.2f}s ({ok / elapsed * 60.0 if elapsed > 0 else 0.0:.0f} reports/min); "
+        f"{stats.requests} HTTP requests ({stats.retries} retries, {stats.wire_bytes / 1e6:.1f} MB), "
+        f"{shared.coalesced} coalesced, {shared.memoized} memoized, {shared.throttled} throttled "
+        f"({shared.throttle_sec:.1f}s queued)"
+        + (f", {cache.hits} cache hits" if cache is not None else ""),
+        file=sys.stderr,
+    )
+
+
+def cmd_simulate_matchup(args):
+    from .fetch_plan import FetchPlan
+    from .lineup_optimizer import build_projection_lookup
+    from .matchup_sim import simulate_week
+    from .notifier import notify_console
+    from .reports import format_matchup
+
+    cfg = load_config()
+    season = resolve_value(args.season, cfg.season, "season")
+    league_id = resolve_value(args.league_id, cfg.league_id, "league_id")
+
+    client = make_client(cfg)
+    plan = FetchPlan()
+    plan.add("league", lambda: client.get_league(league_id))
+    plan.add("players", lambda: client.get_players_index("nfl", refresh=args.refresh_players))
+    add_week_inputs(plan, client, season, args.week, league="league")
+    plan.add("matchups", lambda week_num: client.get_matchups(league_id, week_num), "week")
+    inputs = plan.run()
+
+    week = simulate_week(
+        inputs["matchups"] or [],
+        inputs["players"],
+        build_projection_lookup(inputs["projections"]),
+        inputs["league"].get("roster_positions"),
+        sims=args.sims,
+        seed=args.seed,
+        processes=args.processes,
+    )
+    lines = [format_matchup(r) for r in week.results]
+    lines.append(f"{len(week.results)} matchups x {week.sims} simulations in {week.elapsed_sec:.3f}s")
+    notify_console(f"Matchup simulation - Week {inputs['week']}", lines)
+
+
+def cmd_playoff_odds(args):
+    from .fetch_plan import FetchPlan
+    from .lineup_optimizer import build_projection_lookup
+    from .notifier import notify_console
+    from .projection_store import ProjectionStore
+    from .scoring import compile_scoring
+    from .season_sim import build_season_model, playoff_format, simulate_season
+
+    cfg = load_config()
+    season = resolve_value(args.season, cfg.season, "season")
+    league_id = resolve_value(args.league_id, cfg.league_id, "league_id")
+
+    client = make_client(cfg)
+    plan = FetchPlan()
+    plan.add("league", lambda: client.get_league(league_id))
+    plan.add("rosters", lambda: client.get_rosters(league_id))
+    plan.add("state", lambda: client.get_state("nfl"))
+    plan.add("players", lambda: client.get_players_index("nfl", refresh=args.refresh_players))
+    inputs = plan.run()
+    league = inputs["league"]
+    playoff_week_start, playoff_teams, byes = playoff_format(league)
+    current_week = resolve_week(inputs["state"])
+    weeks = list(range(current_week, playoff_week_start))
+
+    store = ProjectionStore(client, season)
+    store.prefetch(weeks, current_week=current_week)
+    scoring = compile_scoring(league.get("scoring_settings"))
+    week_plan = FetchPlan()
+    for w in weeks:
+        week_plan.add(f"matchups:{w}", lambda w=w: client.get_matchups(league_id, w))
+        week_plan.add(
+            f"projections:{w}",
+            lambda w=w: store.scored(w, store.week(w, current_week=current_week), scoring, inputs["players"]),
+        )
+    week_inputs = week_plan.run()
+
+    model = build_season_model(
+        inputs["rosters"] or [],
+        {w: week_inputs[f"matchups:{w}"] or [] for w in weeks},
+        {w: build_projection_lookup(week_inputs[f"projections:{w}"]) for w in weeks},
+        inputs["players"],
+        league.get("roster_positions", []),
+    )
+    odds = simulate_season(model, playoff_teams, byes, sims=args.sims, seed=args.seed, processes=args.processes)
+
+    lines = [
+        f"Roster {t.roster_id}: playoffs {t.playoff_prob:.1%}  bye {t.bye_prob:.1%}  "
+        f"record {t.wins:g} -> {t.projected_wins:.1f} wins  seeds "
+        + " ".join(f"{p:.0%}" for p in t.seed_probs)
+        for t in odds.teams
+    ]
+    lines.append(
+        f"{len(weeks)} weeks left, {odds.sims} simulations in {odds.elapsed_sec:.2f}s "
+        f"({odds.sims_per_sec:.0f}/sec on {odds.processes} process(es))"
+    )
+    notify_console(f"Playoff odds - {league.get('name')}", lines)
+
+
+def cmd_watch(args):
+    from .notifier import notify_console, notify_slack
+    from .projection_store import ProjectionStore
+    from .watch import WatchSchedule, Watcher
+
     cfg = load_config()
     username = resolve_value(args.username, cfg.username, "username")
     season = resolve_value(args.season, cfg.season, "season")
+    league_ids = args.league_id or [resolve_value(None, cfg.league_id, "league_id")]
+
+    client = make_client(cfg)
+    schedule = WatchSchedule(
+        state_sec=args.state_sec,
+        rosters_sec=args.rosters_sec,
+        trending_sec=args.trending_sec,
+        players_sec=args.players_sec,
+        projections_sec=args.projections_sec,
+        leagues_sec=args.leagues_sec,
+    )
+    # Past this age the players index is revalidated (usually a 304) on each players poll
+    client.players_ttl_sec = min(client.players_ttl_sec, schedule.players_sec)
+
+    def notify(title: str, lines: List[str]) -> None:
+        notify_console(title, lines)
+        notify_slack(cfg.slack_webhook_url, title, lines)
+
+    def on_error(what: str, exc: BaseException) -> None:
+        print(f"watch: {what} failed: {type(exc).__name__}: {exc}", file=sys.stderr)
+
+    def report(watcher: Watcher) -> None:
+        if args.stats_every and watcher.stats.loops % args.stats_every == 0:
+            print(json.dumps(watcher.stats_dict()), file=sys.stderr)
+
+    watcher = Watcher(
+        client,
+        username,
+        league_ids,
+        schedule,
+        notify=notify,
+        projections=ProjectionStore(client, season, ttl_sec=schedule.projections_sec),
+        trending_hours=args.hours,
+        trending_limit=args.limit,
+        on_error=on_error,
+    )
+    try:
+        watcher.run(max_loops=args.max_loops, on_loop=report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(watcher.stats_dict()), file=sys.stderr)
+        client.close()
+
+
+def cmd_sync(args):
+    from .history_store import HistoryStore
+    from .points_store import DEFAULT_LAST_WEEK
+
+    cfg = load_config()
+    league_ids = args.league_id or [resolve_value(None, cfg.league_id, "league_id")]
+    client = make_client(cfg)
+    state = client.get_state("nfl") or {}
+    current_week = resolve_week(state)
+    current_season = int(state.get("season") or 0)
+
+    with HistoryStore() as store:
+        for lid in league_ids:
+            # A league from an earlier season is over: all its weeks are final, not just those before this week
+            league = client.get_league(lid) or {}
+            season_over = 0 < int(league.get("season") or current_season) < current_season
+            if args.weeks:
+                weeks = parse_weeks(args.weeks)
+            elif season_over:
+                weeks = list(range(1, int((league.get("settings") or {}).get("last_scored_leg") or DEFAULT_LAST_WEEK) + 1))
+            else:
+                weeks = list(range(1, current_week + 1))
+            result = store.sync(client, lid, weeks, current_week=current_week, force=args.force, season_over=season_over)
+            print(
+                f"{lid}: fetched {len(result.fetched)} week(s), {result.skipped} already final, {result.rows} rows  "
+                f"(fetch {result.fetch_sec:.2f}s, write {result.write_sec * 1e3:.1f} ms)"
+            )
+
+
+def cmd_history(args):
+    from .history_store import HistoryStore
+
+    cfg = load_config()
+    start = time.perf_counter()
+    with HistoryStore() as store:
+        if args.query == "player":
+            if not args.player_id:
+                raise SystemExit("--player-id is required for the player query")
+            for row in store.player_transactions(args.player_id, action=args.action, league_id=args.league_id):
+                print(json.dumps(row))
+            for row in store.player_points(args.player_id, league_id=args.league_id):
+                print(json.dumps({"points": row}))
+        else:
+            league_id = resolve_value(args.league_id, cfg.league_id, "league_id")
+            for roster_id, weeks in store.points_by_roster(league_id).items():
+                total = sum(p or 0.0 for p in weeks.values())
+                by_week = "  ".join(f"w{w}={p:.1f}" for w, p in weeks.items() if p is not None)
+                print(f"Roster {roster_id}: total {total:.1f}  {by_week}")
+    print(f"Query took {(time.perf_counter() - start) * 1e3:.1f} ms", file=sys.stderr)
+
+
+def cmd_backfill_points(args):
+    from .player_index import format_player
+    from .points_store import PointsStore
+
+    cfg = load_config()
     league_id = resolve_value(args.league_id, cfg.league_id, "league_id")
+    client = make_client(cfg)
+    state = client.get_state("nfl") or {}
+    current = (int(state.get("season") or 0), resolve_week(state)) if state.get("season") else None
 
-    client = SleeperClient()
-    user = client.get_user(username)
-    state = client.get_state("nfl")
-    if args.week == "auto":
-        week_num = int(state.get("week") or state.get("leg") or 1)
-    else:
-        week_num = int(args.week)
+    store = PointsStore(league_id)
+    result = store.backfill(client, seasons=args.seasons, current=current, force=args.force)
+    print(
+        f"{league_id}: {len(result.league_ids)} season(s), fetched {len(result.fetched)} week(s), "
+        f"{result.skipped} already final, {result.rows} player-weeks  "
+        f"(fetch {result.fetch_sec:.2f}s, write {result.write_sec * 1e3:.1f} ms)"
+    )
 
-    league = client.get_league(league_id)
-    rosters = client.get_rosters(league_id)
+    start = time.perf_counter()
+    summaries = store.aggregates(recent=args.recent)
+    elapsed = time.perf_counter() - start
+    print(f"Aggregated {len(summaries)} players over {len(store.keys())} weeks in {elapsed * 1e3:.1f} ms", file=sys.stderr)
+    if args.show:
+        players_index = client.get_players_index("nfl")
+        for s in sorted(summaries.values(), key=lambda s: s.mean, reverse=True)[: args.show]:
+            print(
+                f"{format_player(players_index, s.player_id)}  games={s.games}  mean={s.mean:.1f}  sd={s.stdev:.1f}  "
+                f"floor={s.floor:.1f}  ceiling={s.ceiling:.1f}  trend={s.trend:+.1f}"
+            )
 
-    players_index = client.get_all_players("nfl")
 
-    my_roster = next((r for r in rosters if r.get("owner_id") == user["user_id"]), None)
-    if not my_roster:
-        raise SystemExit(2)
+def cmd_cache(args):
+    from .utils import DiskCache
 
-    projections = client.get_projections(season=season, week=week_num)
+    cache = DiskCache()
+    if args.action == "prune":
+        max_age = args.older_than_hours * 3600.0 if args.older_than_hours is not None else None
+        removed = cache.prune(max_age)
+        print(f"Removed {len(removed)} cache entries" + (f": {', '.join(removed)}" if removed else ""))
+        return
+    entries = cache.entries()
+    if not entries:
+        print(f"No cache entries in {cache.root}")
+        return
+    for e in entries:
+        fetched = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(e.fetched_at))
+        print(
+            f"{e.key}  size={e.size_bytes / 1e6:.2f}MB  fetched={fetched}  age={e.age_sec / 3600.0:.1f}h  "
+            f"hits={e.hits}  misses={e.misses}  revalidated={e.revalidations}  etag={e.etag or '-'}"
+        )
 
-    starters_map, bench_choices = optimize_lineup(
-        roster_player_ids=[str(pid) for pid in (my_roster.get("players") or [])],
-        roster_positions=league.get("roster_positions", []),
-        players_index=players_index,
-        projections=projections,
+
+def cmd_league_lineups(args):
+    from .fetch_plan import FetchPlan
+    from .lineup_optimizer import build_projection_lookup, optimize_league_lineups
+
+    cfg = load_config()
+    season = resolve_value(args.season, cfg.season, "season")
+    # A repeated --league-id would add duplicate fetch tasks; keep the first occurrence
+    league_ids = list(dict.fromkeys(args.league_id or [resolve_value(None, cfg.league_id, "league_id")]))
+
+    client = make_client(cfg)
+    plan = FetchPlan()
+    plan.add("players", lambda: client.get_players_index("nfl", refresh=args.refresh_players))
+    for lid in league_ids:
+        plan.add(f"league:{lid}", lambda lid=lid: client.get_league(lid))
+        plan.add(f"rosters:{lid}", lambda lid=lid: client.get_rosters(lid))
+    add_week_inputs(plan, client, season, args.week, league_ids=league_ids)
+    inputs = plan.run()
+
+    start = time.perf_counter()
+    proj_lookup = build_projection_lookup(inputs["projections"])
+    league_projections = {lid: build_projection_lookup(points) for lid, points in inputs["league_projections"].items()}
+    leagues = [
+        (lid, inputs[f"league:{lid}"].get("roster_positions", []), inputs[f"rosters:{lid}"] or [])
+        for lid in league_ids
+    ]
+    lineups = optimize_league_lineups(
+        leagues, inputs["players"], proj_lookup, processes=args.processes, league_projections=league_projections
     )
+    elapsed = time.perf_counter() - start
 
-    trending = client.get_trending_players("nfl", trend_type="add", hours=48, limit=50)
-    needs = compute_roster_needs(
-        roster_positions=league.get("roster_positions", []),
-        current_players=[str(pid) for pid in (my_roster.get("players") or [])],
-        players_index=players_index,
+    for lineup in lineups:
+        print(json.dumps({"week": inputs["week"], **asdict(lineup)}))
+    rate = len(lineups) / elapsed if elapsed > 0 else float("inf")
+    print(f"Optimized {len(lineups)} rosters in {elapsed:.3f}s ({rate:.0f} rosters/sec)", file=sys.stderr)
+
+
+def cmd_injury_alerts(args):
+    from .fetch_plan import FetchPlan
+    from .notifier import notify_console, notify_slack
+    from .player_index import PlayerIndex, format_player
+    from .roster_index import DEFAULT_BASELINE_PATH, DEFAULT_ROSTER_INDEX_PATH, RosterIndex
+
+    cfg = load_config()
+    client = make_client(cfg)
+    # Statuses change by the hour on game days: revalidate the players dump well inside
+    # the usual 12 h cache window (a 304 keeps it cheap)
+    client.players_ttl_sec = min(client.players_ttl_sec, args.players_max_age_min * 60.0)
+    owner_id = None
+    league_ids = list(args.league_id or [])
+    if not args.all_rosters or args.all_leagues:
+        user = client.get_user(resolve_value(args.username, cfg.username, "username"))
+        owner_id = None if args.all_rosters else user["user_id"]
+        if args.all_leagues:
+            season = resolve_value(args.season, cfg.season, "season")
+            league_ids += [lg["league_id"] for lg in client.get_user_leagues(user["user_id"], season) or []]
+    if not league_ids:
+        league_ids = [resolve_value(None, cfg.league_id, "league_id")]
+    league_ids = list(dict.fromkeys(str(lid) for lid in league_ids))
+
+    baseline_path = Path(args.previous) if args.previous else DEFAULT_BASELINE_PATH
+    plan = FetchPlan()
+    if args.current:
+        plan.add("players", lambda: PlayerIndex.load_snapshot(Path(args.current)))
+    else:
+        plan.add("players", lambda: client.get_players_index("nfl", refresh=args.refresh_players))
+    for lid in league_ids:
+        plan.add(f"rosters:{lid}", lambda lid=lid: client.get_rosters(lid))
+    inputs = plan.run()
+    current = inputs["players"]
+    if current is None:
+        raise SystemExit(f"Not a players-index snapshot: {args.current}")
+
+    start = time.perf_counter()
+    index = RosterIndex.load(DEFAULT_ROSTER_INDEX_PATH) or RosterIndex()
+    touched = 0
+    for lid in set(index.league_ids) - set(league_ids):
+        touched += index.remove_league(lid)
+    for lid in league_ids:
+        touched += index.update_league(lid, inputs[f"rosters:{lid}"] or [])
+    index_sec = time.perf_counter() - start
+    try:
+        index.save(DEFAULT_ROSTER_INDEX_PATH)
+    except OSError as exc:
+        print(f"Could not save the roster index: {exc}", file=sys.stderr)
+
+    previous = PlayerIndex.load_snapshot(baseline_path)
+    if previous is None:
+        if args.previous:
+            raise SystemExit(f"Not a players-index snapshot: {args.previous}")
+        current.save_snapshot(baseline_path)
+        print(f"Saved the injury baseline to {baseline_path}; the next run reports changes against it")
+        return
+
+    scan = index.injury_alerts(previous, current, owner_id=owner_id)
+    lines = []
+    for alert in scan.alerts:
+        where = ", ".join(f"{ref.league_id}/{ref.roster_id}{' (starter)' if ref.starter else ''}" for ref in alert.rosters)
+        lines.append(f"{format_player(current, alert.player_id)}  {alert.before or 'Healthy'} -> {alert.after or 'Healthy'}  [{where}]")
+    if lines:
+        title = f"Injury alerts - {len(scan.alerts)} players on tracked rosters"
+        notify_console(title, lines)
+        notify_slack(cfg.slack_webhook_url, title, lines)
+    print(
+        f"{scan.changed_players} status changes, {len(scan.alerts)} on {index.roster_count} rosters in {len(league_ids)} leagues; "
+        f"index {index_sec * 1e3:.1f} ms ({touched} roster entries changed), "
+        f"diff {scan.diff_sec * 1e3:.2f} ms, lookup {scan.lookup_sec * 1e3:.2f} ms",
+        file=sys.stderr,
     )
-    waiver_suggestions = suggest_trending_adds(trending, players_index, needs)
+    if not args.previous and not args.current:
+        current.save_snapshot(baseline_path)
+
+
+def cmd_trades(args):
+    from .lineup_optimizer import build_projection_lookup
+    from .notifier import notify_console
+    from .player_index import format_player
+    from .trade_agent import build_team_indexes, evaluate_trades
 
-    def fmt(pid: str) -> str:
-        pdata = players_index.get(str(pid), {})
-        name = f"{pdata.get('first_name','')} {pdata.get('last_name','')}".strip() or pid
-        pos = (pdata.get("fantasy_positions") or [pdata.get("position") or "-"])[0]
-        team = pdata.get("team") or "-"
-        return f"{name} ({pos} {team})"
+    cfg = load_config()
+    username = resolve_value(args.username, cfg.username, "username")
+    season = resolve_value(args.season, cfg.season, "season")
+    league_id = resolve_value(args.league_id, cfg.league_id, "league_id")
+
+    client = make_client(cfg)
+    inputs = build_fetch_plan(
+        client, username, league_id, season=season, week=args.week, refresh_players=args.refresh_players
+    ).run()
+    my_roster = inputs["my_roster"]
+    if not my_roster and not args.all_teams:
+        raise SystemExit(2)
+    players_index = inputs["players"]
+
+    all_team_rosters = {r.get("roster_id"): [str(pid) for pid in (r.get("players") or [])] for r in inputs["rosters"]}
+    teams = build_team_indexes(
+        all_team_rosters,
+        inputs["league"].get("roster_positions", []),
+        players_index,
+        build_projection_lookup(inputs["projections"]),
+    )
+    result = evaluate_trades(
+        teams,
+        involving=None if args.all_teams else my_roster.get("roster_id"),
+        max_players_per_team=args.max_players,
+        two_for_one=not args.one_for_one,
+        limit=args.limit,
+    )
 
-    starter_lines = [f"Slot {idx}: {fmt(pid) if pid else '[empty]'}" for idx, pid in starters_map.items()]
-    waiver_lines = [f"{fmt(pid)} adds={cnt}" for pid, pos, cnt in waiver_suggestions[:10]]
+    def names(pids) -> str:
+        return " + ".join(format_player(players_index, pid) for pid in pids)
 
     lines = [
-        f"League: {league.get('name')}  Week: {week_num}",
-        "",
-        "Starters:",
-        *starter_lines,
-        "",
-        "Top Waiver Suggestions:",
-        *waiver_lines,
+        f"Roster {t.team_a} sends {names(t.gives)} to roster {t.team_b} for {names(t.receives)}"
+        f"  ({t.delta_a:+.1f} / {t.delta_b:+.1f} pts)"
+        for t in result.candidates
     ]
+    lines.append(f"Evaluated {result.evaluated} trades in {result.elapsed_sec:.2f}s ({result.per_sec:.0f}/sec)")
+    notify_console(f"Trade ideas - Week {inputs['week']}", lines)
 
-    title = "Weekly Report"
-    notify_console(title, lines)
-    notify_slack(cfg.slack_webhook_url, title, lines)
+
+def parse_weeks(spec: str) -> List[int]:
+    """
+    "1-18" or "1,2,5-7" -> week numbers.
+    """
+    weeks: List[int] = []
+    for part in spec.split(","):
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            weeks.extend(range(int(lo), int(hi) + 1))
+        elif part.strip():
+            weeks.append(int(part))
+    return weeks
+
+
+def cmd_projections(args):
+    from .projection_store import ProjectionStore
+
+    cfg = load_config()
+    season = resolve_value(args.season, cfg.season, "season")
+    client = make_client(cfg)
+    store = ProjectionStore(client, season, season_type=args.season_type)
+    current_week = resolve_week(client.get_state("nfl"))
+
+    start = time.perf_counter()
+    fetched = store.prefetch(parse_weeks(args.weeks), current_week=current_week, force=args.force)
+    elapsed = time.perf_counter() - start
+    print(f"Fetched {len(fetched)} week(s) in {elapsed:.2f}s: {', '.join(map(str, fetched)) or '-'}")
+    for week in store.columns.weeks():
+        meta = store.columns.week_meta(week) or {}
+        fetched_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(meta.get("fetched_at", 0)))
+        state = "final" if meta.get("final") else ("stale" if store.is_stale(week, current_week) else "fresh")
+        print(f"week {week:>2}  rows={meta.get('rows', 0):>5}  fetched={fetched_at}  {state}")
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="ff-agent", description="Fantasy Football agent (Sleeper)")
+    parser.add_argument(
+        "--notify-deadline",
+        type=float,
+        default=5.0,
+        metavar="SEC",
+        help="At exit, wait at most this long for queued Slack messages; the rest are sent by the next run",
+    )
+    parser.add_argument("--notify-stats", action="store_true", help="Print Slack delivery stats at exit")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Write a JSON timing tree of the run (spans, HTTP requests with bytes and retries) to PATH, or stderr",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="PATH",
+        help="Also dump cProfile stats of the main thread to PATH",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="Print a timing breakdown (imports, argument parsing, players index load, command) to stderr",
+    )
+    parser.add_argument(
+        "--record",
+        type=Path,
+        metavar="ARCHIVE",
+        help="Also save every API response into this fixture archive (zip) for offline replay. "
+        "Cached responses are not re-fetched; combine with --refresh-players to capture the players dump.",
+    )
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     p = sub.add_parser("list-leagues")
@@ -215,6 +845,7 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--season", type=int)
     p.add_argument("--league-id")
     p.add_argument("--slack-webhook-url")
+    p.add_argument("--api-base-url", help="Point the agent at another server, e.g. a local replay stand-in")
     p.set_defaults(func=cmd_init)
 
     p = sub.add_parser("recommend-lineup")
@@ -222,30 +853,235 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--username")
     p.add_argument("--season", type=int)
     p.add_argument("--week", default="auto")
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
     p.set_defaults(func=cmd_recommend_lineup)
 
     p = sub.add_parser("waivers")
     p.add_argument("--league-id")
     p.add_argument("--username")
     p.add_argument("--season", type=int)
+    p.add_argument("--week", default="auto")
     p.add_argument("--hours", type=int, default=24)
-    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--limit", type=int, default=50, help="Trending adds to fetch (shown as adds=N)")
+    p.add_argument("--top", type=int, default=25, help="Free agents to list")
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
     p.set_defaults(func=cmd_waivers)
 
+    p = sub.add_parser("draft-assist", help="Follow a live draft and recommend the best available players after every pick")
+    p.add_argument("--league-id")
+    p.add_argument("--username")
+    p.add_argument("--season", type=int)
+    p.add_argument("--draft-id", help="Defaults to the league's most recent draft")
+    p.add_argument("--week", default="1", help="Week whose projections rank the players")
+    p.add_argument("--poll-sec", type=float, default=3.0)
+    p.add_argument("--max-backoff-sec", type=float, default=60.0, help="Longest wait between polls after repeated failures")
+    p.add_argument("--top", type=int, default=8)
+    p.add_argument("--once", action="store_true", help="Apply the picks so far, print one board and exit")
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
+    p.set_defaults(func=cmd_draft_assist)
+
     p = sub.add_parser("weekly-report")
     p.add_argument("--league-id")
     p.add_argument("--username")
     p.add_argument("--season", type=int)
     p.add_argument("--week", default="auto")
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
     p.set_defaults(func=cmd_weekly_report)
 
+    p = sub.add_parser("bulk-weekly-report", help="Weekly reports for many users/leagues in one process")
+    p.add_argument("--pairs", type=Path, help='File with one "username league_id" pair per line')
+    p.add_argument("--pair", action="append", help="USERNAME:LEAGUE_ID (repeatable)")
+    p.add_argument("--season", type=int)
+    p.add_argument("--week", default="auto")
+    p.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight")
+    p.add_argument("--jsonl", action="store_true", help="Print one JSON object per report")
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
+    p.set_defaults(func=cmd_bulk_weekly_report)
+
+    p = sub.add_parser("league-lineups", help="Optimal lineups for every roster of one or more leagues, as JSON lines")
+    p.add_argument("--league-id", action="append", help="Repeat for several leagues (default: configured league)")
+    p.add_argument("--season", type=int)
+    p.add_argument("--week", default="auto")
+    p.add_argument("--processes", type=int, default=1)
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
+    p.set_defaults(func=cmd_league_lineups)
+
+    p = sub.add_parser("injury-alerts", help="Report injury status changes since the last run for players on tracked rosters")
+    p.add_argument("--league-id", action="append", help="Repeat for several leagues (default: configured league)")
+    p.add_argument("--username")
+    p.add_argument("--season", type=int)
+    p.add_argument("--all-leagues", action="store_true", help="Track every league of the user in the season")
+    p.add_argument("--all-rosters", action="store_true", help="Alert every affected roster, not only the user's")
+    p.add_argument("--previous", help="Players-index snapshot to diff against (default: the last run's)")
+    p.add_argument("--current", help="Players-index snapshot to use instead of the players index")
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
+    p.add_argument(
+        "--players-max-age-min", type=float, default=10.0, help="Revalidate a cached players index older than this"
+    )
+    p.set_defaults(func=cmd_injury_alerts)
+
+    p = sub.add_parser("trades", help="Evaluate 1-for-1 and 2-for-1 trades by starting-lineup gain for both sides")
+    p.add_argument("--league-id")
+    p.add_argument("--username")
+    p.add_argument("--season", type=int)
+    p.add_argument("--week", default="auto")
+    p.add_argument("--all-teams", action="store_true", help="Search trades between every pair of teams, not just yours")
+    p.add_argument("--max-players", type=int, default=10, help="Players offered per team (top by score)")
+    p.add_argument("--one-for-one", action="store_true", help="Skip 2-for-1 trades")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
+    p.set_defaults(func=cmd_trades)
+
+    p = sub.add_parser("simulate-matchup", help="Monte Carlo win probabilities for every matchup of a week")
+    p.add_argument("--league-id")
+    p.add_argument("--season", type=int)
+    p.add_argument("--week", default="auto")
+    p.add_argument(
+        "--sims",
+        type=int,
+        default=100_000,
+        help="Simulations per matchup; win probabilities use all of them, score percentiles a 20,000-simulation subsample",
+    )
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--processes", type=int, default=1)
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
+    p.set_defaults(func=cmd_simulate_matchup)
+
+    p = sub.add_parser("playoff-odds", help="Simulate the rest of the regular season for playoff and bye odds")
+    p.add_argument("--league-id")
+    p.add_argument("--season", type=int)
+    p.add_argument("--sims", type=int, default=10_000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--processes", type=int, default=1)
+    p.add_argument("--refresh-players", action="store_true", help="Ignore the cached players index")
+    p.set_defaults(func=cmd_playoff_odds)
+
+    p = sub.add_parser("watch", help="Stay resident and re-run lineups/waivers only when their inputs change")
+    p.add_argument("--league-id", action="append", help="Repeat for several leagues (default: configured league)")
+    p.add_argument("--username")
+    p.add_argument("--season", type=int)
+    p.add_argument("--hours", type=int, default=24, help="Trending window")
+    p.add_argument("--limit", type=int, default=50, help="Trending rows")
+    p.add_argument("--state-sec", type=float, default=600.0)
+    p.add_argument("--rosters-sec", type=float, default=120.0)
+    p.add_argument("--trending-sec", type=float, default=900.0)
+    p.add_argument("--players-sec", type=float, default=3600.0, help="Injury/status refresh interval")
+    p.add_argument("--projections-sec", type=float, default=1800.0)
+    p.add_argument("--leagues-sec", type=float, default=3600.0, help="User and league settings refresh interval")
+    p.add_argument("--max-loops", type=int, help="Exit after this many loop iterations")
+    p.add_argument("--stats-every", type=int, default=0, help="Print loop stats to stderr every N loops")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("sync", help="Store transactions and matchups locally, fetching only weeks not yet final")
+    p.add_argument("--league-id", action="append", help="Repeat for several leagues (default: configured league)")
+    p.add_argument("--weeks", help='Week range, e.g. "1-17" (default: 1 through the current week, or every week of a past season)')
+    p.add_argument("--force", action="store_true", help="Re-fetch weeks already stored as final")
+    p.set_defaults(func=cmd_sync)
+
+    p = sub.add_parser("backfill-points", help="Store actual weekly player points for this and previous seasons")
+    p.add_argument("--league-id")
+    p.add_argument("--seasons", type=int, default=3, help="Follow previous_league_id back this many seasons")
+    p.add_argument("--recent", type=int, default=3, help="Games counted as recent form")
+    p.add_argument("--show", type=int, default=0, help="Print the top N players by mean points")
+    p.add_argument("--force", action="store_true", help="Re-fetch weeks already stored as final")
+    p.set_defaults(func=cmd_backfill_points)
+
+    p = sub.add_parser("history", help="Query the local transaction/matchup history (see sync)")
+    p.add_argument("query", choices=["player", "points"])
+    p.add_argument("--league-id")
+    p.add_argument("--player-id")
+    p.add_argument("--action", choices=["add", "drop"])
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("projections", help="Prefetch weekly projections into the local store")
+    p.add_argument("--season", type=int)
+    p.add_argument("--weeks", default="1-18", help='Week range, e.g. "1-18" or "3,5-7"')
+    p.add_argument("--season-type", default="regular")
+    p.add_argument("--force", action="store_true", help="Re-download weeks even if fresh or final")
+    p.set_defaults(func=cmd_projections)
+
+    p = sub.add_parser("cache", help="Inspect or prune the local response cache")
+    p.add_argument("action", nargs="?", choices=["info", "prune"], default="info")
+    p.add_argument("--older-than-hours", type=float, help="With prune: only remove entries older than this")
+    p.set_defaults(func=cmd_cache)
+
     return parser
 
 
+def write_profile(tracer: tracing.Tracer, dest: str) -> None:
+    """
+    Writes the run's timing tree as JSON to a file, or to stderr for "-".
+    """
+    text = json.dumps(tracer.to_dict(), indent=2)
+    if dest == "-":
+        print(text, file=sys.stderr)
+    else:
+        Path(dest).write_text(text + "\n", encoding="utf-8")
+        print(f"Timing tree written to {dest}", file=sys.stderr)
+
+
 def main(argv: Optional[list[str]] = None):
+    global _recorder
+    argv = sys.argv[1:] if argv is None else argv
+    if "--startup-profile" in argv:
+        startup.PROFILE = startup.StartupProfile()
+        startup.PROFILE.add("process CPU before ff_agent.cli", _CLI_STARTED_CPU)
+        startup.PROFILE.add("import ff_agent.cli", _CLI_IMPORT_SEC)
+        startup.PROFILE.start_import_timer()
+    start = time.perf_counter()
     parser = build_parser()
     args = parser.parse_args(argv)
-    args.func(args)
+    startup.record("parse arguments", time.perf_counter() - start)
+    if args.record:
+        from .fixtures import FixtureArchive
+
+        _recorder = FixtureArchive.load(args.record) if args.record.exists() else FixtureArchive(args.record)
+    if args.profile or args.cprofile:
+        tracing.start(f"ff-agent {args.cmd}")
+    profiler = None
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        args.func(args)
+    finally:
+        startup.record(f"command {args.cmd}", time.perf_counter() - start)
+        from .notifier import close_notifications
+
+        notify_stats = close_notifications(args.notify_deadline)
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            print(f"cProfile stats written to {args.cprofile} (python -m pstats {args.cprofile})", file=sys.stderr)
+        tracer = tracing.stop()
+        if tracer is not None and args.profile:
+            write_profile(tracer, args.profile)
+        if notify_stats is not None and (
+            args.notify_stats or notify_stats.failed or notify_stats.persisted or notify_stats.skipped
+        ):
+            print(
+                f"Slack: {notify_stats.delivered} delivered in {notify_stats.posts} posts "
+                f"(avg latency {notify_stats.avg_latency_sec:.2f}s, max {notify_stats.max_latency_sec:.2f}s), "
+                f"{notify_stats.retries} retries, {notify_stats.failed} failed, {notify_stats.dropped} dropped, "
+                f"{notify_stats.persisted} saved for the next run, {notify_stats.skipped} unreadable outbox rows skipped",
+                file=sys.stderr,
+            )
+        if _recorder is not None:
+            path = _recorder.save()
+            print(f"Recorded {len(_recorder)} responses to {path}", file=sys.stderr)
+            _recorder = None
+        if startup.PROFILE is not None:
+            startup.PROFILE.stop_import_timer()
+            print("Startup profile:", file=sys.stderr)
+            for line in startup.PROFILE.lines():
+                print(f"  {line}", file=sys.stderr)
+            startup.PROFILE = None
+
+
+_CLI_IMPORT_SEC = time.perf_counter() - _CLI_IMPORT_STARTED
 
 
 if __name__ == "__main__":  # pragma: no cover
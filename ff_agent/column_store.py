@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import sys
+import tempfile
+import threading
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one writer per directory
+    fcntl = None  # type: ignore[assignment]
+
+
+# (inode, size, mtime) of a file, or None when it does not exist
+FileSignature = Optional[Tuple[int, int, int]]
+
+
+def _signature(path: Path) -> FileSignature:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class WeekColumn(Mapping[str, float]):
+    """
+    Read-only player_id -> value mapping over one memory-mapped float32 column.
+    Players missing from the column (or stored as NaN) are absent from the mapping.
+    """
+
+    def __init__(self, ordinals: Dict[str, int], ids: List[str], values: memoryview, _mm: Optional[mmap.mmap] = None):
+        self._ordinals = ordinals
+        self._ids = ids
+        self.values = values
+        self._mm = _mm
+        self._len: Optional[int] = None
+
+    def __getitem__(self, pid: str) -> float:
+        o = self._ordinals.get(pid)
+        if o is None or o >= len(self.values):
+            raise KeyError(pid)
+        value = self.values[o]
+        if value != value:  # NaN marks "no value"
+            raise KeyError(pid)
+        return value
+
+    def __contains__(self, pid: object) -> bool:
+        o = self._ordinals.get(pid)  # type: ignore[arg-type]
+        if o is None or o >= len(self.values):
+            return False
+        value = self.values[o]
+        return value == value
+
+    def __iter__(self) -> Iterator[str]:
+        values = self.values
+        for o in range(len(values)):
+            if values[o] == values[o]:
+                yield self._ids[o]
+
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = sum(1 for v in self.values if v == v)
+        return self._len
+
+
+class StatsMatrix:
+    """
+    Read-only players x stats float32 matrix for one week, memory-mapped. Row = player
+    ordinal, column = index into `keys`. Rows of players without a stats line are NaN;
+    stats missing from a present row are 0.
+    """
+
+    def __init__(self, ids: List[str], keys: List[str], values: memoryview, _mm: Optional[mmap.mmap] = None):
+        self.ids = ids
+        self.keys = keys
+        self.width = len(keys)
+        self.values = values
+        self._mm = _mm
+
+    @property
+    def rows(self) -> int:
+        return len(self.values) // self.width if self.width else 0
+
+    def row(self, ordinal: int) -> Optional[Dict[str, float]]:
+        base = ordinal * self.width
+        if ordinal >= self.rows or self.values[base] != self.values[base]:
+            return None
+        return {key: self.values[base + i] for i, key in enumerate(self.keys) if self.values[base + i]}
+
+
+class WeekColumnStore:
+    """
+    Directory of per-week float32 columns keyed by a persistent player ordinal.
+
+    Layout:
+      ids.txt        one player id per line; line number = ordinal (append-only)
+      meta.json      free-form metadata, including per-week entries under "weeks"
+      week_<n>.f32   float32 values in native byte order, NaN = no value
+      week_<n>.stats.f32  optional players x stats float32 matrix; its keys are in the week's meta
+
+    Columns written before a player was first seen are simply shorter, so adding
+    players never rewrites existing weeks. Reads are memory-mapped.
+
+    Several instances (in one process or several) may share a directory: writers hold an
+    exclusive flock on `.lock` and re-read ids.txt and meta.json before assigning ordinals
+    or touching metadata; readers hold a shared lock while they map a week and pick up
+    ids and metadata other writers added.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.ids: List[str] = []
+        self.ordinals: Dict[str, int] = {}
+        self.meta: Dict[str, Any] = {"byteorder": sys.byteorder, "weeks": {}}
+        self._ids_signature: FileSignature = None
+        self._meta_signature: FileSignature = None
+        self._refresh()
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        if exclusive:
+            self.root.mkdir(parents=True, exist_ok=True)
+        elif not self.root.exists():
+            yield
+            return
+        if fcntl is None:
+            yield
+            return
+        with open(self.root / ".lock", "a+b") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """
+        Re-reads ids.txt and meta.json when another instance replaced them. ids.txt only
+        grows, so the ids list and ordinals dict are extended in place and columns handed
+        out earlier stay valid.
+        """
+        ids_path = self.root / "ids.txt"
+        signature = _signature(ids_path)
+        if signature != self._ids_signature:
+            ids = ids_path.read_text(encoding="utf-8").split() if signature is not None else []
+            if ids[: len(self.ids)] == self.ids:
+                for pid in ids[len(self.ids) :]:
+                    self.ordinals[pid] = len(self.ids)
+                    self.ids.append(pid)
+            else:  # directory was reset underneath us
+                self.ids = ids
+                self.ordinals = {pid: o for o, pid in enumerate(ids)}
+            self._ids_signature = signature
+        meta_path = self.root / "meta.json"
+        signature = _signature(meta_path)
+        if signature != self._meta_signature:
+            meta: Dict[str, Any] = {"byteorder": sys.byteorder, "weeks": {}}
+            if signature is not None:
+                try:
+                    meta.update(json.loads(meta_path.read_text(encoding="utf-8")))
+                except ValueError:
+                    pass
+            self.meta = meta
+            self._meta_signature = signature
+
+    def _write_atomic(self, name: str, data: bytes) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=self.root)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.root / name)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _save_meta(self) -> None:
+        self._write_atomic("meta.json", json.dumps(self.meta, indent=2, sort_keys=True).encode("utf-8"))
+        self._meta_signature = _signature(self.root / "meta.json")
+
+    def week_meta(self, week: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return self.meta["weeks"].get(str(week))
+
+    def update_meta(self, **values: Any) -> None:
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            self.meta.update(values)
+            self._save_meta()
+
+    def write_week(
+        self,
+        week: int,
+        values: Mapping[str, float],
+        week_meta: Dict[str, Any],
+        stats: Optional[Mapping[str, Mapping[str, float]]] = None,
+    ) -> None:
+        """
+        Replaces a week's column (and its metadata) atomically. `stats` (player_id -> stat
+        -> value) is stored as the week's stats matrix; without it any old matrix is removed.
+        """
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            new_ids = [pid for pid in values if pid not in self.ordinals]
+            new_ids += [pid for pid in (stats or {}) if pid not in self.ordinals and pid not in values]
+            for pid in new_ids:
+                self.ordinals[pid] = len(self.ids)
+                self.ids.append(pid)
+            if new_ids:
+                self._write_atomic("ids.txt", ("\n".join(self.ids) + "\n").encode("utf-8"))
+                self._ids_signature = _signature(self.root / "ids.txt")
+            column = array("f", [math.nan]) * len(self.ids)
+            for pid, value in values.items():
+                column[self.ordinals[pid]] = value
+            self._write_atomic(f"week_{week}.f32", column.tobytes())
+            if stats:
+                keys = sorted({key for row in stats.values() for key in row})
+                index = {key: i for i, key in enumerate(keys)}
+                width = len(keys)
+                matrix = array("f", [math.nan]) * (len(self.ids) * width)
+                zeros = array("f", [0.0]) * width
+                for pid, row in stats.items():
+                    base = self.ordinals[pid] * width
+                    matrix[base : base + width] = zeros
+                    for key, value in row.items():
+                        matrix[base + index[key]] = value
+                self._write_atomic(f"week_{week}.stats.f32", matrix.tobytes())
+                week_meta = {**week_meta, "stat_keys": keys}
+            else:
+                (self.root / f"week_{week}.stats.f32").unlink(missing_ok=True)
+            self.meta["weeks"][str(week)] = week_meta
+            self._save_meta()
+
+    def write_week_meta(self, week: int, week_meta: Dict[str, Any]) -> None:
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            self.meta["weeks"][str(week)] = week_meta
+            self._save_meta()
+
+    def weeks(self) -> List[int]:
+        with self._lock:
+            self._refresh()
+            return sorted(int(w) for w in self.meta["weeks"])
+
+    def _map(self, name: str) -> Optional[Tuple[memoryview, Optional[mmap.mmap]]]:
+        path = self.root / name
+        if not path.exists():
+            return None
+        with path.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return memoryview(array("f")), None
+            if self.meta.get("byteorder", sys.byteorder) != sys.byteorder:
+                values = array("f")
+                values.frombytes(f.read())
+                values.byteswap()
+                return memoryview(values), None
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mm).cast("f"), mm
+
+    def column(self, week: int) -> Optional[WeekColumn]:
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            mapped = self._map(f"week_{week}.f32")
+            if mapped is None:
+                return None
+            return WeekColumn(self.ordinals, self.ids, *mapped)
+
+    def stats(self, week: int) -> Optional[StatsMatrix]:
+        # Keys and matrix are read under one lock so a concurrent rewrite cannot pair them wrongly
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            keys = (self.meta["weeks"].get(str(week)) or {}).get("stat_keys")
+            mapped = self._map(f"week_{week}.stats.f32") if keys else None
+            if mapped is None:
+                return None
+            return StatsMatrix(self.ids, keys, *mapped)
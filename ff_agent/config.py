@@ -16,6 +16,9 @@ class AgentConfig:
     season: Optional[int] = None
     league_id: Optional[str] = None
     slack_webhook_url: Optional[str] = None
+    players_cache_ttl_hours: Optional[float] = None
+    api_base_url: Optional[str] = None  # e.g. a local ReplayServer
+    api_rate_limit_per_min: Optional[float] = None  # client-side cap, default Sleeper's 1000; 0 disables
 
 
 def load_config(path: Path = DEFAULT_CONFIG_PATH) -> AgentConfig:
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from . import tracing
+from .lineup_optimizer import score_player
+from .player_index import PlayersLike, as_player_index
+from .waiver_agent import compute_roster_needs
+
+
+@dataclass
+class DraftChoice:
+    player_id: str
+    position: str
+    score: float
+    need: int  # open starting slots at this position on my roster before the pick
+
+
+@dataclass
+class DraftStats:
+    picks: int = 0
+    my_picks: int = 0
+    stale_pops: int = 0  # taken players discarded from heap tops
+    build_sec: float = 0.0
+    last_update_sec: float = 0.0
+    max_update_sec: float = 0.0
+    total_update_sec: float = 0.0
+
+    @property
+    def avg_update_sec(self) -> float:
+        return self.total_update_sec / self.picks if self.picks else 0.0
+
+
+class DraftBoard:
+    """
+    Best-available board for a live draft.
+
+    Every draftable player sits in one max-heap per fantasy position. A pick only marks the
+    player taken; taken players are popped lazily when they reach the top of a heap, so each
+    pick costs O(log n) amortized instead of re-ranking the pool. My roster needs come from
+    compute_roster_needs once and are adjusted as my own picks come in.
+    """
+
+    def __init__(
+        self,
+        players_index: PlayersLike,
+        proj_lookup: Mapping[str, float],
+        roster_positions: List[str],
+        taken: Iterable[str] = (),
+        my_player_ids: Iterable[str] = (),
+    ):
+        start = time.perf_counter()
+        self.players = as_player_index(players_index)
+        self.roster_positions = list(roster_positions)
+        self.taken: Set[str] = set(taken)
+        self.mine: List[str] = [str(pid) for pid in my_player_ids]
+        self.taken.update(self.mine)
+        self.stats = DraftStats()
+
+        # With projections only projected players are draftable; otherwise the heuristic ranks everyone
+        require_projection = len(proj_lookup) > 0
+        self.heaps: Dict[str, List[Tuple[float, str]]] = {}
+        for pid in self.players.ids:
+            if pid in self.taken or (require_projection and pid not in proj_lookup):
+                continue
+            pc = score_player(pid, self.players, proj_lookup)
+            if pc is None:
+                continue
+            for pos in pc.positions:
+                self.heaps.setdefault(pos, []).append((-pc.score, pid))
+        for heap in self.heaps.values():
+            heapq.heapify(heap)
+        self.needs = compute_roster_needs(self.roster_positions, self.mine, self.players)
+        self.stats.build_sec = time.perf_counter() - start
+
+    def _settle(self, pos: str) -> None:
+        heap = self.heaps.get(pos)
+        while heap and heap[0][1] in self.taken:
+            heapq.heappop(heap)
+            self.stats.stale_pops += 1
+
+    def apply_pick(self, player_id: str, mine: bool = False) -> float:
+        """
+        Records one pick and returns how long the board update took, in seconds.
+        """
+        start = time.perf_counter()
+        pid = str(player_id)
+        if pid not in self.taken:
+            self.taken.add(pid)
+            if mine:
+                self.mine.append(pid)
+                # Same bookkeeping as compute_roster_needs: only starting-slot positions are tracked
+                primary = self.players.primary_position(pid)
+                if primary in self.needs:
+                    self.needs[primary] -= 1
+                self.stats.my_picks += 1
+            for pos in self.players.positions(pid):
+                self._settle(pos)
+        elapsed = time.perf_counter() - start
+        stats = self.stats
+        stats.picks += 1
+        stats.last_update_sec = elapsed
+        stats.max_update_sec = max(stats.max_update_sec, elapsed)
+        stats.total_update_sec += elapsed
+        return elapsed
+
+    def best_available(self, pos: str, n: int = 1) -> List[Tuple[str, float]]:
+        """
+        Top n undrafted (player_id, score) at a position, best first.
+        """
+        heap = self.heaps.get(pos)
+        if not heap:
+            return []
+        found: List[Tuple[float, str]] = []
+        while heap and len(found) < n:
+            entry = heapq.heappop(heap)
+            if entry[1] in self.taken:
+                self.stats.stale_pops += 1
+                continue
+            found.append(entry)
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return [(pid, -neg) for neg, pid in found]
+
+    @tracing.traced("draft recommend")
+    def recommend(self, n: int = 5, per_position: int = 3) -> List[DraftChoice]:
+        """
+        Best available players for my next pick: positions with open starting slots first,
+        then by score. Considers the top per_position players at each starting-slot position.
+        """
+        seen: Set[str] = set()
+        choices: List[DraftChoice] = []
+        for pos, need in self.needs.items():
+            for pid, score in self.best_available(pos, per_position):
+                if pid in seen:
+                    continue
+                seen.add(pid)
+                choices.append(DraftChoice(player_id=pid, position=pos, score=score, need=need))
+        choices.sort(key=lambda c: (c.need > 0, c.score), reverse=True)
+        return choices[:n]
+
+
+def draft_total_picks(draft: Dict[str, Any]) -> Optional[int]:
+    settings = draft.get("settings") or {}
+    teams, rounds = settings.get("teams"), settings.get("rounds")
+    if teams and rounds:
+        return int(teams) * int(rounds)
+    return None
+
+
+def new_picks(picks: Iterable[Dict[str, Any]], after_pick_no: int) -> List[Dict[str, Any]]:
+    """
+    Picks made after after_pick_no that name a player, in draft order.
+    """
+    fresh = [p for p in picks if int(p.get("pick_no") or 0) > after_pick_no and p.get("player_id")]
+    fresh.sort(key=lambda p: int(p.get("pick_no") or 0))
+    return fresh
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from . import tracing
+
+
+@dataclass
+class FetchTask:
+    name: str
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+
+
+@dataclass
+class FetchPlan:
+    """
+    Small dependency graph of fetches. Each task's function receives the results of its
+    dependencies positionally, in declared order. Independent tasks run concurrently on a
+    thread pool; max_workers=1 runs them one after another in declaration order.
+    """
+
+    max_workers: int = 8
+    tasks: Dict[str, FetchTask] = field(default_factory=dict)
+    timings: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    def add(self, name: str, fn: Callable[..., Any], *deps: str) -> "FetchPlan":
+        if name in self.tasks:
+            raise ValueError(f"Duplicate fetch task: {name}")
+        for dep in deps:
+            if dep not in self.tasks:
+                raise ValueError(f"Task {name} depends on unknown task {dep}; declare dependencies first")
+        self.tasks[name] = FetchTask(name=name, fn=fn, deps=tuple(deps))
+        return self
+
+    def _call(self, task: FetchTask, args: List[Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            with tracing.span(f"task {task.name}"):
+                return task.fn(*args)
+        finally:
+            self.timings[task.name] = (start, time.perf_counter())
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Executes every task and returns name -> result. The first failure cancels whatever
+        has not started yet and is re-raised.
+        """
+        results: Dict[str, Any] = {}
+        if self.max_workers <= 1:
+            for task in self.tasks.values():
+                results[task.name] = self._call(task, [results[d] for d in task.deps])
+            return results
+
+        # Count unfinished dependencies per task so each completion only touches its dependents
+        waiting: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {}
+        ready: List[FetchTask] = []
+        for task in self.tasks.values():
+            waiting[task.name] = len(set(task.deps))
+            for dep in set(task.deps):
+                dependents.setdefault(dep, []).append(task.name)
+            if not task.deps:
+                ready.append(task)
+
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ff-fetch") as pool:
+            while ready or running:
+                for task in ready:
+                    # Run in a copy of this thread's context so task spans nest under the caller's
+                    ctx = contextvars.copy_context()
+                    running[pool.submit(ctx.run, self._call, task, [results[d] for d in task.deps])] = task.name
+                ready = []
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    exc = fut.exception()
+                    if exc is not None:
+                        for other in running:
+                            other.cancel()
+                        raise exc
+                    results[name] = fut.result()
+                    for child in dependents.get(name, ()):
+                        waiting[child] -= 1
+                        if waiting[child] == 0:
+                            ready.append(self.tasks[child])
+        return results
+
+    def elapsed_sec(self) -> float:
+        if not self.timings:
+            return 0.0
+        starts, ends = zip(*self.timings.values())
+        return max(ends) - min(starts)
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+import zipfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .transport import TokenBucket
+
+
+# Response headers kept in recordings and replayed
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+@dataclass
+class Fixture:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class FixtureArchive:
+    """
+    Recorded API responses keyed by request path and query (host-independent), stored as a
+    zip of index.json plus one body file per response.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else None
+        self.fixtures: Dict[str, Fixture] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+    def add(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        with self._lock:
+            self.fixtures[self.key_for(url)] = Fixture(status, dict(headers), body)
+
+    def add_json(self, path: str, data: Any, status: int = 200) -> None:
+        self.add(path, status, {"Content-Type": "application/json"}, json.dumps(data).encode("utf-8"))
+
+    def lookup(self, path_and_query: str) -> Optional[Fixture]:
+        """
+        Exact match first, then the same path with any query.
+        """
+        fixture = self.fixtures.get(path_and_query)
+        if fixture is None and "?" in path_and_query:
+            path = path_and_query.split("?", 1)[0]
+            fixture = self.fixtures.get(path) or next(
+                (f for k, f in self.fixtures.items() if k.split("?", 1)[0] == path), None
+            )
+        return fixture
+
+    def __len__(self) -> int:
+        return len(self.fixtures)
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        target = Path(path or self.path or "fixtures.zip")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            items = sorted(self.fixtures.items())
+        index = {}
+        tmp = target.with_name(f".{target.name}.tmp")
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for i, (key, fixture) in enumerate(items):
+                name = f"bodies/{i}"
+                zf.writestr(name, fixture.body)
+                index[key] = {"status": fixture.status, "headers": fixture.headers, "body": name}
+            zf.writestr("index.json", json.dumps(index, indent=1, sort_keys=True))
+        tmp.replace(target)
+        return target
+
+    @classmethod
+    def load(cls, path: Path) -> "FixtureArchive":
+        archive = cls(path)
+        with zipfile.ZipFile(path) as zf:
+            index = json.loads(zf.read("index.json"))
+            for key, meta in index.items():
+                archive.fixtures[key] = Fixture(meta["status"], meta.get("headers") or {}, zf.read(meta["body"]))
+        return archive
+
+
+class RecordingResponse:
+    """
+    Wraps a live response and adds its (decoded) body to an archive once fully read.
+    """
+
+    def __init__(self, resp: Any, archive: FixtureArchive, url: str):
+        self._resp = resp
+        self._archive = archive
+        self._url = url
+        self._chunks = []
+        self._done = False
+        self.status = resp.status
+        self.headers = resp.headers
+
+    def read(self, n: int = -1) -> bytes:
+        data = self._resp.read(n)
+        self._chunks.append(data)
+        if n < 0 or not data:
+            self._done = True
+        return data
+
+    def close(self) -> None:
+        if self._done:
+            headers = {h: self.headers.get(h) for h in RECORDED_HEADERS if self.headers.get(h)}
+            self._archive.add(self._url, self.status, headers, b"".join(self._chunks))
+            self._done = False
+        self._resp.close()
+
+    def __enter__(self) -> "RecordingResponse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+@dataclass
+class ReplayStats:
+    requests: int = 0
+    not_modified: int = 0
+    injected_errors: int = 0
+    throttled: int = 0
+    missing: int = 0
+    bytes_sent: int = 0
+    by_path: Dict[str, int] = field(default_factory=dict)
+
+
+class ReplayServer:
+    """
+    In-process HTTP stand-in for the Sleeper API that serves a FixtureArchive.
+
+    Adds latency (fixed plus uniform jitter), fails a share of requests with 503, and
+    throttles with 429 + Retry-After once a token bucket of rate_per_sec (burst `burst`)
+    runs dry. Honors If-None-Match and gzip like the real service.
+    """
+
+    def __init__(
+        self,
+        archive: FixtureArchive,
+        latency_sec: float = 0.0,
+        jitter_sec: float = 0.0,
+        error_rate: float = 0.0,
+        rate_per_sec: Optional[float] = None,
+        burst: int = 20,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.archive = archive
+        self.latency_sec = latency_sec
+        self.jitter_sec = jitter_sec
+        self.error_rate = error_rate
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.stats = ReplayStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bucket = TokenBucket(rate_per_sec, burst) if rate_per_sec else None
+        self._encoded: Dict[str, Tuple[str, bytes]] = {}  # key -> (etag, gzip body)
+        # Imported here: the client imports this module for recording, and http.server is slow to load
+        from http.server import ThreadingHTTPServer
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, name="ff-replay", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def stats_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return asdict(self.stats)
+
+    def _take_token(self) -> float:
+        """
+        Returns 0 when the request may proceed, else seconds until a token is available.
+        """
+        return self._bucket.try_take() if self._bucket is not None else 0.0
+
+    def _decide(self, key: str) -> Tuple[float, Optional[int], float]:
+        """
+        (delay, forced status or None, retry_after) for one request.
+        """
+        with self._lock:
+            self.stats.requests += 1
+            path = key.split("?", 1)[0]
+            self.stats.by_path[path] = self.stats.by_path.get(path, 0) + 1
+            delay = self.latency_sec + (self._rng.uniform(0.0, self.jitter_sec) if self.jitter_sec else 0.0)
+            wait = self._take_token()
+            if wait > 0:
+                self.stats.throttled += 1
+                return delay, 429, wait
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.stats.injected_errors += 1
+                return delay, 503, 0.0
+        return delay, None, 0.0
+
+    def _encoded_body(self, key: str, fixture: Fixture) -> Tuple[str, bytes]:
+        cached = self._encoded.get(key)
+        if cached is None:
+            etag = fixture.headers.get("ETag") or f'"{hashlib.sha1(fixture.body).hexdigest()}"'
+            cached = self._encoded[key] = (etag, gzip.compress(fixture.body, compresslevel=5))
+        return cached
+
+    def _handler_class(self):
+        from http.server import BaseHTTPRequestHandler
+
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Buffer so headers and body go out in one segment (avoids Nagle/delayed-ACK stalls)
+            wbufsize = -1
+
+            def _send(self, status: int, headers: Dict[str, str], body: bytes = b"") -> None:
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+                with replay._lock:
+                    replay.stats.bytes_sent += len(body)
+
+            def do_GET(self):
+                delay, forced, retry_after = replay._decide(self.path)
+                if delay > 0:
+                    time.sleep(delay)
+                if forced == 429:
+                    self._send(429, {"Retry-After": f"{retry_after:.3f}"})
+                    return
+                if forced is not None:
+                    self._send(forced, {})
+                    return
+                fixture = replay.archive.lookup(self.path)
+                if fixture is None:
+                    with replay._lock:
+                        replay.stats.missing += 1
+                    self._send(404, {})
+                    return
+                if fixture.status != 200:
+                    self._send(fixture.status, {})
+                    return
+                etag, gzipped = replay._encoded_body(self.path, fixture)
+                headers = {**fixture.headers, "ETag": etag}
+                if self.headers.get("If-None-Match") == etag:
+                    with replay._lock:
+                        replay.stats.not_modified += 1
+                    self._send(304, {"ETag": etag})
+                    return
+                if "gzip" in (self.headers.get("Accept-Encoding") or "") and len(gzipped) < len(fixture.body):
+                    self._send(200, {**headers, "Content-Encoding": "gzip"}, gzipped)
+                else:
+                    self._send(200, headers, fixture.body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
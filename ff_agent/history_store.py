@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .fetch_plan import FetchPlan
+from .sleeper_client import SleeperClient
+
+
+DEFAULT_HISTORY_PATH = Path(os.path.expanduser("~/.ff_agent/history.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    league_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    synced_at REAL NOT NULL,
+    final INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    PRIMARY KEY (league_id, kind, week)
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    league_id TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    transaction_id TEXT NOT NULL,
+    type TEXT,
+    status TEXT,
+    created INTEGER,
+    roster_ids TEXT,
+    PRIMARY KEY (league_id, transaction_id)
+);
+CREATE TABLE IF NOT EXISTS transaction_players (
+    league_id TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    transaction_id TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    roster_id INTEGER,
+    action TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transaction_players_player ON transaction_players (player_id, action);
+CREATE INDEX IF NOT EXISTS idx_transaction_players_roster ON transaction_players (league_id, roster_id);
+CREATE INDEX IF NOT EXISTS idx_transaction_players_week ON transaction_players (league_id, week);
+CREATE TABLE IF NOT EXISTS matchups (
+    league_id TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    roster_id INTEGER NOT NULL,
+    matchup_id INTEGER,
+    points REAL,
+    PRIMARY KEY (league_id, week, roster_id)
+);
+CREATE TABLE IF NOT EXISTS player_points (
+    league_id TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    roster_id INTEGER NOT NULL,
+    player_id TEXT NOT NULL,
+    points REAL,
+    starter INTEGER NOT NULL,
+    PRIMARY KEY (league_id, week, roster_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS idx_player_points_player ON player_points (player_id);
+CREATE INDEX IF NOT EXISTS idx_player_points_roster ON player_points (league_id, roster_id, week);
+"""
+
+KINDS = ("transactions", "matchups")
+
+
+@dataclass
+class SyncResult:
+    league_id: str
+    fetched: List[Tuple[str, int]]  # (kind, week)
+    skipped: int
+    rows: int
+    fetch_sec: float
+    write_sec: float
+
+
+class HistoryStore:
+    """
+    Local SQLite copy of leagues' per-week transactions and matchups.
+
+    sync_state is the watermark: a (league, kind, week) row marked final is never fetched
+    again. Weeks that had not finished when synced are re-fetched on the next sync and
+    their rows replaced.
+    """
+
+    def __init__(self, path: Path = DEFAULT_HISTORY_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def pending_weeks(self, league_id: str, kind: str, weeks: Iterable[int]) -> List[int]:
+        final = {
+            row["week"]
+            for row in self.conn.execute(
+                "SELECT week FROM sync_state WHERE league_id = ? AND kind = ? AND final = 1", (league_id, kind)
+            )
+        }
+        return [w for w in weeks if w not in final]
+
+    def sync(
+        self,
+        client: SleeperClient,
+        league_id: str,
+        weeks: Iterable[int],
+        current_week: Optional[int] = None,
+        force: bool = False,
+        max_workers: int = 8,
+        season_over: bool = False,
+    ) -> SyncResult:
+        """
+        Fetches the weeks not yet stored as final (all of them with force) concurrently, then
+        writes everything in one transaction. Weeks before current_week are stored as final,
+        and every week when season_over (the league's season ended before the current one).
+        """
+        weeks = list(weeks)
+        plan = FetchPlan(max_workers=max_workers)
+        todo: List[Tuple[str, int]] = []
+        for kind in KINDS:
+            pending = weeks if force else self.pending_weeks(league_id, kind, weeks)
+            for week in pending:
+                fetch = client.get_transactions if kind == "transactions" else client.get_matchups
+                plan.add(f"{kind}:{week}", lambda fetch=fetch, week=week: fetch(league_id, week) or [])
+                todo.append((kind, week))
+        skipped = len(weeks) * len(KINDS) - len(todo)
+
+        start = time.perf_counter()
+        results = plan.run() if todo else {}
+        fetch_sec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rows = 0
+        now = time.time()
+        with self.conn:
+            for kind, week in todo:
+                payload = results[f"{kind}:{week}"]
+                if kind == "transactions":
+                    count = self._write_transactions(league_id, week, payload)
+                else:
+                    count = self._write_matchups(league_id, week, payload)
+                final = season_over or (current_week is not None and week < current_week)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (league_id, kind, week, synced_at, final, rows) VALUES (?, ?, ?, ?, ?, ?)",
+                    (league_id, kind, week, now, int(final), count),
+                )
+                rows += count
+        return SyncResult(league_id, todo, skipped, rows, fetch_sec, time.perf_counter() - start)
+
+    def _write_transactions(self, league_id: str, week: int, txns: List[Dict[str, Any]]) -> int:
+        self.conn.execute("DELETE FROM transactions WHERE league_id = ? AND week = ?", (league_id, week))
+        self.conn.execute("DELETE FROM transaction_players WHERE league_id = ? AND week = ?", (league_id, week))
+        txn_rows = []
+        player_rows = []
+        for t in txns:
+            tid = str(t.get("transaction_id"))
+            txn_rows.append(
+                (league_id, week, tid, t.get("type"), t.get("status"), t.get("created"), json.dumps(t.get("roster_ids") or []))
+            )
+            for action in ("adds", "drops"):
+                for pid, roster_id in (t.get(action) or {}).items():
+                    player_rows.append((league_id, week, tid, str(pid), roster_id, action[:-1]))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO transactions (league_id, week, transaction_id, type, status, created, roster_ids) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            txn_rows,
+        )
+        self.conn.executemany(
+            "INSERT INTO transaction_players (league_id, week, transaction_id, player_id, roster_id, action) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            player_rows,
+        )
+        return len(txn_rows)
+
+    def _write_matchups(self, league_id: str, week: int, matchups: List[Dict[str, Any]]) -> int:
+        self.conn.execute("DELETE FROM matchups WHERE league_id = ? AND week = ?", (league_id, week))
+        self.conn.execute("DELETE FROM player_points WHERE league_id = ? AND week = ?", (league_id, week))
+        matchup_rows = []
+        point_rows = []
+        for m in matchups:
+            roster_id = m.get("roster_id")
+            matchup_rows.append((league_id, week, roster_id, m.get("matchup_id"), m.get("points")))
+            starters = set(str(pid) for pid in (m.get("starters") or []))
+            for pid, pts in (m.get("players_points") or {}).items():
+                point_rows.append((league_id, week, roster_id, str(pid), pts, int(str(pid) in starters)))
+        self.conn.executemany(
+            "INSERT INTO matchups (league_id, week, roster_id, matchup_id, points) VALUES (?, ?, ?, ?, ?)", matchup_rows
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO player_points (league_id, week, roster_id, player_id, points, starter) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            point_rows,
+        )
+        return len(matchup_rows)
+
+    # Queries
+    def player_transactions(self, player_id: str, action: Optional[str] = None, league_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Adds/drops of one player, oldest first. action is "add", "drop" or None for both.
+        """
+        sql = (
+            "SELECT tp.league_id, tp.week, tp.transaction_id, tp.roster_id, tp.action, t.type, t.status, t.created "
+            "FROM transaction_players tp JOIN transactions t "
+            "ON t.league_id = tp.league_id AND t.transaction_id = tp.transaction_id "
+            "WHERE tp.player_id = ?"
+        )
+        params: List[Any] = [str(player_id)]
+        if action:
+            sql += " AND tp.action = ?"
+            params.append(action)
+        if league_id:
+            sql += " AND tp.league_id = ?"
+            params.append(league_id)
+        sql += " ORDER BY t.created, tp.week"
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def points_by_roster(self, league_id: str) -> Dict[int, Dict[int, float]]:
+        """
+        roster_id -> week -> points.
+        """
+        result: Dict[int, Dict[int, float]] = {}
+        for row in self.conn.execute(
+            "SELECT roster_id, week, points FROM matchups WHERE league_id = ? ORDER BY roster_id, week", (league_id,)
+        ):
+            result.setdefault(row["roster_id"], {})[row["week"]] = row["points"]
+        return result
+
+    def player_points(self, player_id: str, league_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT league_id, week, roster_id, points, starter FROM player_points WHERE player_id = ?"
+        params: List[Any] = [str(player_id)]
+        if league_id:
+            sql += " AND league_id = ?"
+            params.append(league_id)
+        return [dict(row) for row in self.conn.execute(sql + " ORDER BY league_id, week", params)]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+# Fetch-plan building blocks shared by the CLI commands and the report runners. Like the
+# CLI, the heavier modules are imported where they are used.
+if TYPE_CHECKING:
+    from .fetch_plan import FetchPlan
+    from .sleeper_client import SleeperClient
+
+
+def resolve_week(state: Dict[str, Any]) -> int:
+    return int(state.get("week") or state.get("leg") or 1)
+
+
+def find_my_roster(user: Dict[str, Any], rosters: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    return next((r for r in rosters if r.get("owner_id") == user["user_id"]), None)
+
+
+def add_week_inputs(
+    plan: FetchPlan,
+    client: SleeperClient,
+    season: int,
+    week: str = "auto",
+    league: Optional[str] = None,
+    league_ids: Iterable[str] = (),
+) -> None:
+    """
+    Adds "state", "week" and "projections" to a plan. Projections come from the local
+    ProjectionStore (a memory-mapped week column), downloaded only when missing or stale.
+    With league (the name of a task returning a league, next to a "players" task) they are
+    scored with that league's scoring_settings. With league_ids it also adds
+    "league_projections": league id -> that league's scored points, shared by leagues with
+    the same settings; declare "players" and every "league:{id}" task before calling.
+    """
+    from .projection_store import ProjectionStore
+    from .scoring import compile_scoring
+
+    store = ProjectionStore(client, season)
+    plan.add("state", lambda: client.get_state("nfl"))
+    if week == "auto":
+        plan.add("week", resolve_week, "state")
+    else:
+        plan.add("week", lambda: int(week))
+
+    def fetch(week_num: int, state: Dict[str, Any]) -> Any:
+        return store.week(week_num, current_week=resolve_week(state))
+
+    if league is None:
+        plan.add("projections", fetch, "week", "state")
+    else:
+        plan.add("standard_projections", fetch, "week", "state")
+        plan.add(
+            "projections",
+            lambda column, week_num, lg, players: store.scored(
+                week_num, column, compile_scoring((lg or {}).get("scoring_settings")), players
+            ),
+            "standard_projections",
+            "week",
+            league,
+            "players",
+        )
+
+    league_ids = list(league_ids)
+    if not league_ids:
+        return
+
+    def score_leagues(column: Any, week_num: int, players: Any, *leagues: Any) -> Dict[str, Any]:
+        # compile_scoring hands leagues with equal settings the same instance
+        by_scoring: List[Tuple[Any, Any]] = []
+        result: Dict[str, Any] = {}
+        for lid, lg in zip(league_ids, leagues):
+            scoring = compile_scoring((lg or {}).get("scoring_settings"))
+            shared = next((points for known, points in by_scoring if known is scoring), None)
+            if shared is None:
+                shared = store.scored(week_num, column, scoring, players)
+                by_scoring.append((scoring, shared))
+            result[lid] = shared
+        return result
+
+    column_task = "projections" if league is None else "standard_projections"
+    plan.add("league_projections", score_leagues, column_task, "week", "players", *(f"league:{lid}" for lid in league_ids))
+
+
+def build_fetch_plan(
+    client: SleeperClient,
+    username: str,
+    league_id: str,
+    season: Optional[int] = None,
+    week: str = "auto",
+    refresh_players: bool = False,
+    trending: Optional[Tuple[int, int]] = None,
+    max_workers: int = 8,
+) -> FetchPlan:
+    """
+    Declares a command's inputs. Always: user, league, rosters, my_roster, players.
+    With a season: state, week and projections (scored with the league's settings).
+    With trending=(hours, limit): trending adds.
+    """
+    from .fetch_plan import FetchPlan
+
+    plan = FetchPlan(max_workers=max_workers)
+    plan.add("user", lambda: client.get_user(username))
+    plan.add("league", lambda: client.get_league(league_id))
+    plan.add("rosters", lambda: client.get_rosters(league_id))
+    plan.add("my_roster", find_my_roster, "user", "rosters")
+    plan.add("players", lambda: client.get_players_index("nfl", refresh=refresh_players))
+    if season is not None:
+        add_week_inputs(plan, client, season, week, league="league")
+    if trending is not None:
+        hours, limit = trending
+        plan.add("trending", lambda: client.get_trending_players("nfl", trend_type="add", hours=hours, limit=limit))
+    return plan
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Tuple
+
+
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+# Where "Expecting value" or a bad \uXXXX escape points when the value merely runs past the
+# end of the buffer: a cut-off number, literal or escape, or nothing but whitespace
+_PARTIAL_VALUE = re.compile(
+    r"[ \t\n\r]*(?:"
+    r"-?(?:\d+\.?\d*|\.\d*)?(?:[eE][-+]?\d*)?"
+    r"|t(?:ru?)?|f(?:a(?:ls?)?)?|n(?:ul?)?|N(?:a)?|-?I(?:n(?:f(?:i(?:n(?:i(?:ty?)?)?)?)?)?)?"
+    r"|u[0-9a-fA-F]{0,4}"
+    r")\Z"
+)
+# Where a missing delimiter or property name points in that case: whitespace, or the
+# fraction or exponent of a number the decoder stopped short of
+_PARTIAL_AFTER_TOKEN = re.compile(r"(?:[ \t\n\r]*|\.\d*(?:[eE][-+]?\d*)?|[eE][-+]?\d*)\Z")
+
+
+def _truncated(exc: json.JSONDecodeError) -> bool:
+    """
+    Whether more input could still fix the error, i.e. the text so far is a valid prefix.
+    """
+    if exc.msg.startswith("Unterminated string"):
+        return True
+    if exc.msg.startswith(("Expecting value", "Invalid \\uXXXX")):
+        return _PARTIAL_VALUE.match(exc.doc, exc.pos) is not None
+    return _PARTIAL_AFTER_TOKEN.match(exc.doc, exc.pos) is not None
+
+
+class _Scanner:
+    """
+    Incremental view over a byte stream: keeps only the unparsed tail of the text in memory.
+    """
+
+    def __init__(self, fp: BinaryIO, chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        text = self.decoder.decode(chunk, final=not chunk)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return bool(chunk)
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.fill():
+                break
+        return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise json.JSONDecodeError(f"Expecting {ch!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        while True:
+            self.peek()
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                # A value cut off at the chunk boundary: pull more and retry. Anything else is
+                # malformed whatever follows, so fail now instead of buffering to EOF.
+                if _truncated(exc) and self.fill():
+                    continue
+                raise
+            if end == len(self.buf) and self.fill():
+                # A bare number may continue in the next chunk
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_json_object(fp: BinaryIO, chunk_size: int = 1 << 16) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields (key, value) pairs of a top-level JSON object read incrementally from `fp`.
+    Only one member value is materialized at a time.
+    """
+    scanner = _Scanner(fp, chunk_size)
+    scanner.expect("{")
+    if scanner.peek() == "}":
+        return
+    while True:
+        key = scanner.value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting property name", scanner.buf, scanner.pos)
+        scanner.expect(":")
+        yield key, scanner.value()
+        ch = scanner.peek()
+        if ch == ",":
+            scanner.pos += 1
+        elif ch == "}":
+            return
+        else:
+            raise json.JSONDecodeError("Expecting ',' or '}'", scanner.buf, scanner.pos)
+
+
+def iter_projected_records(
+    fp: BinaryIO,
+    fields: Iterable[str],
+    chunk_size: int = 1 << 16,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streams a {id: record} JSON object, keeping only `fields` of each record.
+    """
+    fields = tuple(fields)
+    for key, record in iter_json_object(fp, chunk_size=chunk_size):
+        if not isinstance(record, dict):
+            continue
+        yield key, {f: record[f] for f in fields if f in record}
@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Set, Tuple, Union
 
+from . import tracing
+from .player_index import INJURY_BAD_STATUSES, PlayersLike, as_player_index
 
-INJURY_BAD_STATUSES = {"Out", "Doubtful", "IR", "Suspended", "PUP"}
+
+# Player positions each Sleeper roster slot accepts. Any other slot accepts the position of the same name.
+SLOT_ELIGIBILITY: Dict[str, FrozenSet[str]] = {
+    "FLEX": frozenset({"RB", "WR", "TE"}),
+    "WRRB_FLEX": frozenset({"RB", "WR"}),
+    "REC_FLEX": frozenset({"WR", "TE"}),
+    "SUPER_FLEX": frozenset({"QB", "RB", "WR", "TE"}),
+    "IDP_FLEX": frozenset({"DL", "LB", "DB"}),
+}
+NON_STARTING_SLOTS = {"BN", "IR", "TAXI"}
 
 
 @dataclass
@@ -13,20 +26,36 @@ class PlayerChoice:
     position: str
     score: float
     reason: str
+    positions: Tuple[str, ...] = ()
+
+
+def projection_points(row: Dict[str, Any]) -> Optional[float]:
+    # Sleeper projections commonly carry: player_id and pts_half_ppr / pts_ppr, either on the
+    # row itself or inside its "stats" object
+    stats = row.get("stats")
+    for source in (row, stats if isinstance(stats, dict) else {}):
+        for key in ("pts_ppr", "pts_half_ppr", "pts_std"):
+            if isinstance(source.get(key), (int, float)):
+                return float(source[key])
+    return None
 
 
-def build_projection_lookup(projections: Optional[List[Dict[str, Any]]]) -> Dict[str, float]:
+@tracing.traced("build_projection_lookup")
+def build_projection_lookup(
+    projections: Union[None, List[Dict[str, Any]], Mapping[str, float]]
+) -> Mapping[str, float]:
+    """
+    player_id -> projected points. A stored WeekColumn (or points already scored with league
+    settings, see ProjectionStore.scored) is such a lookup and is returned as-is.
+    """
+    if isinstance(projections, Mapping):
+        return projections
     if not projections:
         return {}
     result: Dict[str, float] = {}
     for row in projections:
-        # Sleeper projections commonly carry: player_id and pts_half_ppr / pts_ppr
         pid = str(row.get("player_id"))
-        pts = None
-        for key in ("pts_ppr", "pts_half_ppr", "pts_std"):
-            if isinstance(row.get(key), (int, float)):
-                pts = float(row[key])
-                break
+        pts = projection_points(row)
         if pid and pts is not None:
             result[pid] = pts
     return result
@@ -39,84 +68,295 @@ def is_injured(player: Dict[str, Any]) -> bool:
     return str(status) in INJURY_BAD_STATUSES
 
 
+def score_player(
+    pid: str, players: Any, proj_lookup: Mapping[str, float], history: Optional[Mapping[str, float]] = None
+) -> Optional[PlayerChoice]:
+    """
+    Scores one rostered player from projections, then from `history` (player_id -> expected
+    points from past weeks, see PointsStore.fallback_lookup), then health/depth heuristics.
+    `players` is a PlayerIndex (or as_player_index view). Returns None for players without a position.
+    """
+    positions = players.positions(pid)
+    if not positions:
+        return None
+    if pid in proj_lookup:
+        score = proj_lookup[pid]
+        reason = "projection"
+    elif history is not None and pid in history:
+        score = history[pid]
+        reason = "history"
+        if players.is_injured(pid):
+            score -= 100.0
+            reason = "injury"
+    else:
+        # Heuristic score: start with baseline per position, penalize injuries and depth
+        score = 0.0
+        reason = "heuristic"
+        if players.is_injured(pid):
+            score -= 100.0
+            reason = "injury"
+        # Prefer starters on depth chart
+        depth_order = players.depth_chart_order(pid)
+        if depth_order is not None:
+            score += max(0.0, 10.0 - float(depth_order))
+        # Slight bump for likely starters
+        if players.depth_chart_position(pid) == 1:
+            score += 2.0
+    return PlayerChoice(player_id=pid, position=positions[0], score=float(score), reason=reason, positions=positions)
+
+
+class LineupSolver:
+    """
+    Exact lineup assignment for one league's roster_positions.
+
+    Starting slots are grouped into slot types with capacities. Because a player's value does
+    not depend on which slot they fill, the feasible starter sets form a transversal matroid,
+    so taking players in descending score order and keeping each one that can still be matched
+    (found with an augmenting path over slot types) yields a maximum-weight lineup that fills as
+    many slots as possible.
+    """
+
+    def __init__(self, roster_positions: List[str]):
+        self.roster_positions = list(roster_positions)
+        self.slot_types: List[str] = []
+        self.capacity: List[int] = []
+        self.slot_indices: List[List[int]] = []
+        type_index: Dict[str, int] = {}
+        for idx, slot in enumerate(self.roster_positions):
+            if slot in NON_STARTING_SLOTS:
+                continue
+            t = type_index.get(slot)
+            if t is None:
+                t = type_index[slot] = len(self.slot_types)
+                self.slot_types.append(slot)
+                self.capacity.append(0)
+                self.slot_indices.append([])
+            self.capacity[t] += 1
+            self.slot_indices[t].append(idx)
+        self.total_slots = sum(self.capacity)
+        self._eligible_cache: Dict[Tuple[str, ...], Tuple[int, ...]] = {}
+
+    def eligible_types(self, positions: Tuple[str, ...]) -> Tuple[int, ...]:
+        """
+        Slot types a player with these positions may fill, narrowest first.
+        """
+        cached = self._eligible_cache.get(positions)
+        if cached is None:
+            eligible = [
+                t
+                for t, slot in enumerate(self.slot_types)
+                if any(p in SLOT_ELIGIBILITY.get(slot, (slot,)) for p in positions)
+            ]
+            eligible.sort(key=lambda t: len(SLOT_ELIGIBILITY.get(self.slot_types[t], (None,))))
+            cached = self._eligible_cache[positions] = tuple(eligible)
+        return cached
+
+    def _augment(self, ci: int, eligibles: List[Tuple[int, ...]], members: List[List[int]], visited: List[bool]) -> bool:
+        elig = eligibles[ci]
+        for t in elig:
+            if not visited[t] and len(members[t]) < self.capacity[t]:
+                visited[t] = True
+                members[t].append(ci)
+                return True
+        for t in elig:
+            if visited[t]:
+                continue
+            visited[t] = True
+            group = members[t]
+            for k, other in enumerate(group):
+                if self._augment(other, eligibles, members, visited):
+                    # `other` moved to another slot type; take its place here
+                    group.remove(other)
+                    group.insert(k, ci)
+                    return True
+        return False
+
+    def select(
+        self,
+        ranked: List[Tuple[int, ...]],
+        start: int = 0,
+        members: Optional[List[List[int]]] = None,
+    ) -> List[List[int]]:
+        """
+        `ranked` holds each candidate's eligible slot types, best candidate first.
+        Returns, per slot type, the candidate indices starting there.
+        To resume, pass the `members` state reached after ranked[:start] (it is not modified).
+        """
+        if members is None:
+            members = [[] for _ in self.slot_types]
+        else:
+            members = [list(group) for group in members]
+        filled = sum(len(group) for group in members)
+        for ci in range(start, len(ranked)):
+            if filled == self.total_slots:
+                break
+            if ranked[ci] and self._augment(ci, ranked, members, [False] * len(self.slot_types)):
+                filled += 1
+        return members
+
+    def prefix_states(self, ranked: List[Tuple[int, ...]]) -> Tuple[List[List[List[int]]], int]:
+        """
+        Runs select() once, recording the members state before each candidate.
+        Returns (states, full_at): states[i] is the state after ranked[:i]; full_at is the number
+        of candidates processed when every slot was filled (len(ranked) + 1 if never), so a
+        change at or beyond position full_at cannot alter the lineup.
+        """
+        members: List[List[int]] = [[] for _ in self.slot_types]
+        states = [[list(group) for group in members]]
+        filled = 0
+        for ci in range(len(ranked)):
+            if filled == self.total_slots:
+                return states, ci
+            if ranked[ci] and self._augment(ci, ranked, members, [False] * len(self.slot_types)):
+                filled += 1
+            states.append([list(group) for group in members])
+        if filled == self.total_slots:
+            return states, len(ranked)
+        return states, len(ranked) + 1
+
+    def solve(self, candidates: List[PlayerChoice]) -> Tuple[Dict[str, str], List[PlayerChoice]]:
+        """
+        Returns (starters_map, bench_choices) for scored candidates.
+        """
+        ranked = sorted(candidates, key=lambda pc: (-pc.score, pc.player_id))
+        members = self.select([self.eligible_types(pc.positions or (pc.position,)) for pc in ranked])
+
+        starters: Dict[int, str] = {}
+        taken: set[int] = set()
+        for t, group in enumerate(members):
+            # Within a slot type, fill slots in roster order by score
+            for idx, ci in zip(self.slot_indices[t], sorted(group)):
+                starters[idx] = ranked[ci].player_id
+                taken.add(ci)
+        starters_map = {
+            str(idx): starters.get(idx, "")
+            for idx, slot in enumerate(self.roster_positions)
+            if slot not in NON_STARTING_SLOTS
+        }
+        bench_choices = [pc for ci, pc in enumerate(ranked) if ci not in taken]
+        return starters_map, bench_choices
+
+
+@lru_cache(maxsize=64)
+def get_solver(roster_positions: Tuple[str, ...]) -> LineupSolver:
+    return LineupSolver(list(roster_positions))
+
+
+@tracing.traced("optimize_lineup")
 def optimize_lineup(
     roster_player_ids: List[str],
     roster_positions: List[str],  # e.g., ["QB","RB","RB","WR","WR","TE","FLEX","K","DEF"]
-    players_index: Dict[str, Dict[str, Any]],
-    projections: Optional[List[Dict[str, Any]]] = None,
+    players_index: PlayersLike,
+    projections: Union[None, List[Dict[str, Any]], Mapping[str, float]] = None,
+    proj_lookup: Optional[Mapping[str, float]] = None,
+    history: Optional[Mapping[str, float]] = None,
 ) -> Tuple[Dict[str, str], List[PlayerChoice]]:
     """
     Returns: (starters_map, bench_choices)
-    - starters_map: slot_index -> player_id chosen for that slot index
-    - bench_choices: sorted list of candidates with scores and reasons
+    - starters_map: slot_index -> player_id chosen for each starting slot (bench/IR/taxi slots omitted)
+    - bench_choices: remaining candidates sorted by score, with reasons
+    Pass a prebuilt proj_lookup instead of projections to skip rebuilding it. Players without
+    a projection are scored from `history` when it has them.
     """
-    proj_lookup = build_projection_lookup(projections)
+    if proj_lookup is None:
+        proj_lookup = build_projection_lookup(projections)
+    players = as_player_index(players_index)
+    candidates = []
+    for pid in roster_player_ids:
+        pc = score_player(pid, players, proj_lookup, history)
+        if pc is not None:
+            candidates.append(pc)
+    return get_solver(tuple(roster_positions)).solve(candidates)
 
-    # Build candidates by primary position
-    position_to_candidates: Dict[str, List[PlayerChoice]] = {}
-    flex_positions = {"RB", "WR", "TE"}
 
-    for pid in roster_player_ids:
-        pdata = players_index.get(pid) or {}
-        pos_list = pdata.get("fantasy_positions") or ([pdata.get("position")] if pdata.get("position") else [])
-        if not pos_list:
-            continue
-        primary = pos_list[0]
-        if primary == "DEF":
-            primary = "DEF"
-        # Scoring
-        if pid in proj_lookup:
-            score = proj_lookup[pid]
-            reason = "projection"
-        else:
-            # Heuristic score: start with baseline per position, penalize injuries and depth
-            score = 0.0
-            reason = "heuristic"
-            if is_injured(pdata):
-                score -= 100.0
-                reason = "injury"
-            # Prefer starters on depth chart
-            depth_order = pdata.get("depth_chart_order")
-            if isinstance(depth_order, int):
-                score += max(0.0, 10.0 - float(depth_order))
-            # Slight bump for likely starters
-            if pdata.get("depth_chart_position") == 1:
-                score += 2.0
-        pc = PlayerChoice(player_id=pid, position=primary, score=float(score), reason=reason)
-        position_to_candidates.setdefault(primary, []).append(pc)
-        # Add to FLEX bucket if eligible
-        if primary in flex_positions:
-            position_to_candidates.setdefault("FLEX", []).append(pc)
-
-    # Sort candidates per position by score desc
-    for plist in position_to_candidates.values():
-        plist.sort(key=lambda x: x.score, reverse=True)
-
-    # Allocate starters to each roster position sequentially
-    taken: set[str] = set()
-    starters: Dict[str, str] = {}
-
-    for idx, slot in enumerate(roster_positions):
-        pool = position_to_candidates.get(slot, [])
-        if slot == "FLEX":
-            pool = position_to_candidates.get("FLEX", [])
-        choice = None
-        for pc in pool:
-            if pc.player_id not in taken:
-                choice = pc
-                break
-        if choice is not None:
-            starters[str(idx)] = choice.player_id
-            taken.add(choice.player_id)
-        else:
-            starters[str(idx)] = ""
+@dataclass
+class RosterLineup:
+    league_id: str
+    roster_id: Any
+    owner_id: Optional[str]
+    starters: Dict[str, str]
+    scores: Dict[str, float]  # starter player_id -> score
+    projected_total: float
+    empty_slots: int
+
+
+# (league_id, roster_id, owner_id, scored candidates)
+_BatchJob = Tuple[str, Any, Optional[str], List[PlayerChoice]]
+
 
-    # Bench = all not taken
-    bench_choices: List[PlayerChoice] = []
-    for plist in position_to_candidates.values():
-        for pc in plist:
-            if pc.player_id not in taken and pc not in bench_choices:
-                bench_choices.append(pc)
-    bench_choices.sort(key=lambda x: x.score, reverse=True)
+def _solve_jobs(roster_positions: Tuple[str, ...], jobs: List[_BatchJob]) -> List[RosterLineup]:
+    solver = get_solver(roster_positions)
+    results: List[RosterLineup] = []
+    for league_id, roster_id, owner_id, candidates in jobs:
+        starters, _ = solver.solve(candidates)
+        by_id = {pc.player_id: pc.score for pc in candidates}
+        scores = {pid: by_id[pid] for pid in starters.values() if pid}
+        results.append(
+            RosterLineup(
+                league_id=league_id,
+                roster_id=roster_id,
+                owner_id=owner_id,
+                starters=starters,
+                scores=scores,
+                projected_total=sum(scores.values()),
+                empty_slots=sum(1 for pid in starters.values() if not pid),
+            )
+        )
+    return results
+
+
+@tracing.traced("optimize_league_lineups")
+def optimize_league_lineups(
+    leagues: List[Tuple[str, List[str], List[Dict[str, Any]]]],  # (league_id, roster_positions, rosters)
+    players_index: PlayersLike,
+    proj_lookup: Mapping[str, float],
+    processes: int = 1,
+    chunk_size: int = 256,
+    league_projections: Optional[Mapping[str, Mapping[str, float]]] = None,
+) -> List[RosterLineup]:
+    """
+    Optimizes every roster of one or more leagues in one pass. Each player is scored once
+    per projection lookup (even when rostered in several leagues); league_projections gives
+    a league its own lookup (points under its scoring) in place of proj_lookup. Solving is
+    optionally spread over a process pool, in chunks of rosters that share roster_positions.
+    A league listed twice is solved once.
+    """
+    players = as_player_index(players_index)
+    # One cache per distinct lookup; leagues with the same scoring share theirs
+    caches: Dict[int, Dict[str, Optional[PlayerChoice]]] = {}
+    jobs_by_positions: Dict[Tuple[str, ...], List[_BatchJob]] = {}
+    order: Dict[Tuple[str, Any], int] = {}
+    seen: Set[str] = set()
+    for league_id, roster_positions, rosters in leagues:
+        if league_id in seen:
+            continue
+        seen.add(league_id)
+        lookup = (league_projections or {}).get(league_id, proj_lookup)
+        scored = caches.setdefault(id(lookup), {})
+        jobs = jobs_by_positions.setdefault(tuple(roster_positions), [])
+        for roster in rosters:
+            candidates: List[PlayerChoice] = []
+            for raw_pid in roster.get("players") or []:
+                pid = str(raw_pid)
+                if pid not in scored:
+                    scored[pid] = score_player(pid, players, lookup)
+                pc = scored[pid]
+                if pc is not None:
+                    candidates.append(pc)
+            jobs.append((league_id, roster.get("roster_id"), roster.get("owner_id"), candidates))
+            order[(league_id, roster.get("roster_id"))] = len(order)
 
-    return starters, bench_choices
\ No newline at end of file
+    chunks = [
+        (positions, jobs[i : i + chunk_size])
+        for positions, jobs in jobs_by_positions.items()
+        for i in range(0, len(jobs), chunk_size)
+    ]
+    if processes <= 1 or len(chunks) <= 1:
+        results = [lineup for positions, chunk in chunks for lineup in _solve_jobs(positions, chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = pool.map(_solve_jobs, [positions for positions, _ in chunks], [chunk for _, chunk in chunks])
+            results = [lineup for part in parts for lineup in part]
+    # Chunks are grouped by roster_positions; restore input order
+    results.sort(key=lambda lineup: order[(lineup.league_id, lineup.roster_id)])
+    return results
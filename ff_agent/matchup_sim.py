@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import eq, gt, sub
+from statistics import NormalDist
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import tracing
+from .lineup_optimizer import optimize_lineup
+from .player_index import PlayersLike, as_player_index
+
+
+# Standard deviation of a player's weekly points as a fraction of the projection, by position
+POSITION_CV: Dict[str, float] = {
+    "QB": 0.35,
+    "RB": 0.50,
+    "WR": 0.55,
+    "TE": 0.60,
+    "K": 0.45,
+    "DEF": 0.65,
+    "DL": 0.60,
+    "LB": 0.50,
+    "DB": 0.60,
+}
+DEFAULT_CV = 0.55
+MIN_PLAYER_SD = 2.0
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+# Score percentiles are read off at most this many simulations (spread over all chunks)
+PERCENTILE_SAMPLE = 20_000
+
+# A player's outcome is one of this many equal-probability normal quantiles, picked by one
+# random byte, so a draw is a table lookup done by map() over randbytes() at C speed.
+# season_sim draws its weekly team scores from the same table.
+NORMAL_LEVELS = 256
+
+
+@dataclass
+class TeamProjection:
+    roster_id: Any
+    starters: List[str]
+    mean: float  # sum of the starters' projections
+    sd: float  # of the total, before flooring
+    # (projection, sd) per starter; a projection built without them is simulated as one normal
+    components: List[Tuple[float, float]] = field(default_factory=list)
+
+
+@dataclass
+class MatchupResult:
+    matchup_id: Any
+    team_a: TeamProjection
+    team_b: TeamProjection
+    win_prob_a: float
+    percentiles_a: Dict[int, float]  # percentile -> simulated points
+    percentiles_b: Dict[int, float]
+    margin_percentiles: Dict[int, float]  # team_a minus team_b
+
+    @property
+    def win_prob_b(self) -> float:
+        return 1.0 - self.win_prob_a
+
+
+@dataclass
+class WeekSimulation:
+    results: List[MatchupResult]
+    sims: int
+    elapsed_sec: float
+    byes: List[TeamProjection] = field(default_factory=list)
+
+    def for_roster(self, roster_id: Any) -> Optional[MatchupResult]:
+        return next((r for r in self.results if roster_id in (r.team_a.roster_id, r.team_b.roster_id)), None)
+
+
+def player_sd(position: Optional[str], projected: float) -> float:
+    return max(MIN_PLAYER_SD, POSITION_CV.get(position or "", DEFAULT_CV) * abs(projected))
+
+
+def team_projection(
+    roster_id: Any,
+    starters: Sequence[str],
+    players_index: PlayersLike,
+    proj_lookup: Mapping[str, float],
+) -> TeamProjection:
+    """
+    A lineup's per-starter outcome model: each starter is normal around their projection with
+    a position-specific spread. mean/sd describe the unfloored total (a normal, as used by
+    season_sim); simulate_matchups draws the starters one by one. Starters without a
+    projection contribute nothing.
+    """
+    players = as_player_index(players_index)
+    mean = 0.0
+    var = 0.0
+    kept: List[str] = []
+    components: List[Tuple[float, float]] = []
+    for pid in starters:
+        if not pid or pid == "0" or pid not in proj_lookup:
+            continue
+        pts = float(proj_lookup[pid])
+        sd = player_sd(players.primary_position(pid), pts)
+        mean += pts
+        var += sd * sd
+        kept.append(pid)
+        components.append((pts, sd))
+    return TeamProjection(roster_id=roster_id, starters=kept, mean=mean, sd=math.sqrt(var), components=components)
+
+
+def pair_matchups(matchups: List[Dict[str, Any]]) -> Tuple[List[Tuple[Any, Dict[str, Any], Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Groups /league/<id>/matchups/<week> rows by matchup_id.
+    Returns ([(matchup_id, entry_a, entry_b)], unpaired entries (byes)).
+    """
+    groups: Dict[Any, List[Dict[str, Any]]] = {}
+    unpaired: List[Dict[str, Any]] = []
+    for entry in matchups or []:
+        mid = entry.get("matchup_id")
+        if mid is None:
+            unpaired.append(entry)
+        else:
+            groups.setdefault(mid, []).append(entry)
+    pairs = []
+    for mid, entries in groups.items():
+        entries.sort(key=lambda e: e.get("roster_id") or 0)
+        if len(entries) == 2:
+            pairs.append((mid, entries[0], entries[1]))
+        else:
+            unpaired.extend(entries)
+    return pairs, unpaired
+
+
+@lru_cache(maxsize=1)
+def unit_normal_levels() -> Tuple[float, ...]:
+    """
+    Standard-normal quantiles at the midpoints of NORMAL_LEVELS equal-probability bins,
+    rescaled to unit variance (the midpoints alone understate the spread slightly).
+    """
+    inv_cdf = NormalDist().inv_cdf
+    levels = [inv_cdf((i + 0.5) / NORMAL_LEVELS) for i in range(NORMAL_LEVELS)]
+    scale = math.sqrt(math.fsum(z * z for z in levels) / NORMAL_LEVELS)
+    return tuple(z / scale for z in levels)
+
+
+def outcome_levels(projected: float, sd: float) -> List[float]:
+    """
+    The equally likely outcomes of one player: normal around the projection, floored at 0.
+    Negative projections (a defense expected to give up points) are left unfloored.
+    """
+    if projected < 0:
+        return [projected + sd * z for z in unit_normal_levels()]
+    return [max(0.0, projected + sd * z) for z in unit_normal_levels()]
+
+
+def team_levels(team: TeamProjection) -> List[List[float]]:
+    components = team.components or ([(team.mean, team.sd)] if team.mean or team.sd else [])
+    return [outcome_levels(pts, sd) for pts, sd in components]
+
+
+def _simulate_totals(n: int, levels: List[List[float]], randbytes: Any) -> List[float]:
+    """
+    n team totals: one lazy column of draws per starter, summed across starters per simulation.
+    """
+    if not levels:
+        return [0.0] * n
+    return list(map(sum, zip(*[map(table.__getitem__, randbytes(n)) for table in levels])))
+
+
+# Per matchup: (wins of a + half the ties, first `keep` totals of a, of b, of a - b)
+_ChunkResult = List[Tuple[float, List[float], List[float], List[float]]]
+
+
+def _draw_chunk(n: int, seed: int, keep: int, matchups: List[Tuple[List[List[float]], List[List[float]]]]) -> _ChunkResult:
+    """
+    Simulates n weeks of every matchup: each starter draws an outcome, the team total is
+    the sum. Returns win counts over all n and the first `keep` simulations of each
+    distribution for the percentiles (draws are i.i.d., so those are a fair sample).
+    """
+    randbytes = random.Random(seed).randbytes
+    result: _ChunkResult = []
+    for levels_a, levels_b in matchups:
+        a = _simulate_totals(n, levels_a, randbytes)
+        b = _simulate_totals(n, levels_b, randbytes)
+        wins = sum(map(gt, a, b)) + 0.5 * sum(map(eq, a, b))
+        result.append((wins, a[:keep], b[:keep], list(map(sub, a[:keep], b[:keep]))))
+    return result
+
+
+def _percentiles(samples: List[float]) -> Dict[int, float]:
+    """
+    PERCENTILES of a sample, linearly interpolated between order statistics.
+    """
+    if not samples:
+        return {p: 0.0 for p in PERCENTILES}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    result: Dict[int, float] = {}
+    for p in PERCENTILES:
+        pos = last * p / 100.0
+        lo = int(pos)
+        hi = min(lo + 1, last)
+        result[p] = ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+    return result
+
+
+def simulate_matchups(
+    pairs: List[Tuple[Any, TeamProjection, TeamProjection]],
+    sims: int = 100_000,
+    seed: int = 0,
+    processes: int = 1,
+    chunk_size: int = 100_000,
+) -> List[MatchupResult]:
+    """
+    Monte Carlo win probabilities and score distributions for (matchup_id, team_a, team_b) pairs.
+
+    Every simulation draws each starter's points independently (normal around the projection
+    with the position's spread, floored at 0; see outcome_levels) and sums them per team, so
+    the totals are skewed where a lineup leans on low projections, unlike a plain normal.
+    Draws are made in chunks with seeds derived from `seed` and the chunk number, so results
+    do not depend on `processes`.
+    """
+    matchups = [(team_levels(a), team_levels(b)) for _, a, b in pairs]
+    sizes = [min(chunk_size, sims - start) for start in range(0, sims, chunk_size)]
+    seeds = [seed * 1_000_003 + i for i in range(len(sizes))]
+    share = min(1.0, PERCENTILE_SAMPLE / sims) if sims else 0.0
+    keeps = [math.ceil(n * share) for n in sizes]
+    if processes <= 1 or len(sizes) <= 1:
+        parts = [_draw_chunk(n, s, k, matchups) for n, s, k in zip(sizes, seeds, keeps)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(sizes))) as pool:
+            parts = list(pool.map(_draw_chunk, sizes, seeds, keeps, [matchups] * len(sizes)))
+
+    results: List[MatchupResult] = []
+    for i, (mid, a, b) in enumerate(pairs):
+        chunks = [part[i] for part in parts]
+        wins = sum(c[0] for c in chunks)
+        results.append(
+            MatchupResult(
+                matchup_id=mid,
+                team_a=a,
+                team_b=b,
+                win_prob_a=wins / sims if sims else 0.5,
+                percentiles_a=_percentiles([v for c in chunks for v in c[1]]),
+                percentiles_b=_percentiles([v for c in chunks for v in c[2]]),
+                margin_percentiles=_percentiles([v for c in chunks for v in c[3]]),
+            )
+        )
+    return results
+
+
+@tracing.traced("simulate_week")
+def simulate_week(
+    matchups: List[Dict[str, Any]],
+    players_index: PlayersLike,
+    proj_lookup: Mapping[str, float],
+    roster_positions: Optional[List[str]] = None,
+    sims: int = 100_000,
+    seed: int = 0,
+    processes: int = 1,
+) -> WeekSimulation:
+    """
+    Simulates every head-to-head matchup of a week from the get_matchups payload. Each team
+    plays its set starters; a team with no starters set (and roster_positions given) is
+    simulated with its optimal lineup instead.
+    """
+    start = time.perf_counter()
+    players = as_player_index(players_index)
+
+    def project(entry: Dict[str, Any]) -> TeamProjection:
+        starters = [str(pid) for pid in (entry.get("starters") or []) if pid and str(pid) != "0"]
+        if not starters and roster_positions:
+            lineup, _ = optimize_lineup(
+                [str(pid) for pid in (entry.get("players") or [])], roster_positions, players, proj_lookup=proj_lookup
+            )
+            starters = [pid for pid in lineup.values() if pid]
+        return team_projection(entry.get("roster_id"), starters, players, proj_lookup)
+
+    pairs, unpaired = pair_matchups(matchups)
+    projected = [(mid, project(a), project(b)) for mid, a, b in pairs]
+    results = simulate_matchups(projected, sims=sims, seed=seed, processes=processes)
+    return WeekSimulation(
+        results=results,
+        sims=sims,
+        elapsed_sec=time.perf_counter() - start,
+        byes=[project(e) for e in unpaired],
+    )
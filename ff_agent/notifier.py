@@ -1,8 +1,25 @@
 from __future__ import annotations
 
+import http.client
 import json
-from typing import Iterable, Optional
-from urllib.request import Request, urlopen
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from urllib.error import HTTPError, URLError
+
+from . import tracing
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock; claiming the outbox by rename still keeps restores apart
+    fcntl = None  # type: ignore[assignment]
+
+
+DEFAULT_OUTBOX_PATH = Path(os.path.expanduser("~/.ff_agent/outbox.json"))
 
 
 def notify_console(title: str, lines: Iterable[str]) -> None:
@@ -11,14 +28,381 @@ def notify_console(title: str, lines: Iterable[str]) -> None:
         print(f"- {line}")
 
 
+def post_slack(webhook_url: str, text: str, timeout: float = 10.0) -> None:
+    """
+    One synchronous webhook POST; raises on any failure.
+    """
+    from urllib.request import Request, urlopen
+
+    payload = json.dumps({"text": text}).encode("utf-8")
+    req = Request(webhook_url, data=payload, headers={"Content-Type": "application/json"}, method="POST")
+    with urlopen(req, timeout=timeout) as resp:
+        _ = resp.read()
+
+
+def format_slack(title: str, lines: Iterable[str]) -> str:
+    return f"*{title}*\n" + "\n".join(f"• {line}" for line in lines)
+
+
+@dataclass
+class SlackMessage:
+    webhook_url: str
+    title: str
+    lines: List[str]
+    queued_at: float  # wall clock, so latency survives a restart
+    attempts: int = 0
+    not_before: float = 0.0
+
+
+@dataclass
+class DispatchStats:
+    queued: int = 0
+    restored: int = 0
+    delivered: int = 0
+    posts: int = 0
+    retries: int = 0
+    failed: int = 0  # gave up after max_attempts or a permanent error
+    dropped: int = 0  # evicted from a full queue
+    skipped: int = 0  # unreadable outbox rows
+    persisted: int = 0  # written to the outbox at exit
+    total_latency_sec: float = 0.0
+    max_latency_sec: float = 0.0
+
+    @property
+    def avg_latency_sec(self) -> float:
+        return self.total_latency_sec / self.delivered if self.delivered else 0.0
+
+
+class SlackDispatcher:
+    """
+    Background delivery of Slack webhook messages.
+
+    submit() never blocks: messages go to a bounded queue (the oldest is dropped when full)
+    drained by worker threads. Messages waiting for the same webhook are coalesced into one
+    POST of up to max_batch messages. Timeouts, connection errors, broken HTTP responses, 429
+    and 5xx are retried with exponential backoff (429 honors Retry-After); other 4xx, a
+    webhook URL urllib cannot use (unknown scheme, no host) and anything unexpected are
+    permanent. close() waits for the queue to drain until a deadline and writes whatever is
+    left to the outbox file, which the next dispatcher on the same path claims and sends first.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_queue: int = 256,
+        max_batch: int = 10,
+        max_attempts: int = 5,
+        backoff_sec: float = 1.0,
+        max_backoff_sec: float = 30.0,
+        timeout_sec: float = 10.0,
+        outbox_path: Optional[Path] = DEFAULT_OUTBOX_PATH,
+        post: Callable[[str, str, float], None] = post_slack,
+    ):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.backoff_sec = backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.timeout_sec = timeout_sec
+        self.outbox_path = Path(outbox_path) if outbox_path is not None else None
+        self.post = post
+        self.stats = DispatchStats()
+        self._queue: List[SlackMessage] = []
+        self._in_flight: List[List[SlackMessage]] = []  # batches being posted
+        self._persisted_in_flight: List[List[SlackMessage]] = []  # ...that close() saved to the outbox
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        self._stopping = False
+        self._restore()
+
+    # Producer side
+    def submit(self, webhook_url: Optional[str], title: str, lines: Iterable[str]) -> bool:
+        if not webhook_url:
+            return False
+        message = SlackMessage(webhook_url, title, list(lines), queued_at=time.time())
+        with self._cond:
+            if self._closed:
+                self.stats.dropped += 1
+                return False
+            self._enqueue(message)
+            self.stats.queued += 1
+            self._start_locked()
+            self._cond.notify()
+        return True
+
+    def _enqueue(self, message: SlackMessage) -> None:
+        if len(self._queue) >= self.max_queue:
+            self._queue.pop(0)
+            self.stats.dropped += 1
+        self._queue.append(message)
+
+    def _start_locked(self) -> None:
+        if self._threads or not self._queue:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"ff-notify-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    # Workers
+    def _next_batch(self) -> Optional[List[SlackMessage]]:
+        with self._cond:
+            while True:
+                if self._stopping:
+                    return None
+                now = time.time()
+                first = next((m for m in self._queue if m.not_before <= now), None)
+                if first is not None:
+                    break
+                wake = min((m.not_before for m in self._queue), default=None)
+                self._cond.wait(None if wake is None else max(0.0, wake - now))
+            batch = [m for m in self._queue if m.webhook_url == first.webhook_url and m.not_before <= now]
+            batch = batch[: self.max_batch]
+            taken = set(map(id, batch))
+            self._queue = [m for m in self._queue if id(m) not in taken]
+            self._in_flight.append(batch)
+            return batch
+
+    def _work(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._deliver(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = [b for b in self._in_flight if b is not batch]
+                    persisted = any(b is batch for b in self._persisted_in_flight)
+                    requeued = set(map(id, self._queue))
+                    settled = [m for m in batch if id(m) not in requeued] if persisted else []
+                    self._cond.notify_all()
+                if settled:
+                    # Saved by close() while this post was running; it is done now
+                    self._forget(settled)
+
+    def _deliver(self, batch: List[SlackMessage]) -> None:
+        text = "\n\n".join(format_slack(m.title, m.lines) for m in batch)
+        retry_after = None
+        try:
+            with tracing.span("slack post", messages=len(batch), bytes=len(text)):
+                self.post(batch[0].webhook_url, text, self.timeout_sec)
+        except HTTPError as exc:
+            retryable = exc.code == 429 or exc.code >= 500
+            if exc.code == 429 and exc.headers is not None:
+                try:
+                    retry_after = float(exc.headers.get("Retry-After") or 0) or None
+                except ValueError:
+                    retry_after = None
+        except URLError as exc:
+            # Socket-level failures arrive wrapped; a plain string reason is urllib
+            # rejecting the URL itself, which no retry will fix
+            retryable = isinstance(exc.reason, OSError)
+        except OSError:
+            retryable = True
+        except http.client.InvalidURL:
+            retryable = False
+        except http.client.HTTPException:
+            # A response cut short or garbled (IncompleteRead, BadStatusLine, ...)
+            retryable = True
+        except ValueError:
+            # Request() rejects a URL without a scheme with ValueError
+            retryable = False
+        except Exception:
+            # Anything else would end this worker and lose the batch uncounted
+            retryable = False
+        else:
+            now = time.time()
+            with self._cond:
+                self.stats.posts += 1
+                self.stats.delivered += len(batch)
+                for m in batch:
+                    latency = now - m.queued_at
+                    self.stats.total_latency_sec += latency
+                    self.stats.max_latency_sec = max(self.stats.max_latency_sec, latency)
+            return
+
+        with self._cond:
+            self.stats.posts += 1
+            now = time.time()
+            requeue = []
+            for m in batch:
+                m.attempts += 1
+                if not retryable or m.attempts >= self.max_attempts:
+                    self.stats.failed += 1
+                    continue
+                delay = retry_after or min(self.max_backoff_sec, self.backoff_sec * 2 ** (m.attempts - 1))
+                m.not_before = now + delay
+                requeue.append(m)
+            if requeue:
+                self.stats.retries += 1
+                # Ahead of newer messages so coalesced batches keep their order
+                self._queue[:0] = requeue
+                overflow = max(0, len(self._queue) - self.max_queue)
+                if overflow:
+                    del self._queue[:overflow]
+                    self.stats.dropped += overflow
+
+    # Shutdown
+    def flush(self, deadline_sec: float = 5.0) -> bool:
+        """
+        Waits until everything queued has been delivered or given up on, or until the
+        deadline (or until only retries scheduled past it remain). Returns whether the
+        queue drained.
+        """
+        deadline = time.time() + deadline_sec
+        with self._cond:
+            while self._queue or self._in_flight:
+                now = time.time()
+                if now >= deadline:
+                    return False
+                if not self._in_flight and min(m.not_before for m in self._queue) >= deadline:
+                    return False
+                self._cond.wait(deadline - now)
+            return True
+
+    @tracing.traced("slack flush")
+    def close(self, deadline_sec: float = 5.0) -> DispatchStats:
+        """
+        Stops accepting messages, flushes until the deadline and persists what is left,
+        including batches still being posted. Such a batch is taken out of the outbox again
+        if its post settles before the process exits; otherwise the next run resends it.
+        """
+        with self._cond:
+            self._closed = True
+        self.flush(deadline_sec)
+        with self._cond:
+            self._stopping = True
+            self._persisted_in_flight = list(self._in_flight)
+            left = [m for batch in self._in_flight for m in batch] + self._queue
+            self._queue = []
+            self._cond.notify_all()
+        self._persist(left)
+        return self.stats
+
+    def stats_dict(self) -> dict:
+        with self._cond:
+            return {**asdict(self.stats), "avg_latency_sec": self.stats.avg_latency_sec, "queued_now": len(self._queue)}
+
+    # Outbox
+    @contextmanager
+    def _outbox_lock(self) -> Iterator[None]:
+        self.outbox_path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self.outbox_path.with_name(f".{self.outbox_path.name}.lock"), "a+b") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _claim(self) -> List[Any]:
+        """
+        Takes the outbox's rows: the file is first renamed to a name only this dispatcher
+        uses, so two processes never both read (or one delete) the same rows.
+        """
+        claimed = self.outbox_path.with_name(f".{self.outbox_path.name}.{os.getpid()}.{id(self)}.claimed")
+        try:
+            os.rename(self.outbox_path, claimed)
+        except OSError:
+            return []
+        try:
+            rows = json.loads(claimed.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            rows = []
+        finally:
+            claimed.unlink(missing_ok=True)
+        return rows if isinstance(rows, list) else []
+
+    def _write(self, rows: List[Any]) -> None:
+        if not rows:
+            return
+        tmp = self.outbox_path.with_name(f".{self.outbox_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(rows), encoding="utf-8")
+        tmp.replace(self.outbox_path)
+
+    @staticmethod
+    def _row(m: SlackMessage) -> Dict[str, Any]:
+        return {"webhook_url": m.webhook_url, "title": m.title, "lines": m.lines, "queued_at": m.queued_at, "attempts": m.attempts}
+
+    def _restore(self) -> None:
+        if self.outbox_path is None or not self.outbox_path.exists():
+            return
+        with self._outbox_lock():
+            rows = self._claim()
+        for row in rows:
+            try:
+                message = SlackMessage(
+                    str(row["webhook_url"]),
+                    str(row["title"]),
+                    [str(line) for line in row["lines"]],
+                    float(row["queued_at"]),
+                    int(row.get("attempts", 0)),
+                )
+            except (KeyError, TypeError, ValueError, AttributeError):
+                self.stats.skipped += 1
+                continue
+            self._enqueue(message)
+        self.stats.restored = len(self._queue)
+        self._start_locked()
+
+    def _persist(self, messages: List[SlackMessage]) -> None:
+        if self.outbox_path is None or not messages:
+            return
+        with self._outbox_lock():
+            # Keep rows another process saved since we started
+            self._write(self._claim() + [self._row(m) for m in messages])
+        self.stats.persisted = len(messages)
+
+    def _forget(self, messages: List[SlackMessage]) -> None:
+        if self.outbox_path is None:
+            return
+        done = {(m.webhook_url, m.title, m.queued_at) for m in messages}
+        with self._outbox_lock():
+            rows = self._claim()
+            self._write(
+                [r for r in rows if not isinstance(r, dict) or (r.get("webhook_url"), r.get("title"), r.get("queued_at")) not in done]
+            )
+        with self._cond:
+            self.stats.persisted -= len(messages)
+
+
+# Process-wide dispatcher used by notify_slack; created on first use
+_dispatcher: Optional[SlackDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> SlackDispatcher:
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = SlackDispatcher()
+        return _dispatcher
+
+
 def notify_slack(webhook_url: Optional[str], title: str, lines: Iterable[str]) -> None:
+    """
+    Queues a message for background delivery; see close_notifications.
+    """
     if not webhook_url:
         return
-    text = f"*{title}*\n" + "\n".join(f"• {line}" for line in lines)
-    payload = json.dumps({"text": text}).encode("utf-8")
-    try:
-        req = Request(webhook_url, data=payload, headers={"Content-Type": "application/json"}, method="POST")
-        with urlopen(req, timeout=10) as resp:
-            _ = resp.read()
-    except Exception:
-        pass
\ No newline at end of file
+    get_dispatcher().submit(webhook_url, title, lines)
+
+
+def close_notifications(deadline_sec: float = 5.0) -> Optional[DispatchStats]:
+    """
+    Flushes and closes the process-wide dispatcher. Also starts one when an outbox from an
+    earlier run is waiting, so undelivered messages go out even if nothing new was sent.
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is None:
+        if not DEFAULT_OUTBOX_PATH.exists():
+            return None
+        dispatcher = SlackDispatcher()
+    return dispatcher.close(deadline_sec)
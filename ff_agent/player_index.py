@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+
+INJURY_BAD_STATUSES = {"Out", "Doubtful", "IR", "Suspended", "PUP"}
+
+# Raw Sleeper fields the agents read; everything else in the players dump is dropped
+PLAYER_FIELDS = (
+    "first_name",
+    "last_name",
+    "position",
+    "fantasy_positions",
+    "team",
+    "injury_status",
+    "status",
+    "depth_chart_order",
+    "depth_chart_position",
+)
+
+_NO_POSITIONS: Tuple[str, ...] = ()
+
+# Snapshot file: magic, u32 header length, JSON header, then the raw sections it lists
+SNAPSHOT_MAGIC = b"FFPI"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_COLUMNS = ("primary", "team", "injury", "status", "depth_order", "depth_pos")
+
+
+def _player_positions(pdata: Dict[str, Any]) -> Tuple[str, ...]:
+    pos_list = pdata.get("fantasy_positions") or ([pdata.get("position")] if pdata.get("position") else [])
+    return tuple(p for p in pos_list if p)
+
+
+class PlayerIndex:
+    """
+    Compact, column-oriented view of the Sleeper players dump.
+
+    Each player gets an integer ordinal; per-player fields live in parallel columns.
+    Small-cardinality values (positions, teams, statuses) are stored as array('H') codes
+    into a shared symbol table, and position lists are shared interned tuples, so lookups
+    return existing objects instead of allocating.
+    """
+
+    __slots__ = (
+        "ids",
+        "_ordinals",
+        "_names",
+        "_positions",
+        "_primary",
+        "_team",
+        "_injury",
+        "_status",
+        "_depth_order",
+        "_depth_pos",
+        "_symbols",
+        "_symbol_codes",
+        "_position_tuples",
+    )
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self._ordinals: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._positions: List[Tuple[str, ...]] = []
+        self._primary = array("H")
+        self._team = array("H")
+        self._injury = array("H")
+        self._status = array("H")
+        self._depth_order = array("h")
+        self._depth_pos = array("H")
+        # Code 0 is reserved for "missing"
+        self._symbols: List[Optional[Hashable]] = [None]
+        self._symbol_codes: Dict[Hashable, int] = {}
+        self._position_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    @classmethod
+    def from_players(cls, players: Dict[str, Dict[str, Any]]) -> "PlayerIndex":
+        return cls.from_records(players.items())
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Dict[str, Any]]]) -> "PlayerIndex":
+        index = cls()
+        for pid, pdata in records:
+            index.add(str(pid), pdata or {})
+        return index
+
+    def _code(self, value: Any) -> int:
+        if value is None or value == "" or not isinstance(value, Hashable):
+            return 0
+        if isinstance(value, str):
+            value = sys.intern(value)
+        code = self._symbol_codes.get(value)
+        if code is None:
+            code = len(self._symbols)
+            self._symbols.append(value)
+            self._symbol_codes[value] = code
+        return code
+
+    def add(self, pid: str, pdata: Dict[str, Any]) -> int:
+        """
+        Appends (or replaces) a player from a raw Sleeper record. Returns its ordinal.
+        """
+        positions = tuple(sys.intern(p) for p in _player_positions(pdata))
+        positions = self._position_tuples.setdefault(positions, positions)
+        name = f"{pdata.get('first_name') or ''} {pdata.get('last_name') or ''}".strip()
+        depth_order = pdata.get("depth_chart_order")
+        if not isinstance(depth_order, int) or not -1 < depth_order < 32768:
+            depth_order = -1
+        row = (
+            self._code(positions[0] if positions else None),
+            self._code(pdata.get("team")),
+            self._code(pdata.get("injury_status")),
+            self._code(pdata.get("status")),
+            depth_order,
+            self._code(pdata.get("depth_chart_position")),
+        )
+
+        ordinal = self._ordinals.get(pid)
+        if ordinal is None:
+            ordinal = len(self.ids)
+            pid = sys.intern(pid)
+            self.ids.append(pid)
+            self._ordinals[pid] = ordinal
+            self._names.append(name)
+            self._positions.append(positions)
+            for column, value in zip(self._columns(), row):
+                column.append(value)
+        else:
+            self._names[ordinal] = name
+            self._positions[ordinal] = positions
+            for column, value in zip(self._columns(), row):
+                column[ordinal] = value
+        return ordinal
+
+    def _columns(self) -> Tuple[array, ...]:
+        return (self._primary, self._team, self._injury, self._status, self._depth_order, self._depth_pos)
+
+    # Binary snapshot
+    def save_snapshot(self, path: Path, source: str = "") -> None:
+        """
+        Writes the index as one binary file: columns as raw arrays, strings newline-joined.
+        `source` identifies what the index was built from; load_snapshot checks it.
+        """
+        tuples = list(self._position_tuples.values())
+        tuple_codes = {id(t): i for i, t in enumerate(tuples)}
+        sections = [
+            ("ids", "\n".join(self.ids).encode("utf-8")),
+            ("names", "\n".join(n.replace("\n", " ") for n in self._names).encode("utf-8")),
+            ("symbols", json.dumps(self._symbols[1:]).encode("utf-8")),
+            ("position_tuples", json.dumps(tuples).encode("utf-8")),
+            ("positions", array("H", (tuple_codes[id(t)] for t in self._positions)).tobytes()),
+        ]
+        sections += [(name, column.tobytes()) for name, column in zip(_SNAPSHOT_COLUMNS, self._columns())]
+        layout, offset = [], 0
+        for name, data in sections:
+            layout.append([name, offset, len(data)])
+            offset += len(data)
+        header = json.dumps(
+            {"version": SNAPSHOT_VERSION, "byteorder": sys.byteorder, "source": source, "count": len(self.ids), "sections": layout}
+        ).encode("utf-8")
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with tmp.open("wb") as f:
+            f.write(SNAPSHOT_MAGIC + struct.pack("<I", len(header)) + header)
+            for _, data in sections:
+                f.write(data)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load_snapshot(cls, path: Path, source: Optional[str] = None) -> Optional["PlayerIndex"]:
+        """
+        Reads a save_snapshot file through mmap; each column is one memcpy. Returns None when
+        the file is missing, unreadable, or (given `source`) was built from something else.
+        """
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:4] != SNAPSHOT_MAGIC:
+                    return None
+                (header_len,) = struct.unpack("<I", mm[4:8])
+                header = json.loads(mm[8 : 8 + header_len])
+                if header.get("version") != SNAPSHOT_VERSION or (source is not None and header.get("source") != source):
+                    return None
+                base = 8 + header_len
+                raw = {name: mm[base + off : base + off + length] for name, off, length in header["sections"]}
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+
+        count = header["count"]
+        swap = header.get("byteorder") != sys.byteorder
+        index = cls()
+        index.ids = [sys.intern(pid) for pid in raw["ids"].decode("utf-8").split("\n")] if count else []
+        index._ordinals = dict(zip(index.ids, range(count)))
+        index._names = raw["names"].decode("utf-8").split("\n") if count else []
+        symbols = [sys.intern(v) if isinstance(v, str) else tuple(v) if isinstance(v, list) else v for v in json.loads(raw["symbols"])]
+        index._symbols = [None, *symbols]
+        index._symbol_codes = {v: code for code, v in enumerate(index._symbols) if code}
+        tuples = [tuple(sys.intern(p) for p in t) for t in json.loads(raw["position_tuples"])]
+        index._position_tuples = {t: t for t in tuples}
+        codes = array("H")
+        for name, column in zip(("positions", *_SNAPSHOT_COLUMNS), (codes, *index._columns())):
+            column.frombytes(raw[name])
+            if swap:
+                column.byteswap()
+        index._positions = [tuples[c] for c in codes]
+        if not len(index._names) == len(index._positions) == len(index._primary) == count:
+            return None
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, pid: object) -> bool:
+        return pid in self._ordinals
+
+    def ordinal(self, pid: str) -> int:
+        """
+        Returns the player's integer ordinal, or -1 when unknown.
+        """
+        return self._ordinals.get(pid, -1)
+
+    # Per-player accessors. Unknown ids behave like an empty Sleeper record.
+    def positions(self, pid: str) -> Tuple[str, ...]:
+        o = self._ordinals.get(pid)
+        return _NO_POSITIONS if o is None else self._positions[o]
+
+    def primary_position(self, pid: str) -> Optional[str]:
+        o = self._ordinals.get(pid)
+        return None if o is None else self._symbols[self._primary[o]]
+
+    def name(self, pid: str) -> str:
+        o = self._ordinals.get(pid)
+        return "" if o is None else self._names[o]
+
+    def team(self, pid: str) -> Optional[str]:
+        o = self._ordinals.get(pid)
+        return None if o is None else self._symbols[self._team[o]]
+
+    def injury_status(self, pid: str) -> Optional[str]:
+        o = self._ordinals.get(pid)
+        return None if o is None else self._symbols[self._injury[o]]
+
+    def status(self, pid: str) -> Optional[str]:
+        o = self._ordinals.get(pid)
+        return None if o is None else self._symbols[self._status[o]]
+
+    def depth_chart_order(self, pid: str) -> Optional[int]:
+        o = self._ordinals.get(pid)
+        if o is None:
+            return None
+        value = self._depth_order[o]
+        return None if value < 0 else value
+
+    def depth_chart_position(self, pid: str) -> Any:
+        o = self._ordinals.get(pid)
+        return None if o is None else self._symbols[self._depth_pos[o]]
+
+    def is_injured(self, pid: str) -> bool:
+        o = self._ordinals.get(pid)
+        if o is None:
+            return False
+        status = self._symbols[self._injury[o]] or self._symbols[self._status[o]]
+        return status in INJURY_BAD_STATUSES
+
+    def injury_changes(self, previous: "PlayerIndex") -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        (player_id, previous injury_status, current injury_status) for every player whose
+        status differs from `previous`, including new players listed with a status.
+        Compares the code columns directly when both indexes share ordinals and symbols.
+        """
+        same_ids = previous.ids == self.ids
+        if same_ids and previous._symbols == self._symbols and previous._injury == self._injury:
+            return []
+        # previous code -> code in this index (0 when the symbol never occurs here)
+        translate = [self._symbol_codes.get(symbol, 0) if symbol is not None else 0 for symbol in previous._symbols]
+        translate[0] = 0
+        changes: List[Tuple[str, Optional[str], Optional[str]]] = []
+        current, before = self._injury, previous._injury
+        symbols, previous_symbols = self._symbols, previous._symbols
+        for o, pid in enumerate(self.ids):
+            if same_ids:
+                p = o
+            else:
+                p = previous._ordinals.get(pid, -1)
+            old_code = before[p] if p >= 0 else 0
+            if translate[old_code] != current[o] or (old_code and not translate[old_code]):
+                changes.append((pid, previous_symbols[old_code], symbols[current[o]]))
+        return changes
+
+    # Ordinal-based access for bulk passes
+    def primary_position_at(self, ordinal: int) -> Optional[str]:
+        return self._symbols[self._primary[ordinal]]
+
+    def positions_at(self, ordinal: int) -> Tuple[str, ...]:
+        return self._positions[ordinal]
+
+
+class _DictPlayers:
+    """
+    Adapter exposing the PlayerIndex accessors over a raw players dict, without copying it.
+    """
+
+    __slots__ = ("players",)
+
+    def __init__(self, players: Dict[str, Dict[str, Any]]):
+        self.players = players
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self.players)
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def __contains__(self, pid: object) -> bool:
+        return pid in self.players
+
+    def _get(self, pid: str) -> Dict[str, Any]:
+        return self.players.get(pid) or {}
+
+    def positions(self, pid: str) -> Tuple[str, ...]:
+        return _player_positions(self._get(pid))
+
+    def primary_position(self, pid: str) -> Optional[str]:
+        positions = self.positions(pid)
+        return positions[0] if positions else None
+
+    def name(self, pid: str) -> str:
+        pdata = self._get(pid)
+        return f"{pdata.get('first_name') or ''} {pdata.get('last_name') or ''}".strip()
+
+    def team(self, pid: str) -> Optional[str]:
+        return self._get(pid).get("team") or None
+
+    def injury_status(self, pid: str) -> Optional[str]:
+        return self._get(pid).get("injury_status") or None
+
+    def status(self, pid: str) -> Optional[str]:
+        return self._get(pid).get("status") or None
+
+    def depth_chart_order(self, pid: str) -> Optional[int]:
+        value = self._get(pid).get("depth_chart_order")
+        return value if isinstance(value, int) else None
+
+    def depth_chart_position(self, pid: str) -> Any:
+        return self._get(pid).get("depth_chart_position")
+
+    def is_injured(self, pid: str) -> bool:
+        pdata = self._get(pid)
+        status = pdata.get("injury_status") or pdata.get("status")
+        return bool(status) and str(status) in INJURY_BAD_STATUSES
+
+
+PlayersLike = Union[PlayerIndex, Dict[str, Dict[str, Any]]]
+
+
+def as_player_index(players: PlayersLike) -> Union[PlayerIndex, _DictPlayers]:
+    """
+    Accepts either a PlayerIndex or the raw players dict and returns an object with the
+    PlayerIndex accessor methods.
+    """
+    if isinstance(players, (PlayerIndex, _DictPlayers)):
+        return players
+    return _DictPlayers(players or {})
+
+
+def format_player(players: PlayersLike, pid: str) -> str:
+    view = as_player_index(players)
+    pid = str(pid)
+    name = view.name(pid) or pid
+    pos = view.primary_position(pid) or "-"
+    team = view.team(pid) or "-"
+    return f"{name} ({pos} {team})"
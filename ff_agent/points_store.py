@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import tracing
+from .column_store import WeekColumnStore
+from .fetch_plan import FetchPlan
+from .sleeper_client import SleeperClient
+
+
+DEFAULT_POINTS_DIR = Path(os.path.expanduser("~/.ff_agent/points"))
+DEFAULT_LAST_WEEK = 18
+
+
+def column_key(season: int, week: int) -> int:
+    """
+    Column number for a (season, week): 2024 week 3 -> 202403, so keys sort chronologically.
+    """
+    return season * 100 + week
+
+
+@dataclass
+class PlayerPoints:
+    player_id: str
+    games: int
+    mean: float
+    stdev: float
+    floor: float  # 20th percentile week
+    ceiling: float  # 80th percentile week
+    recent_mean: float  # mean of the last `recent` games
+    trend: float  # recent_mean - mean
+
+    @property
+    def expected(self) -> float:
+        """
+        Fallback weekly score: the season-long mean pulled halfway toward recent form.
+        """
+        return (self.mean + self.recent_mean) / 2.0
+
+
+@dataclass
+class BackfillResult:
+    league_ids: List[str]
+    fetched: List[Tuple[int, int]]  # (season, week)
+    skipped: int
+    rows: int
+    fetch_sec: float
+    write_sec: float
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    pos = q * (len(ordered) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class PointsStore:
+    """
+    Actual fantasy points per player and week for one league and its previous seasons,
+    taken from the matchups' players_points (so scored with that league's settings).
+
+    Columns live in a WeekColumnStore keyed by column_key(season, week): one memory-mapped
+    float32 column per week over a shared player ordinal, NaN where the player was not on a
+    roster. Weeks of past seasons, and weeks before the current one, are final and never
+    fetched again.
+    """
+
+    def __init__(self, league_id: str, root: Path = DEFAULT_POINTS_DIR):
+        self.league_id = league_id
+        self.columns = WeekColumnStore(Path(root) / str(league_id))
+
+    def keys(self) -> List[int]:
+        return self.columns.weeks()
+
+    def is_final(self, season: int, week: int) -> bool:
+        meta = self.columns.week_meta(column_key(season, week))
+        return bool(meta and meta.get("final"))
+
+    @tracing.traced("points backfill")
+    def backfill(
+        self,
+        client: SleeperClient,
+        seasons: int = 3,
+        current: Optional[Tuple[int, int]] = None,
+        force: bool = False,
+        max_workers: int = 8,
+    ) -> BackfillResult:
+        """
+        Fetches matchups for every week of this league and up to seasons - 1 previous
+        seasons (following previous_league_id) that is not stored as final. current is
+        (season, week) of the live NFL state: that week and later ones are skipped.
+        """
+        chain: List[Dict[str, Any]] = []
+        league_id: Optional[str] = self.league_id
+        while league_id and len(chain) < seasons:
+            league = client.get_league(league_id) or {}
+            if not league:
+                break
+            chain.append(league)
+            prev = league.get("previous_league_id")
+            league_id = str(prev) if prev and str(prev) != "0" else None
+
+        plan = FetchPlan(max_workers=max_workers)
+        todo: List[Tuple[str, int, int]] = []
+        skipped = 0
+        for league in chain:
+            lid = str(league.get("league_id"))
+            season = int(league.get("season") or 0)
+            settings = league.get("settings") or {}
+            last_week = int(settings.get("last_scored_leg") or DEFAULT_LAST_WEEK)
+            for week in range(1, last_week + 1):
+                if current is not None and (season, week) >= current:
+                    break
+                if not force and self.is_final(season, week):
+                    skipped += 1
+                    continue
+                plan.add(f"{season}:{week}", lambda lid=lid, week=week: client.get_matchups(lid, week) or [])
+                todo.append((lid, season, week))
+
+        start = time.perf_counter()
+        results = plan.run() if todo else {}
+        fetch_sec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rows = 0
+        now = time.time()
+        newest = int(chain[0].get("season") or 0) if chain else 0
+        with tracing.span("write columns", weeks=len(todo)):
+            for lid, season, week in todo:
+                values: Dict[str, float] = {}
+                for matchup in results[f"{season}:{week}"]:
+                    for pid, pts in (matchup.get("players_points") or {}).items():
+                        if isinstance(pts, (int, float)):
+                            values[str(pid)] = float(pts)
+                meta = {"league_id": lid, "season": season, "week": week, "fetched_at": now, "rows": len(values)}
+                # Without the live week only past seasons are known to be finished
+                meta["final"] = current is not None or season < newest
+                self.columns.write_week(column_key(season, week), values, meta)
+                rows += len(values)
+        return BackfillResult(
+            league_ids=[str(lg.get("league_id")) for lg in chain],
+            fetched=[(season, week) for _, season, week in todo],
+            skipped=skipped,
+            rows=rows,
+            fetch_sec=fetch_sec,
+            write_sec=time.perf_counter() - start,
+        )
+
+    @tracing.traced("points aggregates")
+    def aggregates(self, recent: int = 3, min_games: int = 1) -> Dict[str, PlayerPoints]:
+        """
+        Per-player summary over every stored week, in one pass over the columns.
+        A player's games are the weeks they were rostered somewhere in the league.
+        """
+        columns = [column for column in map(self.columns.column, self.columns.weeks()) if column is not None]
+        # Taken after mapping: another writer may have added players the newest columns cover
+        ids = self.columns.ids
+        series: List[List[float]] = [[] for _ in ids]
+        for column in columns:
+            for o, value in enumerate(column.values):
+                if value == value:
+                    series[o].append(value)
+
+        result: Dict[str, PlayerPoints] = {}
+        for o, values in enumerate(series):
+            n = len(values)
+            if n == 0 or n < min_games:
+                continue
+            mean = math.fsum(values) / n
+            var = math.fsum((v - mean) ** 2 for v in values) / n
+            last = values[-recent:] if recent > 0 else values
+            recent_mean = math.fsum(last) / len(last)
+            ordered = sorted(values)
+            result[ids[o]] = PlayerPoints(
+                player_id=ids[o],
+                games=n,
+                mean=mean,
+                stdev=math.sqrt(var),
+                floor=_percentile(ordered, 0.2),
+                ceiling=_percentile(ordered, 0.8),
+                recent_mean=recent_mean,
+                trend=recent_mean - mean,
+            )
+        return result
+
+    def fallback_lookup(self, recent: int = 3, min_games: int = 2) -> Dict[str, float]:
+        """
+        player_id -> expected weekly points, for optimize_lineup's history argument.
+        """
+        return {pid: summary.expected for pid, summary in self.aggregates(recent, min_games).items()}
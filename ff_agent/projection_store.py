@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from .column_store import WeekColumn, WeekColumnStore
+from .lineup_optimizer import projection_points
+from .player_index import PlayersLike
+from .scoring import CompiledScoring, projection_stats
+from .sleeper_client import SleeperClient
+
+
+DEFAULT_PROJECTIONS_DIR = Path(os.path.expanduser("~/.ff_agent/projections"))
+DEFAULT_PROJECTIONS_TTL_SEC = 6 * 3600.0
+
+
+class ProjectionStore:
+    """
+    Local per-season store of weekly projected points, one memory-mapped float32 column per week,
+    plus each week's raw projected stats as a matrix for scoring with league settings.
+
+    Weeks that had already started when they were fetched are final and never re-downloaded;
+    the current and future weeks are refreshed once older than ttl_sec. The projections URL
+    variant that works is remembered across runs.
+    """
+
+    def __init__(
+        self,
+        client: SleeperClient,
+        season: int,
+        season_type: str = "regular",
+        root: Path = DEFAULT_PROJECTIONS_DIR,
+        ttl_sec: float = DEFAULT_PROJECTIONS_TTL_SEC,
+    ):
+        self.client = client
+        self.season = season
+        self.season_type = season_type
+        self.ttl_sec = ttl_sec
+        self.columns = WeekColumnStore(Path(root) / f"{season}_{season_type}")
+        variant = self.columns.meta.get("url_variant")
+        if client.projections_url_variant is None and isinstance(variant, int):
+            client.projections_url_variant = variant
+
+    def is_stale(self, week: int, current_week: Optional[int] = None) -> bool:
+        meta = self.columns.week_meta(week)
+        if meta is None:
+            return True
+        if meta.get("final"):
+            return False
+        if current_week is not None and week < current_week:
+            # Fetched before the week started; fetch once more to get the final numbers
+            return True
+        return time.time() - meta.get("fetched_at", 0.0) > self.ttl_sec
+
+    def fetch_week(self, week: int, current_week: Optional[int] = None) -> bool:
+        """
+        Downloads one week into the store. Returns whether projections were available.
+        """
+        rows = self.client.get_projections(season=self.season, week=week, season_type=self.season_type)
+        meta = {
+            "fetched_at": time.time(),
+            "final": current_week is not None and week < current_week,
+            "available": rows is not None,
+            "rows": len(rows or []),
+        }
+        if rows is None:
+            previous = self.columns.week_meta(week)
+            if previous is None or not previous.get("available"):
+                self.columns.write_week_meta(week, meta)
+            # Otherwise keep serving the stored column; it stays stale so the next call retries
+            return False
+        values: Dict[str, float] = {}
+        stats: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            if row.get("player_id") is None:
+                continue
+            pid = str(row["player_id"])
+            pts = projection_points(row)
+            if pts is not None:
+                values[pid] = pts
+            row_stats = projection_stats(row)
+            if row_stats:
+                stats[pid] = row_stats
+        self.columns.write_week(week, values, meta, stats=stats)
+        if self.client.projections_url_variant != self.columns.meta.get("url_variant"):
+            self.columns.update_meta(url_variant=self.client.projections_url_variant)
+        return True
+
+    def prefetch(
+        self,
+        weeks: Iterable[int],
+        current_week: Optional[int] = None,
+        max_workers: int = 6,
+        force: bool = False,
+    ) -> List[int]:
+        """
+        Fetches stale (or, with force, all) weeks in parallel. Returns the weeks downloaded.
+        """
+        todo = [w for w in weeks if force or self.is_stale(w, current_week)]
+        if not todo:
+            return []
+        if len(todo) == 1 or max_workers <= 1:
+            for w in todo:
+                self.fetch_week(w, current_week)
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(todo)), thread_name_prefix="ff-proj") as pool:
+                list(pool.map(lambda w: self.fetch_week(w, current_week), todo))
+        return todo
+
+    def week(self, week: int, current_week: Optional[int] = None) -> Optional[WeekColumn]:
+        """
+        The week's projections as a player_id -> points mapping, refreshed first if stale.
+        None when Sleeper had no projections for that week.
+        """
+        if self.is_stale(week, current_week):
+            self.fetch_week(week, current_week)
+        return self.columns.column(week)
+
+    def scored(
+        self,
+        week: int,
+        column: Optional[Mapping[str, float]],
+        scoring: Optional[CompiledScoring],
+        players: Optional[PlayersLike] = None,
+    ) -> Optional[Mapping[str, float]]:
+        """
+        The week's projected points under a league's compiled scoring, from the stored stats
+        matrix. Falls back to `column` (the stored standard points) without scoring or stats.
+        """
+        matrix = self.columns.stats(week) if scoring is not None else None
+        if matrix is None:
+            return column
+        return scoring.score_matrix(matrix, players)
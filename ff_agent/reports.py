@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+
+from . import tracing
+from .inputs import add_week_inputs, find_my_roster
+from .lineup_optimizer import build_projection_lookup, optimize_lineup
+from .matchup_sim import MatchupResult, simulate_week
+from .player_index import format_player
+from .waiver_agent import compute_roster_needs, suggest_trending_adds
+
+if TYPE_CHECKING:
+    from .sleeper_client import SleeperClient
+
+
+@tracing.traced("weekly_report_lines")
+def weekly_report_lines(
+    league: Dict[str, Any],
+    my_roster: Dict[str, Any],
+    week_num: int,
+    players_index: Any,
+    proj_lookup: Any,
+    trending: List[Dict[str, Any]],
+    outlook: Optional[MatchupResult] = None,
+) -> List[str]:
+    roster_player_ids = [str(pid) for pid in (my_roster.get("players") or [])]
+    starters_map, _ = optimize_lineup(
+        roster_player_ids=roster_player_ids,
+        roster_positions=league.get("roster_positions", []),
+        players_index=players_index,
+        proj_lookup=proj_lookup,
+    )
+
+    needs = compute_roster_needs(
+        roster_positions=league.get("roster_positions", []),
+        current_players=roster_player_ids,
+        players_index=players_index,
+    )
+    waiver_suggestions = suggest_trending_adds(trending, players_index, needs)
+
+    starter_lines = [f"Slot {idx}: {format_player(players_index, pid) if pid else '[empty]'}" for idx, pid in starters_map.items()]
+    waiver_lines = [f"{format_player(players_index, pid)} adds={cnt}" for pid, pos, cnt in waiver_suggestions[:10]]
+
+    return [
+        f"League: {league.get('name')}  Week: {week_num}",
+        *([format_matchup(outlook, my_roster.get("roster_id"))] if outlook else []),
+        "",
+        "Starters:",
+        *starter_lines,
+        "",
+        "Top Waiver Suggestions:",
+        *waiver_lines,
+    ]
+
+
+def format_matchup(result: MatchupResult, roster_id: Any = None) -> str:
+    """
+    One line per matchup, from roster_id's side when given.
+    """
+    a, b, win = result.team_a, result.team_b, result.win_prob_a
+    pa, pb = result.percentiles_a, result.percentiles_b
+    if roster_id is not None and roster_id == b.roster_id:
+        a, b, win, pa, pb = b, a, 1.0 - win, pb, pa
+    return (
+        f"Roster {a.roster_id} vs roster {b.roster_id}: win {win:.1%}  "
+        f"proj {a.mean:.1f} (p10-p90 {pa[10]:.1f}-{pa[90]:.1f}) vs {b.mean:.1f} (p10-p90 {pb[10]:.1f}-{pb[90]:.1f})"
+    )
+
+
+@dataclass
+class BulkReport:
+    username: str
+    league_id: str
+    lines: List[str]
+    error: Optional[str] = None
+
+
+def run_bulk_weekly_reports(
+    client: SleeperClient,
+    pairs: List[Tuple[str, str]],
+    season: int,
+    week: str = "auto",
+    concurrency: int = 8,
+    refresh_players: bool = False,
+    trending: Tuple[int, int] = (48, 50),
+) -> List[BulkReport]:
+    """
+    Weekly reports for many (username, league_id) pairs in one process. Inputs every report
+    shares (players, state, the week's projections, trending adds) are fetched once, each
+    distinct user and league once, with at most `concurrency` requests in flight. Projections
+    are scored with each league's scoring_settings. A user or league that cannot be fetched
+    only fails its own reports.
+    """
+    from .fetch_plan import FetchPlan
+
+    errors: Dict[str, str] = {}
+
+    def guarded(name: str, fn):
+        def call(*deps):
+            try:
+                return fn(*deps)
+            except (HTTPError, OSError, ValueError) as exc:
+                errors[name] = f"{type(exc).__name__}: {exc}"
+                return None
+
+        return call
+
+    plan = FetchPlan(max_workers=concurrency)
+    plan.add("players", lambda: client.get_players_index("nfl", refresh=refresh_players))
+    league_ids = list(dict.fromkeys(lid for _, lid in pairs))
+    for lid in league_ids:
+        for name, fn in (
+            (f"league:{lid}", lambda lid=lid: client.get_league(lid)),
+            (f"rosters:{lid}", lambda lid=lid: client.get_rosters(lid)),
+        ):
+            plan.add(name, guarded(name, fn))
+    # After the leagues: each league's projections are scored with its settings
+    add_week_inputs(plan, client, season, week, league_ids=league_ids)
+    hours, limit = trending
+    plan.add("trending", lambda: client.get_trending_players("nfl", trend_type="add", hours=hours, limit=limit))
+    for username in dict.fromkeys(u for u, _ in pairs):
+        name = f"user:{username}"
+        plan.add(name, guarded(name, lambda username=username: client.get_user(username)))
+    for lid in league_ids:
+        name = f"matchups:{lid}"
+        plan.add(name, guarded(name, lambda week_num, lid=lid: client.get_matchups(lid, week_num)), "week")
+    inputs = plan.run()
+
+    players_index = inputs["players"]
+    # Each league's points under its own scoring_settings; the standard column when its
+    # league could not be fetched
+    proj_lookups = {lid: build_projection_lookup(points) for lid, points in inputs["league_projections"].items()}
+    week_sims: Dict[str, Any] = {}
+    reports: List[BulkReport] = []
+    for username, lid in pairs:
+        missing = next((n for n in (f"user:{username}", f"league:{lid}", f"rosters:{lid}") if not inputs[n]), None)
+        if missing:
+            reports.append(BulkReport(username, lid, [], errors.get(missing, f"{missing} not found")))
+            continue
+        league = inputs[f"league:{lid}"]
+        my_roster = find_my_roster(inputs[f"user:{username}"], inputs[f"rosters:{lid}"])
+        if not my_roster:
+            reports.append(BulkReport(username, lid, [], "no roster for this user in the league"))
+            continue
+        proj_lookup = proj_lookups[lid]
+        if lid not in week_sims:
+            week_sims[lid] = simulate_week(
+                inputs[f"matchups:{lid}"] or [], players_index, proj_lookup, league.get("roster_positions"), sims=20_000
+            )
+        outlook = week_sims[lid].for_roster(my_roster.get("roster_id"))
+        lines = weekly_report_lines(league, my_roster, inputs["week"], players_index, proj_lookup, inputs["trending"], outlook)
+        reports.append(BulkReport(username, lid, lines))
+    return reports
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import os
+import pickle
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import tracing
+from .player_index import PlayerIndex
+
+
+# Players-index snapshot the next injury-alerts run diffs against
+DEFAULT_BASELINE_PATH = Path(os.path.expanduser("~/.ff_agent/injury_baseline.index.bin"))
+# RosterIndex kept between injury-alerts runs, so each run only applies roster diffs
+DEFAULT_ROSTER_INDEX_PATH = Path(os.path.expanduser("~/.ff_agent/roster_index.pickle"))
+INDEX_VERSION = 1
+
+
+@dataclass
+class RosterRef:
+    league_id: str
+    roster_id: Any
+    owner_id: Optional[str]
+    starter: bool
+
+
+@dataclass
+class InjuryAlert:
+    player_id: str
+    before: Optional[str]
+    after: Optional[str]
+    rosters: List[RosterRef]
+
+
+@dataclass
+class AlertScan:
+    alerts: List[InjuryAlert]
+    changed_players: int  # injury_status changes between the two snapshots
+    diff_sec: float
+    lookup_sec: float
+
+
+# (league_id, roster_id)
+RosterKey = Tuple[str, Any]
+
+
+class RosterIndex:
+    """
+    Inverted index from player id to every tracked roster holding the player, with whether
+    they start there.
+
+    update_league() takes a league's get_rosters payload and diffs each roster against the
+    copy it saw last time: unchanged rosters are skipped on a fingerprint compare, and only
+    added, removed or promoted/benched players touch the inverted index. A lookup is one dict
+    access no matter how many leagues are tracked.
+    """
+
+    def __init__(self) -> None:
+        self.by_player: Dict[str, Dict[RosterKey, RosterRef]] = {}
+        self._rosters: Dict[RosterKey, Dict[str, RosterRef]] = {}
+        self._fingerprints: Dict[RosterKey, Tuple[Any, ...]] = {}
+        self._leagues: Dict[str, List[RosterKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_player)
+
+    @property
+    def league_ids(self) -> List[str]:
+        return list(self._leagues)
+
+    @property
+    def roster_count(self) -> int:
+        return len(self._rosters)
+
+    def _set(self, key: RosterKey, refs: Dict[str, RosterRef]) -> int:
+        old = self._rosters.get(key, {})
+        touched = 0
+        for pid, ref in refs.items():
+            if old.get(pid) != ref:
+                self.by_player.setdefault(pid, {})[key] = ref
+                touched += 1
+        for pid in old.keys() - refs.keys():
+            holders = self.by_player.get(pid)
+            if holders is not None:
+                holders.pop(key, None)
+                if not holders:
+                    del self.by_player[pid]
+            touched += 1
+        if refs:
+            self._rosters[key] = refs
+        else:
+            self._rosters.pop(key, None)
+        return touched
+
+    def update_league(self, league_id: str, rosters: Iterable[Dict[str, Any]]) -> int:
+        """
+        Replaces one league's rosters. Returns how many (player, roster) entries changed.
+        Every player on a roster is indexed, including reserve (IR) and taxi; only
+        players in `starters` are marked as starters.
+        """
+        league_id = str(league_id)
+        touched = 0
+        keys: List[RosterKey] = []
+        for roster in rosters:
+            key = (league_id, roster.get("roster_id"))
+            keys.append(key)
+            players = tuple(str(pid) for k in ("players", "reserve", "taxi") for pid in (roster.get(k) or []))
+            starters = tuple(str(pid) for pid in (roster.get("starters") or []))
+            owner = roster.get("owner_id")
+            fingerprint = (players, starters, owner)
+            if self._fingerprints.get(key) == fingerprint:
+                continue
+            self._fingerprints[key] = fingerprint
+            starting = set(starters)
+            refs = {pid: RosterRef(league_id, key[1], owner, pid in starting) for pid in players}
+            touched += self._set(key, refs)
+        for key in set(self._leagues.get(league_id, ())) - set(keys):
+            touched += self._set(key, {})
+            self._fingerprints.pop(key, None)
+        self._leagues[league_id] = keys
+        return touched
+
+    def remove_league(self, league_id: str) -> int:
+        return self.update_league(league_id, [])
+
+    def save(self, path: Path) -> None:
+        """
+        Pickles the whole index, fingerprints included, so a later load() + update_league()
+        only touches rosters that changed in between.
+        """
+        state = (INDEX_VERSION, self.by_player, self._rosters, self._fingerprints, self._leagues)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["RosterIndex"]:
+        """
+        Reads a save() file. Returns None when it is missing, unreadable or from another version.
+        """
+        try:
+            state = pickle.loads(Path(path).read_bytes())
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError, ValueError):
+            return None
+        if not isinstance(state, tuple) or len(state) != 5 or state[0] != INDEX_VERSION:
+            return None
+        index = cls()
+        _, index.by_player, index._rosters, index._fingerprints, index._leagues = state
+        return index
+
+    def lookup(self, player_id: str) -> List[RosterRef]:
+        return list(self.by_player.get(str(player_id), {}).values())
+
+    @tracing.traced("injury alerts")
+    def injury_alerts(
+        self, previous: PlayerIndex, current: PlayerIndex, owner_id: Optional[str] = None
+    ) -> AlertScan:
+        """
+        Diffs two players-index snapshots and returns one alert per changed player on a
+        tracked roster (only rosters owned by owner_id when given), starters first.
+        """
+        start = time.perf_counter()
+        changes = current.injury_changes(previous)
+        diff_sec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        alerts: List[InjuryAlert] = []
+        for pid, before, after in changes:
+            holders = self.by_player.get(pid)
+            if not holders:
+                continue
+            refs = [ref for ref in holders.values() if owner_id is None or ref.owner_id == owner_id]
+            if refs:
+                refs.sort(key=lambda ref: (not ref.starter, ref.league_id, str(ref.roster_id)))
+                alerts.append(InjuryAlert(pid, before, after, refs))
+        alerts.sort(key=lambda a: (not any(ref.starter for ref in a.rosters), a.player_id))
+        return AlertScan(alerts, len(changes), diff_sec, time.perf_counter() - start)
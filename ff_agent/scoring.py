@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from . import tracing
+from .column_store import StatsMatrix
+from .player_index import PlayersLike, as_player_index
+
+
+# Precomputed totals and draft metadata that ride along in projection stats; never weighted.
+# pts_allow (a defense's points allowed) is a stat despite its prefix.
+_NOT_STATS = ("pts_", "adp_", "pos_adp_", "rank_", "pos_rank_")
+_STATS_ANYWAY = ("pts_allow",)
+
+# scoring_settings keys that add points per stat only for one position (TE premium and co.)
+POSITION_BONUSES: Dict[str, Tuple[str, str]] = {
+    "bonus_rec_te": ("TE", "rec"),
+    "bonus_rec_rb": ("RB", "rec"),
+    "bonus_rec_wr": ("WR", "rec"),
+}
+
+# Some settings pay a fixed amount when a stat lands in a band rather than per unit:
+# threshold bonuses (bonus_pass_yd_300, bonus_rec_yd_100, bonus_rush_att_20, ...) from a
+# line up, and defense tiers on points and yards allowed (pts_allow_0, pts_allow_1_6, ...,
+# pts_allow_35p, yds_allow_100_199, ...), for defenses only. A projection is a mean, so a
+# band counts points * P(low <= stat < high), with the stat normal around its projection
+# with a BAND_CV relative spread. A band on a stat the projections do not carry adds nothing.
+_THRESHOLD_KEY = re.compile(r"bonus_([a-z_]+?)_(\d+)")
+_TIER_KEY = re.compile(r"(pts_allow|yds_allow)_(\d+)(?:_(\d+)|(p))?")
+DEFENSE = "DEF"
+# Bonus stats that are sums of projected stats
+COMBINED_STATS: Dict[str, Tuple[str, ...]] = {"rush_rec_yd": ("rush_yd", "rec_yd")}
+BAND_CV = 0.4
+_SPREAD = BAND_CV * math.sqrt(2.0)
+
+# (stats summed, low, high, points)
+Band = Tuple[Tuple[str, ...], float, float, float]
+
+
+def projection_stats(row: Mapping[str, Any]) -> Dict[str, float]:
+    """
+    Raw numeric stats of one projection row, which Sleeper nests under "stats" (flat rows
+    are read as-is), without the precomputed pts_* totals and ranking fields.
+    """
+    stats = row.get("stats")
+    source = stats if isinstance(stats, Mapping) else row
+    return {
+        key: float(value)
+        for key, value in source.items()
+        if isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and (not key.startswith(_NOT_STATS) or key.startswith(_STATS_ANYWAY))
+    }
+
+
+def band_share(mean: float, low: float, high: float) -> float:
+    """
+    P(low <= X < high) for X normal around mean with a BAND_CV relative spread; a mean of
+    0 or less is taken as certain.
+    """
+    if mean <= 0:
+        return 1.0 if low <= mean < high else 0.0
+    scale = _SPREAD * mean
+    return 0.5 * (math.erfc((low - mean) / scale) - math.erfc((high - mean) / scale))
+
+
+# Rules resolved against one row layout: (position, weight) pairs and bands over positions
+_Resolved = Tuple[List[Tuple[int, float]], List[Tuple[Tuple[int, ...], float, float, float]]]
+
+
+def _points(row: Sequence[Any], weights: Iterable[Tuple[int, float]], bands: Iterable[Tuple[Sequence[int], float, float, float]]) -> float:
+    """
+    One player's points from a row of stats laid out as the resolved rules expect. A stat
+    the player does not have is None; a band applies only if one of its stats is there.
+    """
+    total = 0.0
+    for i, w in weights:
+        v = row[i]
+        if v:
+            total += v * w
+    for columns, low, high, points in bands:
+        if len(columns) == 1:
+            mean = row[columns[0]]
+        else:
+            present = [row[i] for i in columns if row[i] is not None]
+            mean = sum(present) if present else None
+        if mean is not None:
+            total += points * band_share(mean, low, high)
+    return total
+
+
+@dataclass
+class CompiledScoring:
+    """
+    A league's scoring_settings as weight vectors: points = stats . weights, with the
+    position-only bonuses folded into one extra vector per position, plus the expected
+    value of each band (threshold bonuses, and defense tiers in position_bands["DEF"]).
+    Position-specific rules need `players` to tell positions apart.
+    """
+
+    weights: Dict[str, float]
+    position_weights: Dict[str, Dict[str, float]]
+    bands: Tuple[Band, ...] = ()
+    position_bands: Dict[str, Tuple[Band, ...]] = field(default_factory=dict)  # all of a position's bands
+
+    def rules(self, position: Optional[str]) -> Tuple[Dict[str, float], Tuple[Band, ...]]:
+        if not position:
+            return self.weights, self.bands
+        return self.position_weights.get(position, self.weights), self.position_bands.get(position, self.bands)
+
+    def stat_keys(self) -> List[str]:
+        """
+        Every stat some rule reads.
+        """
+        keys = dict.fromkeys(self.weights)
+        for weights in self.position_weights.values():
+            keys.update(dict.fromkeys(weights))
+        for bands in (self.bands, *self.position_bands.values()):
+            for stats, _, _, _ in bands:
+                keys.update(dict.fromkeys(stats))
+        return list(keys)
+
+    def _resolve(self, column: Mapping[str, int]) -> Tuple[_Resolved, Dict[str, _Resolved]]:
+        """
+        The general and per-position rules over a row layout (stat -> position in the row).
+        Stats the layout lacks are dropped, and with them bands left without a stat.
+        """
+
+        def resolve(weights: Dict[str, float], bands: Tuple[Band, ...]) -> _Resolved:
+            columns = [(column[key], w) for key, w in weights.items() if key in column]
+            resolved = [(tuple(column[key] for key in keys if key in column), low, high, points) for keys, low, high, points in bands]
+            return columns, [band for band in resolved if band[0]]
+
+        positions = self.position_weights.keys() | self.position_bands.keys()
+        return resolve(*self.rules(None)), {pos: resolve(*self.rules(pos)) for pos in positions}
+
+    def _index(self, players: Optional[PlayersLike]):
+        by_position = self.position_weights or self.position_bands
+        return as_player_index(players) if players is not None and by_position else None
+
+    def score(self, stats: Mapping[str, float], position: Optional[str] = None) -> float:
+        keys = self.stat_keys()
+        base, by_position = self._resolve({key: i for i, key in enumerate(keys)})
+        return _points(list(map(stats.get, keys)), *by_position.get(position, base))
+
+    @tracing.traced("score_rows")
+    def score_rows(self, rows: Iterable[Mapping[str, Any]], players: Optional[PlayersLike] = None) -> Dict[str, float]:
+        """
+        player_id -> points for raw projection rows (e.g. get_projections' payload).
+        """
+        keys = self.stat_keys()
+        base, by_position = self._resolve({key: i for i, key in enumerate(keys)})
+        index = self._index(players)
+        result: Dict[str, float] = {}
+        for row in rows:
+            pid = row.get("player_id")
+            if pid is None:
+                continue
+            pid = str(pid)
+            stats = row.get("stats")
+            source = stats if isinstance(stats, Mapping) else row
+            rules = base if index is None else by_position.get(index.primary_position(pid), base)
+            result[pid] = _points(list(map(source.get, keys)), *rules)
+        return result
+
+    @tracing.traced("score_matrix")
+    def score_matrix(self, matrix: StatsMatrix, players: Optional[PlayersLike] = None) -> Dict[str, float]:
+        """
+        player_id -> points for a stored week: the stats matrix times this weight vector,
+        over the matrix columns that carry a weight.
+        """
+        base, by_position = self._resolve({key: i for i, key in enumerate(matrix.keys)})
+        index = self._index(players)
+        values, width, ids = matrix.values, matrix.width, matrix.ids
+        result: Dict[str, float] = {}
+        for o in range(matrix.rows):
+            start = o * width
+            if values[start] != values[start]:  # NaN row: no stats line for this player
+                continue
+            pid = ids[o]
+            rules = base if index is None else by_position.get(index.primary_position(pid), base)
+            result[pid] = _points(values[start : start + width], *rules)
+        return result
+
+
+@lru_cache(maxsize=64)
+def _compile(settings: Tuple[Tuple[str, float], ...]) -> CompiledScoring:
+    weights: Dict[str, float] = {}
+    bonuses: Dict[str, Dict[str, float]] = {}
+    bands: List[Band] = []
+    defense_bands: List[Band] = []
+    for key, points in settings:
+        if not points:
+            continue
+        threshold = _THRESHOLD_KEY.fullmatch(key)
+        tier = _TIER_KEY.fullmatch(key)
+        if key in POSITION_BONUSES:
+            pos, stat = POSITION_BONUSES[key]
+            extra = bonuses.setdefault(pos, {})
+            extra[stat] = extra.get(stat, 0.0) + points
+        elif threshold is not None:
+            stat, line = threshold.groups()
+            bands.append((COMBINED_STATS.get(stat, (stat,)), float(line), math.inf, points))
+        elif tier is not None:
+            # Whole-number ranges, both ends included: pts_allow_1_6 is 1 <= pts < 7
+            stat, low, high, open_ended = tier.groups()
+            upper = math.inf if open_ended else float(high if high is not None else low) + 1.0
+            defense_bands.append(((stat,), float(low), upper, points))
+        else:
+            weights[key] = points
+    position_weights = {}
+    for pos, extra in bonuses.items():
+        combined = dict(weights)
+        for stat, points in extra.items():
+            combined[stat] = combined.get(stat, 0.0) + points
+        position_weights[pos] = combined
+    position_bands = {DEFENSE: tuple(bands + defense_bands)} if defense_bands else {}
+    return CompiledScoring(weights=weights, position_weights=position_weights, bands=tuple(bands), position_bands=position_bands)
+
+
+def compile_scoring(scoring_settings: Optional[Mapping[str, Any]]) -> Optional[CompiledScoring]:
+    """
+    Compiled weights for a league's scoring_settings (from get_league), or None when the
+    league has none. Cached by content, so leagues sharing settings share one instance.
+    """
+    if not scoring_settings:
+        return None
+    items = tuple(
+        sorted(
+            (str(key), float(value))
+            for key, value in scoring_settings.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        )
+    )
+    return _compile(items) if items else None
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory, util
+from operator import add
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import tracing
+from .lineup_optimizer import optimize_league_lineups
+from .matchup_sim import pair_matchups, team_projection, unit_normal_levels
+from .player_index import PlayersLike, as_player_index
+
+
+DEFAULT_PLAYOFF_WEEK_START = 15
+DEFAULT_PLAYOFF_TEAMS = 6
+
+
+@dataclass
+class SeasonModel:
+    """
+    Read-only inputs of a rest-of-season simulation, as flat arrays indexed [week * teams + team].
+    opponent is -1 when a team has no matchup that week.
+    """
+
+    roster_ids: List[Any]
+    weeks: List[int]
+    opponent: Sequence[int]  # array 'i' (a memoryview of shared memory in pool workers)
+    mean: Sequence[float]  # 'd'
+    sd: Sequence[float]  # 'd'
+    wins: Sequence[float]  # 'd', ties count half
+    points: Sequence[float]  # 'd', points for so far (tiebreaker)
+
+
+@dataclass
+class TeamOdds:
+    roster_id: Any
+    wins: float
+    points_for: float
+    projected_wins: float
+    playoff_prob: float
+    bye_prob: float
+    seed_probs: List[float]  # probability of each playoff seed, 1 first
+
+
+@dataclass
+class SeasonOdds:
+    teams: List[TeamOdds]  # best playoff odds first
+    sims: int
+    processes: int
+    elapsed_sec: float
+
+    @property
+    def sims_per_sec(self) -> float:
+        return self.sims / self.elapsed_sec if self.elapsed_sec > 0 else float("inf")
+
+
+def playoff_format(league: Dict[str, Any]) -> Tuple[int, int, int]:
+    """
+    (playoff_week_start, playoff_teams, byes) from a league's settings. Byes fill the
+    bracket up to the next power of two (6 teams -> 2 byes).
+    """
+    settings = league.get("settings") or {}
+    week_start = int(settings.get("playoff_week_start") or DEFAULT_PLAYOFF_WEEK_START)
+    teams = int(settings.get("playoff_teams") or DEFAULT_PLAYOFF_TEAMS)
+    bracket = 1
+    while bracket < teams:
+        bracket *= 2
+    return week_start, teams, bracket - teams
+
+
+def standings_from_rosters(rosters: List[Dict[str, Any]]) -> Dict[Any, Tuple[float, float]]:
+    """
+    roster_id -> (wins, points_for) from get_rosters settings; a tie counts as half a win.
+    """
+    standings: Dict[Any, Tuple[float, float]] = {}
+    for roster in rosters:
+        s = roster.get("settings") or {}
+        wins = float(s.get("wins") or 0) + 0.5 * float(s.get("ties") or 0)
+        points = float(s.get("fpts") or 0) + float(s.get("fpts_decimal") or 0) / 100.0
+        standings[roster.get("roster_id")] = (wins, points)
+    return standings
+
+
+@tracing.traced("build_season_model")
+def build_season_model(
+    rosters: List[Dict[str, Any]],
+    weekly_matchups: Mapping[int, List[Dict[str, Any]]],
+    weekly_projections: Mapping[int, Mapping[str, float]],
+    players_index: PlayersLike,
+    roster_positions: List[str],
+) -> SeasonModel:
+    """
+    Pairs each remaining week's matchups and projects every team's optimal lineup for that
+    week from its current roster. Standings so far come from the rosters' settings.
+    """
+    players = as_player_index(players_index)
+    roster_ids = [r.get("roster_id") for r in rosters]
+    slot = {rid: i for i, rid in enumerate(roster_ids)}
+    weeks = sorted(weekly_matchups)
+    n = len(roster_ids)
+    opponent = array("i", [-1]) * (n * len(weeks))
+    mean = array("d", [0.0]) * (n * len(weeks))
+    sd = array("d", [0.0]) * (n * len(weeks))
+
+    for w, week in enumerate(weeks):
+        proj_lookup = weekly_projections.get(week) or {}
+        lineups = optimize_league_lineups([("", roster_positions, rosters)], players, proj_lookup)
+        for lineup in lineups:
+            t = slot[lineup.roster_id]
+            team = team_projection(lineup.roster_id, [pid for pid in lineup.starters.values() if pid], players, proj_lookup)
+            mean[w * n + t] = team.mean
+            sd[w * n + t] = team.sd
+        pairs, _ = pair_matchups(weekly_matchups[week])
+        for _, a, b in pairs:
+            ta, tb = slot.get(a.get("roster_id")), slot.get(b.get("roster_id"))
+            if ta is not None and tb is not None:
+                opponent[w * n + ta] = tb
+                opponent[w * n + tb] = ta
+
+    standings = standings_from_rosters(rosters)
+    return SeasonModel(
+        roster_ids=roster_ids,
+        weeks=weeks,
+        opponent=opponent,
+        mean=mean,
+        sd=sd,
+        wins=array("d", (standings[rid][0] for rid in roster_ids)),
+        points=array("d", (standings[rid][1] for rid in roster_ids)),
+    )
+
+
+# The model's arrays, in the order they are laid out in shared memory
+_SHARED_FIELDS = ("opponent", "mean", "sd", "wins", "points")
+# (shared memory block name, [(field, typecode, byte offset, length)], model with the arrays left empty)
+SharedModelSpec = Tuple[str, List[Tuple[str, str, int, int]], SeasonModel]
+
+
+def share_model(model: SeasonModel) -> Tuple[shared_memory.SharedMemory, SharedModelSpec]:
+    """
+    Copies the model's arrays into one shared memory block. Workers map the block by name
+    (attach_model) instead of receiving a pickled copy, whatever the start method. The
+    caller closes and unlinks the block when the pool is done.
+    """
+    layout: List[Tuple[str, str, int, int]] = []
+    offset = 0
+    for name in _SHARED_FIELDS:
+        values = getattr(model, name)
+        layout.append((name, values.typecode, offset, len(values)))
+        offset += -(-len(values) * values.itemsize // 8) * 8  # keep every array 8-byte aligned
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 8))
+    for name, typecode, start, length in layout:
+        data = memoryview(getattr(model, name)).cast("B")
+        block.buf[start : start + len(data)] = data
+    skeleton = replace(model, **{name: array(getattr(model, name).typecode) for name in _SHARED_FIELDS})
+    return block, (block.name, layout, skeleton)
+
+
+def attach_model(spec: SharedModelSpec) -> Tuple[shared_memory.SharedMemory, SeasonModel]:
+    """
+    The model over a block made by share_model, with its arrays as memoryviews (no copy).
+    """
+    name, layout, skeleton = spec
+    block = shared_memory.SharedMemory(name=name)
+    views = {
+        field_name: block.buf[start : start + length * array(typecode).itemsize].cast(typecode)
+        for field_name, typecode, start, length in layout
+    }
+    return block, replace(skeleton, **views)
+
+
+# Set in each worker by _init_worker from the shared block
+_WORKER_MODEL: Optional[SeasonModel] = None
+
+
+def _init_worker(spec: SharedModelSpec) -> None:
+    global _WORKER_MODEL
+    block, _WORKER_MODEL = attach_model(spec)
+    # Release the views before the block at worker exit, or closing it fails on live exports
+    util.Finalize(None, _detach_worker, args=(block,), exitpriority=10)
+
+
+def _detach_worker(block: shared_memory.SharedMemory) -> None:
+    global _WORKER_MODEL
+    model, _WORKER_MODEL = _WORKER_MODEL, None
+    if model is not None:
+        for name in _SHARED_FIELDS:
+            getattr(model, name).release()
+    block.close()
+
+
+def _simulate_chunk(sims: int, seed: int, playoff_teams: int, model: Optional[SeasonModel] = None) -> Tuple[List[int], List[float]]:
+    """
+    Plays out the remaining weeks `sims` times. Returns per-team seed counts (flat,
+    team * playoff_teams + seed) and total final wins.
+    """
+    model = model or _WORKER_MODEL
+    assert model is not None
+    randbytes = random.Random(seed).randbytes
+    table = unit_normal_levels()
+    n = len(model.roster_ids)
+    teams = range(n)
+    base_wins, base_points = list(model.wins), list(model.points)
+    # Per week: team means, team spreads and the (team, opponent) pairs, as plain lists
+    schedule = []
+    for w in range(len(model.weeks)):
+        off = w * n
+        pairs = [(t, model.opponent[off + t]) for t in teams if model.opponent[off + t] > t]
+        schedule.append((list(model.mean[off : off + n]), list(model.sd[off : off + n]), pairs))
+    draws = n * len(schedule)
+    seeds = [0] * (n * playoff_teams)
+    total_wins = [0.0] * n
+
+    for _ in range(sims):
+        wins = base_wins[:]
+        points = base_points[:]
+        # One random byte per team-week picks its normal quantile (the table matchup_sim draws from)
+        z = randbytes(draws)
+        for w, (means, sds, pairs) in enumerate(schedule):
+            off = w * n
+            scores = [m + s * table[z[off + t]] for t, m, s in zip(teams, means, sds)]
+            for a, b in pairs:
+                if scores[a] > scores[b]:
+                    wins[a] += 1.0
+                elif scores[b] > scores[a]:
+                    wins[b] += 1.0
+                else:
+                    wins[a] += 0.5
+                    wins[b] += 0.5
+            points = list(map(add, points, scores))
+        order = sorted(teams, key=lambda t: (wins[t], points[t]), reverse=True)
+        for seed_idx, t in enumerate(order[:playoff_teams]):
+            seeds[t * playoff_teams + seed_idx] += 1
+        for t in teams:
+            total_wins[t] += wins[t]
+    return seeds, total_wins
+
+
+@tracing.traced("simulate_season")
+def simulate_season(
+    model: SeasonModel,
+    playoff_teams: int = DEFAULT_PLAYOFF_TEAMS,
+    byes: int = 0,
+    sims: int = 10_000,
+    seed: int = 0,
+    processes: int = 1,
+    chunk_size: int = 1_000,
+) -> SeasonOdds:
+    """
+    Monte Carlo playoff odds. Team weekly scores are normal around their projected lineup
+    totals (see matchup_sim.team_projection); ties in the standings go to points for.
+
+    Simulations run in seeded chunks, so results depend on `seed` but not on `processes`.
+    With processes > 1 chunks are spread over a process pool; the model's arrays are put
+    in shared memory once and every worker maps them, under fork, spawn or forkserver alike.
+    """
+    start = time.perf_counter()
+    n = len(model.roster_ids)
+    playoff_teams = min(playoff_teams, n)
+    sizes = [min(chunk_size, sims - s) for s in range(0, sims, chunk_size)]
+    chunk_seeds = [seed * 1_000_003 + i for i in range(len(sizes))]
+    if processes <= 1 or len(sizes) <= 1:
+        parts = [_simulate_chunk(k, s, playoff_teams, model) for k, s in zip(sizes, chunk_seeds)]
+        processes = 1
+    else:
+        unit_normal_levels()  # built once here so forked workers inherit it
+        block, spec = share_model(model)
+        try:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(spec,)) as pool:
+                parts = list(pool.map(_simulate_chunk, sizes, chunk_seeds, [playoff_teams] * len(sizes)))
+        finally:
+            block.close()
+            block.unlink()
+
+    seeds = [sum(col) for col in zip(*(p[0] for p in parts))] or [0] * (n * playoff_teams)
+    total_wins = [sum(col) for col in zip(*(p[1] for p in parts))] or list(model.wins)
+    teams: List[TeamOdds] = []
+    for t, rid in enumerate(model.roster_ids):
+        counts = seeds[t * playoff_teams : (t + 1) * playoff_teams]
+        probs = [c / sims if sims else 0.0 for c in counts]
+        teams.append(
+            TeamOdds(
+                roster_id=rid,
+                wins=model.wins[t],
+                points_for=model.points[t],
+                projected_wins=total_wins[t] / sims if sims else model.wins[t],
+                playoff_prob=sum(probs),
+                bye_prob=sum(probs[:byes]),
+                seed_probs=probs,
+            )
+        )
+    teams.sort(key=lambda o: (o.playoff_prob, o.bye_prob, o.projected_wins), reverse=True)
+    return SeasonOdds(teams=teams, sims=sims, processes=processes, elapsed_sec=time.perf_counter() - start)
@@ -1,88 +1,339 @@
 from __future__ import annotations
 
 import json
+import threading
 import time
-from typing import Any, Dict, List, Optional
-from urllib.error import HTTPError, URLError
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.error import HTTPError
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+
+from .fixtures import FixtureArchive, RecordingResponse
+from .json_stream import iter_projected_records
+from . import startup, tracing
+from .player_index import PLAYER_FIELDS, PlayerIndex
+from .transport import HTTPTransport, RequestTiming, TokenBucket, TransportStats
+from .utils import DEFAULT_PLAYERS_TTL_SEC, DiskCache
+
+
+# Seconds a response body is reused in-process, per endpoint. Endpoints not listed (draft
+# picks, which draft-assist polls every few seconds) are never memoized, only coalesced.
+DEFAULT_MEMO_TTLS: Dict[str, float] = {
+    "state": 10.0,
+    "user": 300.0,
+    "user_leagues": 300.0,
+    "league": 300.0,
+    "league_users": 300.0,
+    "rosters": 5.0,
+    "matchups": 5.0,
+    "transactions": 5.0,
+    "traded_picks": 60.0,
+    "league_drafts": 60.0,
+    "draft": 10.0,
+    "trending": 60.0,
+    "projections": 60.0,
+}
+MEMO_MAX_ENTRIES = 1024
+# Sleeper asks clients to stay under 1000 calls per minute
+SLEEPER_RATE_LIMIT_PER_MIN = 1000.0
+
+
+@dataclass
+class ClientStats:
+    coalesced: int = 0  # calls that waited on an identical request already in flight
+    memoized: int = 0  # calls answered from the in-process response memo
+    throttled: int = 0  # requests that queued on the rate limiter
+    throttle_sec: float = 0.0
 
 
 class SleeperClient:
     BASE_V1 = "https://api.sleeper.app/v1"
     BASE = "https://api.sleeper.app"
 
-    def __init__(self, request_timeout_sec: float = 15.0, max_retries: int = 2):
+    def __init__(
+        self,
+        request_timeout_sec: float = 15.0,
+        max_retries: int = 2,
+        cache: Optional[DiskCache] = None,
+        players_ttl_sec: float = DEFAULT_PLAYERS_TTL_SEC,
+        base_url: str = BASE,
+        recorder: Optional[FixtureArchive] = None,
+        memo_ttls: Optional[Dict[str, float]] = None,
+        rate_limit_per_sec: Optional[float] = None,
+        rate_limit_burst: int = 20,
+    ):
+        # Overridable so benchmarks and tests can point the client at a local stand-in
+        self.BASE = base_url.rstrip("/")
+        self.BASE_V1 = f"{self.BASE}/v1"
         self.timeout = request_timeout_sec
         self.max_retries = max_retries
+        self.transport = HTTPTransport(timeout=request_timeout_sec, max_retries=max_retries)
+        self.cache = cache
+        self.players_ttl_sec = players_ttl_sec
+        # Index into get_projections' candidate URLs that last returned data
+        self.projections_url_variant: Optional[int] = None
+        # When set, every response read off the wire is also added to this archive (record mode)
+        self.recorder = recorder
+        # Endpoint -> memo TTL; {} turns the memo off. Identical in-flight GETs are always shared
+        self.memo_ttls = dict(DEFAULT_MEMO_TTLS if memo_ttls is None else memo_ttls)
+        self.rate_limiter = TokenBucket(rate_limit_per_sec, rate_limit_burst) if rate_limit_per_sec else None
+        self.request_stats = ClientStats()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._memo: Dict[str, Tuple[float, bytes]] = {}  # url -> (expires_at, body)
 
-    def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    def _open(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        """
+        Opens a GET (with retries) on the pooled transport and returns the live response;
+        the caller reads and closes it. HTTPError 304 (Not Modified) is raised so conditional
+        callers can handle it.
+        """
         if params:
             url = f"{url}?{urlencode(params)}"
-        last_exc: Optional[Exception] = None
-        for attempt in range(self.max_retries + 1):
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.acquire()
+            if wait > 0:
+                with self._lock:
+                    self.request_stats.throttled += 1
+                    self.request_stats.throttle_sec += wait
+        if self.recorder is None:
+            return self.transport.open(url, headers=headers)
+        try:
+            resp = self.transport.open(url, headers=headers)
+        except HTTPError as exc:
+            if exc.code != 304:
+                self.recorder.add(url, exc.code, {}, b"")
+            raise
+        return RecordingResponse(resp, self.recorder, url)
+
+    def _fetch(self, url: str, endpoint: Optional[str]) -> bytes:
+        """
+        Response body of a GET. Served from the memo within the endpoint's TTL; a caller
+        asking for a URL that is already in flight waits for that request instead of
+        issuing its own, and gets its body (or its error).
+        """
+        ttl = self.memo_ttls.get(endpoint, 0.0) if endpoint else 0.0
+        with self._lock:
+            if ttl > 0:
+                hit = self._memo.get(url)
+                if hit is not None and hit[0] > time.monotonic():
+                    self.request_stats.memoized += 1
+                    return hit[1]
+            pending = self._inflight.get(url)
+            if pending is not None:
+                self.request_stats.coalesced += 1
+            else:
+                self._inflight[url] = future = Future()
+        if pending is not None:
+            with tracing.span("coalesced", url=url):
+                return pending.result()
+
+        try:
+            with self._open(url) as resp:
+                data = resp.read()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[url]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            if ttl > 0:
+                self._remember(url, time.monotonic() + ttl, data)
+            del self._inflight[url]
+        future.set_result(data)
+        return data
+
+    def _remember(self, url: str, expires_at: float, data: bytes) -> None:
+        memo = self._memo
+        memo.pop(url, None)
+        memo[url] = (expires_at, data)
+        if len(memo) > MEMO_MAX_ENTRIES:
+            now = time.monotonic()
+            for key in [key for key, (expires, _) in memo.items() if expires <= now]:
+                del memo[key]
+            while len(memo) > MEMO_MAX_ENTRIES:
+                del memo[next(iter(memo))]
+
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None, endpoint: Optional[str] = None) -> Any:
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        data = self._fetch(url, endpoint)
+        if not data:
+            return None
+        with tracing.span("json.decode", bytes=len(data)):
+            return json.loads(data.decode("utf-8"))
+
+    def _get_cached(self, key: str, url: str, ttl_sec: float, refresh: bool, parse: Callable[[Any], Any]) -> Any:
+        """
+        GET through the disk cache: served from disk within ttl_sec, revalidated with
+        ETag/Last-Modified after that. `parse` turns the response stream into the cached value.
+        """
+        with tracing.span(f"cache {key}") as span:
+            if self.cache is None:
+                with self._open(url) as resp:
+                    return parse(resp)
+
+            entry = self.cache.entry(key)
+            if entry is not None and not refresh and entry.age_sec < ttl_sec:
+                data = self.cache.load(key)
+                if data is not None:
+                    self.cache.record_hit(entry)
+                    span.set(outcome="hit")
+                    return data
+                entry = None
+
+            headers: Dict[str, str] = {}
+            if entry is not None and not refresh:
+                if entry.etag:
+                    headers["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    headers["If-Modified-Since"] = entry.last_modified
+
             try:
-                req = Request(url, headers={"User-Agent": "ff-agent/1.0"})
-                with urlopen(req, timeout=self.timeout) as resp:
-                    if resp.status != 200:
-                        raise HTTPError(url, resp.status, "Non-200", hdrs=resp.headers, fp=None)
-                    data = resp.read()
-                    if not data:
-                        return None
-                    return json.loads(data.decode("utf-8"))
-            except (HTTPError, URLError, TimeoutError) as exc:  # noqa: F821
-                last_exc = exc
-                time.sleep(0.5 * (attempt + 1))
-        if last_exc:
-            raise last_exc
-        return None
+                resp = self._open(url, headers=headers)
+            except HTTPError as exc:
+                if exc.code != 304 or entry is None:
+                    raise
+                data = self.cache.load(key)
+                if data is not None:
+                    self.cache.record_revalidated(entry)
+                    span.set(outcome="revalidated")
+                    return data
+                resp = self._open(url)
+
+            with resp:
+                data = parse(resp)
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+            if data is not None:
+                self.cache.store(key, data, etag=etag, last_modified=last_modified)
+            span.set(outcome="miss")
+            return data
+
+    @property
+    def stats(self) -> TransportStats:
+        return self.transport.stats
+
+    def stats_dict(self) -> Dict[str, Any]:
+        """
+        Transport counters plus coalesced / memoized / throttled request counts.
+        """
+        with self._lock:
+            client = asdict(self.request_stats)
+        return {**self.transport.stats_dict(), **client}
+
+    @property
+    def timings(self) -> List[RequestTiming]:
+        """
+        Most recent per-request timings (bounded history).
+        """
+        return list(self.transport.timings)
+
+    def close(self) -> None:
+        self.transport.close()
 
     # Core documented endpoints
     def get_user(self, username_or_id: str) -> Dict[str, Any]:
         url = f"{self.BASE_V1}/user/{username_or_id}"
-        return self._get(url)
+        return self._get(url, endpoint="user")
 
     def get_state(self, sport: str = "nfl") -> Dict[str, Any]:
         url = f"{self.BASE_V1}/state/{sport}"
-        return self._get(url)
+        return self._get(url, endpoint="state")
 
     def get_user_leagues(self, user_id: str, season: int, sport: str = "nfl") -> List[Dict[str, Any]]:
         url = f"{self.BASE_V1}/user/{user_id}/leagues/{sport}/{season}"
-        return self._get(url)
+        return self._get(url, endpoint="user_leagues")
 
     def get_league(self, league_id: str) -> Dict[str, Any]:
         url = f"{self.BASE_V1}/league/{league_id}"
-        return self._get(url)
+        return self._get(url, endpoint="league")
 
     def get_league_users(self, league_id: str) -> List[Dict[str, Any]]:
         url = f"{self.BASE_V1}/league/{league_id}/users"
-        return self._get(url)
+        return self._get(url, endpoint="league_users")
 
     def get_rosters(self, league_id: str) -> List[Dict[str, Any]]:
         url = f"{self.BASE_V1}/league/{league_id}/rosters"
-        return self._get(url)
+        return self._get(url, endpoint="rosters")
 
     def get_matchups(self, league_id: str, week: int) -> List[Dict[str, Any]]:
         url = f"{self.BASE_V1}/league/{league_id}/matchups/{week}"
-        return self._get(url)
+        return self._get(url, endpoint="matchups")
 
     def get_transactions(self, league_id: str, week: int) -> List[Dict[str, Any]]:
         url = f"{self.BASE_V1}/league/{league_id}/transactions/{week}"
-        return self._get(url)
+        return self._get(url, endpoint="transactions")
 
     def get_traded_picks(self, league_id: str) -> List[Dict[str, Any]]:
         url = f"{self.BASE_V1}/league/{league_id}/traded_picks"
-        return self._get(url)
+        return self._get(url, endpoint="traded_picks")
 
-    def get_all_players(self, sport: str = "nfl") -> Dict[str, Dict[str, Any]]:
+    def get_league_drafts(self, league_id: str) -> List[Dict[str, Any]]:
+        url = f"{self.BASE_V1}/league/{league_id}/drafts"
+        return self._get(url, endpoint="league_drafts")
+
+    def get_draft(self, draft_id: str) -> Dict[str, Any]:
+        url = f"{self.BASE_V1}/draft/{draft_id}"
+        return self._get(url, endpoint="draft")
+
+    def get_draft_picks(self, draft_id: str) -> List[Dict[str, Any]]:
+        url = f"{self.BASE_V1}/draft/{draft_id}/picks"
+        return self._get(url, endpoint="draft_picks")
+
+    def get_all_players(self, sport: str = "nfl", refresh: bool = False) -> Dict[str, Dict[str, Any]]:
         url = f"{self.BASE_V1}/players/{sport}"
-        return self._get(url)
+        return self._get_cached(
+            f"players_{sport}", url, self.players_ttl_sec, refresh, lambda resp: json.loads(resp.read() or b"null")
+        )
+
+    @tracing.traced("players index")
+    def get_players_index(self, sport: str = "nfl", refresh: bool = False) -> PlayerIndex:
+        """
+        Players dump as a PlayerIndex. Parsed incrementally and cached in projected form,
+        so the full multi-megabyte object graph is never materialized.
+        """
+        start = time.perf_counter()
+        key = f"player_records_{sport}"
+        # Within the TTL the index comes from its binary snapshot next to the cached records
+        entry = self.cache.entry(key) if self.cache is not None and not refresh else None
+        if entry is not None and entry.age_sec < self.players_ttl_sec:
+            with tracing.span("load snapshot"):
+                index = PlayerIndex.load_snapshot(self.cache.sidecar_path(key, "index"), source=self.cache.data_version(key))
+            if index is not None:
+                self.cache.record_hit(entry)
+                startup.record("players index (snapshot)", time.perf_counter() - start)
+                return index
+
+        url = f"{self.BASE_V1}/players/{sport}"
+        records = self._get_cached(
+            key,
+            url,
+            self.players_ttl_sec,
+            refresh,
+            lambda resp: dict(iter_projected_records(resp, PLAYER_FIELDS)),
+        )
+        with tracing.span("build index", players=len(records or {})):
+            index = PlayerIndex.from_players(records or {})
+        if self.cache is not None and records:
+            try:
+                index.save_snapshot(self.cache.sidecar_path(key, "index"), source=self.cache.data_version(key) or "")
+            except OSError:
+                pass
+        startup.record("players index (json)", time.perf_counter() - start)
+        return index
 
     def get_trending_players(self, sport: str = "nfl", trend_type: str = "add", hours: int = 24, limit: int = 50) -> List[Dict[str, Any]]:
         assert trend_type in ("add", "drop")
         url = f"{self.BASE_V1}/players/{sport}/trending/{trend_type}"
         params = {"hours": hours, "limit": limit}
-        return self._get(url, params=params)
+        return self._get(url, params=params, endpoint="trending")
 
     # Best-effort projections. Sleeper has historically exposed these without /v1
     def get_projections(self, season: int, week: int, season_type: str = "regular", sport: str = "nfl") -> Optional[List[Dict[str, Any]]]:
@@ -90,10 +341,16 @@ class SleeperClient:
             f"{self.BASE}/projections/{sport}/{season_type}/{season}/{week}",
             f"{self.BASE_V1}/projections/{sport}/{season_type}/{season}/{week}",
         ]
-        for url in candidate_urls:
+        # Try the variant that worked last time first
+        order = list(range(len(candidate_urls)))
+        if self.projections_url_variant in order:
+            order.remove(self.projections_url_variant)
+            order.insert(0, self.projections_url_variant)
+        for variant in order:
             try:
-                data = self._get(url)
+                data = self._get(candidate_urls[variant], endpoint="projections")
                 if isinstance(data, list):
+                    self.projections_url_variant = variant
                     return data
             except Exception:
                 continue
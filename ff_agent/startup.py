@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class _TimedLoader:
+    """
+    Delegating loader that reports how long a module took to create and execute.
+    """
+
+    def __init__(self, loader: Any, name: str, timer: "_ImportTimer"):
+        self._loader = loader
+        self._name = name
+        self._timer = timer
+
+    def create_module(self, spec: Any) -> Any:
+        with self._timer.timing(self._name):
+            return self._loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        with self._timer.timing(self._name):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._loader, attr)
+
+
+class _ImportTimer:
+    """
+    Meta path finder that wraps every newly imported module's loader. Only outermost imports
+    are recorded, so each entry includes the time of the modules it pulled in.
+    """
+
+    def __init__(self, profile: "StartupProfile"):
+        self.profile = profile
+        self._depth = 0
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Any:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, fullname, self)
+                return spec
+        return None
+
+    @contextmanager
+    def timing(self, name: str) -> Iterator[None]:
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.profile.imports[name] = self.profile.imports.get(name, 0.0) + time.perf_counter() - start
+
+
+class StartupProfile:
+    """
+    Wall-clock breakdown of one CLI run: named phases in order, plus the modules imported
+    while the profile was active (top-level imports only, each including its dependencies).
+    """
+
+    def __init__(self) -> None:
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: Dict[str, float] = {}
+        self._timer: Optional[_ImportTimer] = None
+
+    def add(self, name: str, sec: float) -> None:
+        self.phases.append((name, sec))
+
+    def start_import_timer(self) -> None:
+        if self._timer is None:
+            self._timer = _ImportTimer(self)
+            sys.meta_path.insert(0, self._timer)  # type: ignore[arg-type]
+
+    def stop_import_timer(self) -> None:
+        if self._timer is not None:
+            sys.meta_path.remove(self._timer)  # type: ignore[arg-type]
+            self._timer = None
+
+    def lines(self, top: int = 12) -> List[str]:
+        rows = [f"{name:<40} {sec * 1e3:9.1f} ms" for name, sec in self.phases]
+        if self.imports:
+            total = sum(self.imports.values())
+            rows.append(f"{'imports during the run':<40} {total * 1e3:9.1f} ms  ({len(self.imports)} modules)")
+            ranked = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)
+            rows += [f"  {name:<38} {sec * 1e3:9.1f} ms" for name, sec in ranked[:top]]
+        return rows
+
+
+# Active profile for --startup-profile; None otherwise, which makes record() a no-op
+PROFILE: Optional[StartupProfile] = None
+
+
+def record(name: str, sec: float) -> None:
+    if PROFILE is not None:
+        PROFILE.add(name, sec)
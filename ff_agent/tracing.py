@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+
+@dataclass
+class Span:
+    name: str
+    start: float = 0.0
+    end: float = 0.0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    children: List["Span"] = field(default_factory=list)
+
+    @property
+    def elapsed_sec(self) -> float:
+        return max(0.0, self.end - self.start)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+@dataclass
+class RequestTotals:
+    requests: int = 0
+    retries: int = 0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+    network_sec: float = 0.0
+
+
+class Tracer:
+    """
+    Collects one run's span tree. Spans nest by context: the current span is a ContextVar,
+    so work submitted through FetchPlan (which copies the context) nests under the span
+    that submitted it; spans opened on other threads attach to the root.
+    """
+
+    def __init__(self, name: str):
+        self.root = Span(name, start=time.perf_counter())
+        self.totals = RequestTotals()
+        self._lock = threading.Lock()
+
+    def finish(self) -> None:
+        self.root.end = time.perf_counter()
+
+    def to_dict(self) -> Dict[str, Any]:
+        tree = _node(self.root, self.root.start)
+        tree["requests"] = {
+            "count": self.totals.requests,
+            "retries": self.totals.retries,
+            "wire_bytes": self.totals.wire_bytes,
+            "decoded_bytes": self.totals.decoded_bytes,
+            "network_ms": round(self.totals.network_sec * 1e3, 3),
+        }
+        return tree
+
+
+# Set by start(); None (the default) turns every hook below into a cheap no-op
+TRACER: Optional[Tracer] = None
+_current: ContextVar[Optional[Span]] = ContextVar("ff_agent_span", default=None)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("tracer", "span", "_token")
+
+    def __init__(self, tracer: Tracer, span: Span):
+        self.tracer = tracer
+        self.span = span
+        self._token: Any = None
+
+    def __enter__(self) -> Span:
+        parent = _current.get() or self.tracer.root
+        parent.children.append(self.span)
+        self._token = _current.set(self.span)
+        self.span.start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.attrs["error"] = exc_type.__name__
+        _current.reset(self._token)
+
+
+def start(name: str) -> Tracer:
+    global TRACER
+    TRACER = Tracer(name)
+    return TRACER
+
+
+def stop() -> Optional[Tracer]:
+    global TRACER
+    tracer, TRACER = TRACER, None
+    if tracer is not None:
+        tracer.finish()
+    return tracer
+
+
+def span(name: str, **attrs: Any) -> Any:
+    """
+    Context manager timing a block as a child of the current span; a shared no-op when
+    tracing is off. The value bound by `as` has set(**attrs) either way.
+    """
+    tracer = TRACER
+    if tracer is None:
+        return _NULL_SPAN
+    return _ActiveSpan(tracer, Span(name, attrs=attrs))
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """
+    Decorator form of span(name).
+    """
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracer = TRACER
+            if tracer is None:
+                return fn(*args, **kwargs)
+            with _ActiveSpan(tracer, Span(name)):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def record_request(
+    path: str, status: int, elapsed_sec: float, wire_bytes: int, decoded_bytes: int, retries: int, reused: bool
+) -> None:
+    """
+    Adds a finished HTTP request (timed by the transport) under the current span.
+    """
+    tracer = TRACER
+    if tracer is None:
+        return
+    end = time.perf_counter()
+    attrs = {"status": status, "wire_bytes": wire_bytes, "decoded_bytes": decoded_bytes, "retries": retries, "reused": reused}
+    (_current.get() or tracer.root).children.append(Span(f"GET {path}", end - elapsed_sec, end, attrs))
+    with tracer._lock:
+        totals = tracer.totals
+        totals.requests += 1
+        totals.retries += retries
+        totals.wire_bytes += wire_bytes
+        totals.decoded_bytes += decoded_bytes
+        totals.network_sec += elapsed_sec
+
+
+def _node(span: Span, origin: float) -> Dict[str, Any]:
+    node: Dict[str, Any] = {
+        "name": span.name,
+        "start_ms": round((span.start - origin) * 1e3, 3),
+        "ms": round(span.elapsed_sec * 1e3, 3),
+    }
+    if span.attrs:
+        node["attrs"] = span.attrs
+    if span.children:
+        node["children"] = _group(span.children, origin)
+    return node
+
+
+def _group(spans: List[Span], origin: float) -> List[Dict[str, Any]]:
+    """
+    Siblings sharing a name (e.g. optimize_lineup once per roster) collapse into one node
+    with call count, total and max time, summed numeric attributes and merged children.
+    """
+    by_name: Dict[str, List[Span]] = {}
+    for s in sorted(spans, key=lambda s: s.start):
+        by_name.setdefault(s.name, []).append(s)
+    nodes = []
+    for name, group in by_name.items():
+        if len(group) == 1:
+            nodes.append(_node(group[0], origin))
+            continue
+        node: Dict[str, Any] = {
+            "name": name,
+            "start_ms": round((group[0].start - origin) * 1e3, 3),
+            "ms": round(sum(s.elapsed_sec for s in group) * 1e3, 3),
+            "calls": len(group),
+            "max_ms": round(max(s.elapsed_sec for s in group) * 1e3, 3),
+        }
+        totals: Dict[str, Any] = {}
+        for s in group:
+            for key, value in s.attrs.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[key] = totals.get(key, 0) + value
+        if totals:
+            node["attrs"] = totals
+        children = [c for s in group for c in s.children]
+        if children:
+            node["children"] = _group(children, origin)
+        nodes.append(node)
+    return nodes
@@ -1,53 +1,205 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
+from . import tracing
+from .lineup_optimizer import LineupSolver, PlayerChoice, get_solver, score_player
+from .player_index import PlayersLike, as_player_index
 
-def team_position_counts(roster_player_ids: List[str], players_index: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+
+def team_position_counts(roster_player_ids: List[str], players_index: PlayersLike) -> Dict[str, int]:
+    players = as_player_index(players_index)
     counts: Dict[str, int] = {}
     for pid in roster_player_ids:
-        pdata = players_index.get(pid) or {}
-        pos_list = pdata.get("fantasy_positions") or ([pdata.get("position")] if pdata.get("position") else [])
-        if not pos_list:
+        primary = players.primary_position(pid)
+        if not primary:
             continue
-        primary = pos_list[0]
         counts[primary] = counts.get(primary, 0) + 1
     return counts
 
 
+@tracing.traced("suggest_trade_targets")
 def suggest_trade_targets(
     my_needs: Dict[str, int],
     all_team_rosters: Dict[int, List[str]],  # roster_id -> player_ids
     my_roster_id: int,
-    players_index: Dict[str, Dict[str, Any]],
+    players_index: PlayersLike,
     top_n_per_position: int = 3,
 ) -> Dict[str, List[Tuple[str, int]]]:
     """
     Returns position -> [(player_id, other_roster_id)] potential targets from teams with surpluses.
     """
+    players = as_player_index(players_index)
     suggestions: Dict[str, List[Tuple[str, int]]] = {}
+    needed = [pos for pos, need in my_needs.items() if need > 0]
 
     for other_roster_id, pids in all_team_rosters.items():
         if other_roster_id == my_roster_id:
             continue
-        counts = team_position_counts(pids, players_index)
-        for pos, need in my_needs.items():
-            if need <= 0:
-                continue
+        counts = team_position_counts(pids, players)
+        ranked: Optional[List[str]] = None
+        for pos in needed:
             surplus = counts.get(pos, 0)
             if surplus <= 1:  # leave them at least one buffer
                 continue
-            # Pick top players by a simple heuristic: presence of projection-like fields or depth chart
-            ranked = sorted(
-                pids,
-                key=lambda pid: (
-                    players_index.get(pid, {}).get("depth_chart_position") == 1,
-                    -(players_index.get(pid, {}).get("depth_chart_order") or 99),
-                ),
-                reverse=True,
-            )
-            picks = [(pid, other_roster_id) for pid in ranked[:top_n_per_position]]
+            if ranked is None:
+                # Rank the roster once per team: likely starters first by depth chart
+                ranked = sorted(
+                    pids,
+                    key=lambda pid: (
+                        players.depth_chart_position(pid) == 1,
+                        -(players.depth_chart_order(pid) or 99),
+                    ),
+                    reverse=True,
+                )
+            picks = [(pid, other_roster_id) for pid in ranked if players.primary_position(pid) == pos]
             if picks:
-                suggestions.setdefault(pos, []).extend(picks)
+                suggestions.setdefault(pos, []).extend(picks[:top_n_per_position])
+
+    return suggestions
+
+
+class TeamIndex:
+    """
+    One team's scored players in lineup-greedy order, with the solver state before each
+    position, so lineup value after a trade is computed by resuming the greedy from the
+    first changed position instead of re-solving the roster.
+    """
+
+    def __init__(self, roster_id: Any, candidates: List[PlayerChoice], solver: LineupSolver):
+        self.roster_id = roster_id
+        self.solver = solver
+        self.ranked = sorted(candidates, key=lambda pc: (-pc.score, pc.player_id))
+        self.keys = [(-pc.score, pc.player_id) for pc in self.ranked]
+        self.rank_of = {pc.player_id: i for i, pc in enumerate(self.ranked)}
+        self.eligibles = [solver.eligible_types(pc.positions or (pc.position,)) for pc in self.ranked]
+        self.states, self.full_at = solver.prefix_states(self.eligibles)
+        self.value = self._value(self.states[-1], [pc.score for pc in self.ranked])
+
+    @staticmethod
+    def _value(members: List[List[int]], scores: List[float]) -> float:
+        return sum(scores[ci] for group in members for ci in group)
+
+    def value_after(self, give: Sequence[str], receive: Sequence[PlayerChoice]) -> float:
+        """
+        Optimal starting-lineup points after sending away `give` and adding `receive`.
+        Players in `give` that were never scored (no position) cannot start, so they
+        leave the lineup unchanged.
+        """
+        first = len(self.ranked)
+        for pid in give:
+            rank = self.rank_of.get(pid)
+            if rank is not None:
+                first = min(first, rank)
+        for pc in receive:
+            first = min(first, bisect_left(self.keys, (-pc.score, pc.player_id)))
+        if first >= self.full_at:
+            return self.value
+
+        gone = set(give)
+        tail = [pc for pc in self.ranked[first:] if pc.player_id not in gone]
+        tail.extend(receive)
+        tail.sort(key=lambda pc: (-pc.score, pc.player_id))
+        eligibles = self.eligibles[:first] + [
+            self.solver.eligible_types(pc.positions or (pc.position,)) for pc in tail
+        ]
+        members = self.solver.select(eligibles, start=first, members=self.states[first])
+        scores = [pc.score for pc in self.ranked[:first]] + [pc.score for pc in tail]
+        return self._value(members, scores)
+
+
+@dataclass
+class TradeCandidate:
+    team_a: Any
+    gives: Tuple[str, ...]  # team_a sends
+    team_b: Any
+    receives: Tuple[str, ...]  # team_a gets (team_b sends)
+    delta_a: float
+    delta_b: float
+
+
+@dataclass
+class TradeSearchResult:
+    candidates: List[TradeCandidate]
+    evaluated: int
+    elapsed_sec: float
+
+    @property
+    def per_sec(self) -> float:
+        return self.evaluated / self.elapsed_sec if self.elapsed_sec > 0 else float("inf")
+
+
+@tracing.traced("build_team_indexes")
+def build_team_indexes(
+    all_team_rosters: Dict[Any, List[str]],
+    roster_positions: List[str],
+    players_index: PlayersLike,
+    proj_lookup: Mapping[str, float],
+) -> Dict[Any, TeamIndex]:
+    players = as_player_index(players_index)
+    solver = get_solver(tuple(roster_positions))
+    teams: Dict[Any, TeamIndex] = {}
+    for roster_id, pids in all_team_rosters.items():
+        candidates = [pc for pc in (score_player(str(pid), players, proj_lookup) for pid in pids) if pc is not None]
+        teams[roster_id] = TeamIndex(roster_id, candidates, solver)
+    return teams
+
+
+@tracing.traced("evaluate_trades")
+def evaluate_trades(
+    teams: Dict[Any, TeamIndex],
+    involving: Optional[Any] = None,
+    max_players_per_team: int = 10,
+    two_for_one: bool = True,
+    min_gain: float = 0.0,
+    limit: Optional[int] = 50,
+) -> TradeSearchResult:
+    """
+    Enumerates 1-for-1 and (optionally) 2-for-1 trades between every pair of teams (or only
+    those involving one roster), scoring each by the change in both teams' optimal
+    starting-lineup points. Only each team's top max_players_per_team players are offered.
+    Roster-size limits are ignored. Keeps trades where both sides gain more than min_gain,
+    best worst-side gain first.
+    """
+    start = time.perf_counter()
+    offered = {rid: team.ranked[:max_players_per_team] for rid, team in teams.items()}
+    found: List[TradeCandidate] = []
+    evaluated = 0
+
+    def consider(a: TeamIndex, gives: Tuple[PlayerChoice, ...], b: TeamIndex, receives: Tuple[PlayerChoice, ...]) -> None:
+        nonlocal evaluated
+        evaluated += 1
+        give_ids = tuple(pc.player_id for pc in gives)
+        receive_ids = tuple(pc.player_id for pc in receives)
+        delta_a = a.value_after(give_ids, receives) - a.value
+        if delta_a <= min_gain:
+            return
+        delta_b = b.value_after(receive_ids, gives) - b.value
+        if delta_b <= min_gain:
+            return
+        found.append(TradeCandidate(a.roster_id, give_ids, b.roster_id, receive_ids, delta_a, delta_b))
+
+    roster_ids = list(teams)
+    for i, rid_a in enumerate(roster_ids):
+        for rid_b in roster_ids[i + 1 :]:
+            if involving is not None and involving not in (rid_a, rid_b):
+                continue
+            a, b = teams[rid_a], teams[rid_b]
+            for pa in offered[rid_a]:
+                for pb in offered[rid_b]:
+                    consider(a, (pa,), b, (pb,))
+            if not two_for_one:
+                continue
+            for first, second in ((a, b), (b, a)):
+                for pair in combinations(offered[first.roster_id], 2):
+                    for single in offered[second.roster_id]:
+                        consider(first, pair, second, (single,))
 
-    return suggestions
\ No newline at end of file
+    found.sort(key=lambda t: (min(t.delta_a, t.delta_b), t.delta_a + t.delta_b), reverse=True)
+    if limit is not None:
+        found = found[:limit]
+    return TradeSearchResult(candidates=found, evaluated=evaluated, elapsed_sec=time.perf_counter() - start)
\ No newline at end of file
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import http.client
+import random
+import ssl
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+from . import tracing
+
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+# Errors that mean a kept-alive socket was closed by the server between requests
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError, http.client.BadStatusLine)
+
+PoolKey = Tuple[str, str, int]
+
+
+@dataclass
+class RequestTiming:
+    url: str
+    status: int
+    elapsed_sec: float
+    wire_bytes: int
+    decoded_bytes: int
+    retries: int
+    reused_connection: bool
+
+
+@dataclass
+class TransportStats:
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+    total_sec: float = 0.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate_per_sec` tokens per second, holding at most `burst`.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+        self.rate_per_sec = float(rate_per_sec)
+        self.burst = max(1, int(burst))
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._refilled_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * self.rate_per_sec)
+        self._refilled_at = now
+
+    def try_take(self) -> float:
+        """
+        Takes a token if one is available and returns 0, else returns seconds until one
+        will be (taking nothing).
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate_per_sec
+
+    def reserve(self) -> float:
+        """
+        Takes a token, going into debt when the bucket is empty, and returns seconds the
+        caller must wait before using it. Reservations queue in arrival order.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1.0
+            return max(0.0, -self._tokens / self.rate_per_sec)
+
+    def acquire(self) -> float:
+        """
+        Blocks until a token is available; returns the seconds spent waiting.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class PooledResponse:
+    """
+    Live response body. Transparently gunzips, counts bytes, and hands the connection
+    back to the pool on close when the body was fully read.
+    """
+
+    def __init__(
+        self,
+        transport: "HTTPTransport",
+        key: PoolKey,
+        conn: http.client.HTTPConnection,
+        resp: http.client.HTTPResponse,
+        timing: RequestTiming,
+        started: float,
+    ):
+        self.status = resp.status
+        self.headers = resp.headers
+        self._transport = transport
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self._timing = timing
+        self._started = started
+        self._closed = False
+        gzipped = (resp.getheader("Content-Encoding") or "").lower() == "gzip"
+        self._decomp = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+
+    def read(self, n: int = -1) -> bytes:
+        if self._decomp is None:
+            data = self._resp.read() if n < 0 else self._resp.read(n)
+            self._timing.wire_bytes += len(data)
+            self._timing.decoded_bytes += len(data)
+            return data
+        while True:
+            raw = self._resp.read() if n < 0 else self._resp.read(n)
+            self._timing.wire_bytes += len(raw)
+            out = self._decomp.decompress(raw) if raw else self._decomp.flush()
+            if raw and n < 0:
+                out += self._decomp.flush()
+            if out or not raw:
+                self._timing.decoded_bytes += len(out)
+                return out
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        reusable = self._resp.isclosed() and not self._resp.will_close
+        if not reusable:
+            self._resp.close()
+        self._timing.elapsed_sec = time.perf_counter() - self._started
+        self._transport._release(self._key, self._conn, reusable)
+        self._transport._record(self._timing)
+
+    def __enter__(self) -> "PooledResponse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class HTTPTransport:
+    """
+    Thread-safe GET transport with persistent HTTP/1.1 connections per host, gzip transfer
+    encoding, and jittered exponential backoff that honors Retry-After.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 15.0,
+        max_retries: int = 2,
+        user_agent: str = "ff-agent/1.0",
+        backoff_base_sec: float = 0.5,
+        backoff_max_sec: float = 8.0,
+        max_idle_per_host: int = 8,
+        timing_history: int = 256,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.user_agent = user_agent
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.max_idle_per_host = max_idle_per_host
+        self.stats = TransportStats()
+        self.timings: Deque[RequestTiming] = deque(maxlen=timing_history)
+        self._idle: Dict[PoolKey, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+
+    # Connection pool
+    def _connect(self, key: PoolKey) -> http.client.HTTPConnection:
+        with self._lock:
+            self.stats.connections_opened += 1
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _acquire(self, key: PoolKey) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.stats.connections_reused += 1
+                return idle.pop(), True
+        return self._connect(key), False
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def _record(self, timing: RequestTiming) -> None:
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.retries += timing.retries
+            self.stats.wire_bytes += timing.wire_bytes
+            self.stats.decoded_bytes += timing.decoded_bytes
+            self.stats.total_sec += timing.elapsed_sec
+            self.timings.append(timing)
+        tracing.record_request(
+            urlsplit(timing.url).path,
+            timing.status,
+            timing.elapsed_sec,
+            timing.wire_bytes,
+            timing.decoded_bytes,
+            timing.retries,
+            timing.reused_connection,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0.0, min(self.backoff_max_sec, self.backoff_base_sec * (2 ** attempt)))
+
+    def open(self, url: str, headers: Optional[Dict[str, str]] = None) -> PooledResponse:
+        """
+        Performs a GET and returns the response positioned at the start of the body.
+        Non-200 statuses raise urllib's HTTPError (304 and non-retryable 4xx without retrying).
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        key: PoolKey = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        req_headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip",
+            "Connection": "keep-alive",
+            **(headers or {}),
+        }
+
+        last_exc: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            conn, reused = self._acquire(key)
+            try:
+                try:
+                    conn.request("GET", path, headers=req_headers)
+                    resp = conn.getresponse()
+                except _STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    # The server dropped an idle keep-alive socket; reconnect once without backing off
+                    conn.close()
+                    conn, reused = self._connect(key), False
+                    conn.request("GET", path, headers=req_headers)
+                    resp = conn.getresponse()
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                last_exc = exc
+                with self._lock:
+                    self.stats.errors += 1
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff_delay(attempt))
+                continue
+
+            timing = RequestTiming(url, resp.status, 0.0, 0, 0, attempt, reused)
+            if resp.status == 200:
+                return PooledResponse(self, key, conn, resp, timing, started)
+
+            # Drain so the connection can be reused
+            body = resp.read()
+            timing.wire_bytes = timing.decoded_bytes = len(body)
+            timing.elapsed_sec = time.perf_counter() - started
+            self._release(key, conn, not resp.will_close)
+            self._record(timing)
+            exc = HTTPError(url, resp.status, resp.reason, hdrs=resp.headers, fp=None)
+            if resp.status not in RETRYABLE_STATUSES:
+                raise exc
+            last_exc = exc
+            with self._lock:
+                self.stats.errors += 1
+            if attempt < self.max_retries:
+                time.sleep(min(self.backoff_delay(attempt, resp.getheader("Retry-After")), 60.0))
+
+        if last_exc:
+            raise last_exc
+        raise RuntimeError(f"GET {url} failed without an error")
+
+    def stats_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return asdict(self.stats)
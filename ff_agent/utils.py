@@ -1,3 +1,158 @@
 from __future__ import annotations
 
-# Reserved for future helpers (e.g., caching, date helpers)
\ No newline at end of file
+import json
+import os
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_CACHE_DIR = Path(os.path.expanduser("~/.ff_agent/cache"))
+DEFAULT_PLAYERS_TTL_SEC = 12 * 3600.0
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    size_bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+
+    @property
+    def age_sec(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+
+
+class DiskCache:
+    """
+    Small JSON cache kept under ~/.ff_agent/cache.
+    Each key is stored as <key>.json (payload) plus <key>.meta.json (CacheEntry).
+    Lifetime hit/miss counters live in the meta file; per-process counters in `stats`.
+    """
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR):
+        self.root = Path(root)
+        self.stats = CacheStats()
+
+    def _data_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / f"{key}.meta.json"
+
+    def sidecar_path(self, key: str, name: str) -> Path:
+        """
+        Where to keep a file derived from an entry (e.g. a binary snapshot); removed with it.
+        """
+        return self.root / f"{key}.{name}.bin"
+
+    def data_version(self, key: str) -> Optional[str]:
+        """
+        Changes whenever the entry's payload is rewritten (not on hits or revalidations).
+        """
+        try:
+            st = self._data_path(key).stat()
+        except OSError:
+            return None
+        return f"{st.st_ino}:{st.st_mtime_ns}:{st.st_size}"
+
+    def entry(self, key: str) -> Optional[CacheEntry]:
+        meta_path = self._meta_path(key)
+        if not meta_path.exists() or not self._data_path(key).exists():
+            return None
+        try:
+            with meta_path.open("r", encoding="utf-8") as f:
+                return CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write_meta(self, entry: CacheEntry) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._meta_path(entry.key).with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(asdict(entry), f, indent=2)
+        os.replace(tmp, self._meta_path(entry.key))
+
+    def load(self, key: str) -> Any:
+        try:
+            with self._data_path(key).open("rb") as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, data: Any, etag: Optional[str] = None, last_modified: Optional[str] = None) -> CacheEntry:
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        tmp = self._data_path(key).with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            f.write(payload)
+        os.replace(tmp, self._data_path(key))
+        previous = self.entry(key)
+        entry = CacheEntry(
+            key=key,
+            fetched_at=time.time(),
+            etag=etag,
+            last_modified=last_modified,
+            size_bytes=len(payload),
+            hits=previous.hits if previous else 0,
+            misses=(previous.misses if previous else 0) + 1,
+            revalidations=previous.revalidations if previous else 0,
+        )
+        self.stats.misses += 1
+        self._write_meta(entry)
+        return entry
+
+    def record_hit(self, entry: CacheEntry) -> None:
+        entry.hits += 1
+        self.stats.hits += 1
+        self._write_meta(entry)
+
+    def record_revalidated(self, entry: CacheEntry) -> None:
+        # Server answered 304: payload is still current, restart the TTL clock
+        entry.fetched_at = time.time()
+        entry.revalidations += 1
+        self.stats.revalidations += 1
+        self._write_meta(entry)
+
+    def entries(self) -> List[CacheEntry]:
+        if not self.root.exists():
+            return []
+        result: List[CacheEntry] = []
+        for meta_path in sorted(self.root.glob("*.meta.json")):
+            entry = self.entry(meta_path.name[: -len(".meta.json")])
+            if entry is not None:
+                result.append(entry)
+        return result
+
+    def remove(self, key: str) -> None:
+        for path in (self._data_path(key), self._meta_path(key), *self.root.glob(f"{key}.*.bin")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def prune(self, max_age_sec: Optional[float] = None) -> List[str]:
+        """
+        Removes entries older than max_age_sec (all entries when None). Returns removed keys.
+        """
+        removed: List[str] = []
+        for entry in self.entries():
+            if max_age_sec is None or entry.age_sec > max_age_sec:
+                self.remove(entry.key)
+                removed.append(entry.key)
+        return removed
+
+    def stats_dict(self) -> Dict[str, int]:
+        return asdict(self.stats)
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import time
+from dataclasses import dataclass
+from typing import AbstractSet, Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
+from . import tracing
+from .lineup_optimizer import PlayerChoice, get_solver, score_player
+from .player_index import PlayersLike, as_player_index
+from .trade_agent import TeamIndex
 
+
+@tracing.traced("compute_roster_needs")
 def compute_roster_needs(
     roster_positions: List[str],
     current_players: List[str],
-    players_index: Dict[str, Dict[str, Any]],
+    players_index: PlayersLike,
 ) -> Dict[str, int]:
+    players = as_player_index(players_index)
     needed: Dict[str, int] = {}
     counts: Dict[str, int] = {}
 
@@ -19,11 +28,9 @@ def compute_roster_needs(
 
     # Count how many roster players per position
     for pid in current_players:
-        pdata = players_index.get(pid) or {}
-        pos_list = pdata.get("fantasy_positions") or ([pdata.get("position")] if pdata.get("position") else [])
-        if not pos_list:
+        primary = players.primary_position(pid)
+        if not primary:
             continue
-        primary = pos_list[0]
         counts[primary] = counts.get(primary, 0) + 1
 
     # Need = starters minus on-roster; negative means surplus
@@ -34,24 +41,28 @@ def compute_roster_needs(
     return needed
 
 
+@tracing.traced("suggest_trending_adds")
 def suggest_trending_adds(
     trending: List[Dict[str, Any]],
-    players_index: Dict[str, Dict[str, Any]],
+    players_index: PlayersLike,
     roster_needs: Dict[str, int],
     max_per_position: int = 5,
+    rostered: Optional[AbstractSet[str]] = None,
 ) -> List[Tuple[str, str, int]]:
     """
     Returns list of (player_id, position, count) tuples filtered by roster needs.
+    Players in `rostered` (see rostered_player_ids) are skipped.
     """
+    players = as_player_index(players_index)
     suggestions: List[Tuple[str, str, int]] = []
     per_pos_count: Dict[str, int] = {}
 
     for row in trending:
         pid = str(row.get("player_id"))
+        if rostered is not None and pid in rostered:
+            continue
         count = int(row.get("count", 0))
-        pdata = players_index.get(pid) or {}
-        pos_list = pdata.get("fantasy_positions") or ([pdata.get("position")] if pdata.get("position") else [])
-        primary = pos_list[0] if pos_list else None
+        primary = players.primary_position(pid)
         if not primary:
             continue
         need = roster_needs.get(primary, 0)
@@ -62,4 +73,119 @@ def suggest_trending_adds(
         suggestions.append((pid, primary, count))
         per_pos_count[primary] = per_pos_count.get(primary, 0) + 1
 
-    return suggestions
\ No newline at end of file
+    return suggestions
+
+
+def rostered_player_ids(rosters: Iterable[Dict[str, Any]]) -> Set[str]:
+    """
+    Every player on any roster of a league, including reserve (IR) and taxi squads.
+    """
+    rostered: Set[str] = set()
+    for roster in rosters:
+        for key in ("players", "reserve", "taxi"):
+            rostered.update(str(pid) for pid in (roster.get(key) or []))
+    return rostered
+
+
+@dataclass
+class FreeAgentValue:
+    player_id: str
+    position: str
+    score: float
+    vor: float  # score minus the position's replacement level
+    gain: float  # change in my optimal starting-lineup points if added (dropping `drop`)
+    drop: Optional[str] = None
+    trend_count: int = 0
+
+
+@dataclass
+class FreeAgentSearch:
+    candidates: List[FreeAgentValue]
+    pool_size: int  # unrostered players with a position that were scored
+    replacement: Dict[str, float]  # position -> replacement-level score
+    elapsed_sec: float
+
+
+@tracing.traced("rank_free_agents")
+def rank_free_agents(
+    my_player_ids: List[str],
+    roster_positions: List[str],
+    rostered: AbstractSet[str],
+    players_index: PlayersLike,
+    proj_lookup: Mapping[str, float],
+    num_teams: int,
+    limit: int = 25,
+    trending: Optional[List[Dict[str, Any]]] = None,
+) -> FreeAgentSearch:
+    """
+    Values every player not on a roster in the league.
+
+    Free agents are scored like rostered players (projection, or health/depth heuristics
+    when there are no projections at all; with projections, unprojected players are
+    skipped). A position's replacement level is the num_teams-th best free agent there, the
+    player still likely to be available after every team claims one. Each free agent's gain
+    is the change in my optimal starting lineup when added, computed incrementally from one
+    pre-solved index of my roster; when the roster is full the add is paired with dropping
+    my lowest-scored bench player. Ranked by gain, then VOR.
+    """
+    start = time.perf_counter()
+    players = as_player_index(players_index)
+    require_projection = len(proj_lookup) > 0
+
+    pool: List[PlayerChoice] = []
+    for pid in players.ids:
+        if pid in rostered or (require_projection and pid not in proj_lookup):
+            continue
+        pc = score_player(pid, players, proj_lookup)
+        if pc is not None:
+            pool.append(pc)
+    pool.sort(key=lambda pc: (-pc.score, pc.player_id))
+
+    by_position: Dict[str, List[float]] = {}
+    for pc in pool:
+        by_position.setdefault(pc.position, []).append(pc.score)
+    depth = max(1, num_teams)
+    replacement = {pos: scores[min(depth, len(scores)) - 1] for pos, scores in by_position.items()}
+
+    solver = get_solver(tuple(roster_positions))
+    mine = [pc for pc in (score_player(str(pid), players, proj_lookup) for pid in my_player_ids) if pc is not None]
+    team = TeamIndex(None, mine, solver)
+    roster_limit = sum(1 for slot in roster_positions if slot not in ("IR", "TAXI"))
+    drop: Optional[str] = None
+    drop_is_bench = True
+    if len(my_player_ids) >= roster_limit and team.ranked:
+        _, bench = solver.solve(team.ranked)
+        drop = bench[-1].player_id if bench else team.ranked[-1].player_id
+        drop_is_bench = bool(bench)
+    gives = (drop,) if drop else ()
+
+    trend_counts = {str(row.get("player_id")): int(row.get("count", 0)) for row in (trending or [])}
+    candidates: List[FreeAgentValue] = []
+    # The pool is in descending score order, and among players with the same positions a
+    # lower score never gains more; once one of them gains nothing the rest are skipped.
+    saturated: Set[Tuple[str, ...]] = set()
+    for pc in pool:
+        if pc.positions in saturated:
+            gain = 0.0
+        else:
+            gain = team.value_after(gives, (pc,)) - team.value
+            if gain <= 0 and drop_is_bench:
+                saturated.add(pc.positions)
+        candidates.append(
+            FreeAgentValue(
+                player_id=pc.player_id,
+                position=pc.position,
+                score=pc.score,
+                vor=pc.score - replacement[pc.position],
+                gain=gain,
+                drop=drop if gain > 0 else None,
+                trend_count=trend_counts.get(pc.player_id, 0),
+            )
+        )
+    candidates.sort(key=lambda c: (c.gain, c.vor, c.trend_count), reverse=True)
+    return FreeAgentSearch(
+        candidates=candidates[:limit] if limit is not None else candidates,
+        pool_size=len(pool),
+        replacement=replacement,
+        elapsed_sec=time.perf_counter() - start,
+    )
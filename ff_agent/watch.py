@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from .lineup_optimizer import build_projection_lookup, optimize_lineup
+from .player_index import PlayerIndex, format_player
+from .projection_store import ProjectionStore
+from .scoring import compile_scoring
+from .sleeper_client import SleeperClient
+from .waiver_agent import compute_roster_needs, rostered_player_ids, suggest_trending_adds
+
+
+@dataclass
+class WatchSchedule:
+    """
+    Seconds between polls of each input.
+    """
+
+    state_sec: float = 600.0
+    rosters_sec: float = 120.0
+    trending_sec: float = 900.0
+    players_sec: float = 3600.0
+    projections_sec: float = 1800.0
+    leagues_sec: float = 3600.0  # the user and league settings (roster slots, scoring)
+    retry_sec: float = 30.0  # after a failed poll, instead of waiting a full interval
+
+
+@dataclass
+class WatchStats:
+    loops: int = 0
+    polls: Dict[str, int] = field(default_factory=dict)
+    changes: Dict[str, int] = field(default_factory=dict)
+    poll_errors: int = 0
+    compute_errors: int = 0
+    loop_errors: int = 0
+    last_error: Optional[str] = None
+    recomputes: int = 0
+    skipped: int = 0
+    notifications: int = 0
+    last_loop_sec: float = 0.0
+    max_loop_sec: float = 0.0
+    total_loop_sec: float = 0.0
+
+    @property
+    def avg_loop_sec(self) -> float:
+        return self.total_loop_sec / self.loops if self.loops else 0.0
+
+
+Notify = Callable[[str, List[str]], None]
+# Called with what failed ("poll rosters:L1", "lineup L1", "loop") and the exception
+OnError = Callable[[str, BaseException], None]
+
+
+class Watcher:
+    """
+    Resident loop over one user's leagues. Inputs are polled on their own schedules and
+    diffed against the previous snapshot; lineups and waiver suggestions are recomputed only
+    for leagues whose inputs changed, and notifications go out only when a recommendation
+    differs from the last one sent.
+
+    Nothing fetched is assumed to succeed: the user and each league's settings are polled
+    sources like the rest (and refreshed on schedule), a failed poll is retried after
+    retry_sec, and a failing recomputation or loop is reported through on_error without
+    stopping the watcher.
+    """
+
+    def __init__(
+        self,
+        client: SleeperClient,
+        username: str,
+        league_ids: List[str],
+        schedule: Optional[WatchSchedule] = None,
+        notify: Optional[Notify] = None,
+        projections: Optional[ProjectionStore] = None,
+        trending_hours: int = 24,
+        trending_limit: int = 50,
+        clock: Callable[[], float] = time.monotonic,
+        on_error: Optional[OnError] = None,
+    ):
+        self.client = client
+        self.username = username
+        self.league_ids = list(league_ids)
+        self.schedule = schedule or WatchSchedule()
+        self.notify = notify or (lambda title, lines: None)
+        self.projections = projections
+        self.trending_hours = trending_hours
+        self.trending_limit = trending_limit
+        self.clock = clock
+        self.on_error = on_error or (lambda what, exc: None)
+        self.stats = WatchStats()
+
+        self.user: Optional[Dict[str, Any]] = None
+        self.leagues: Dict[str, Dict[str, Any]] = {}
+        self.league_versions: Dict[str, int] = {}  # bumped whenever a league's settings change
+        self.state: Dict[str, Any] = {}
+        self.week: Optional[int] = None
+        self.players: Optional[PlayerIndex] = None
+        self.proj_lookup: Any = {}
+        self._league_lookups: Dict[str, Tuple[Any, Any]] = {}  # league_id -> (proj_version, lookup)
+        self.proj_version: Any = None
+        self.trending: List[Dict[str, Any]] = []
+        self.my_rosters: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.rostered: Dict[str, Set[str]] = {}
+
+        self._next_due: Dict[str, float] = {}
+        self._fingerprints: Dict[Tuple[str, str], Hashable] = {}
+        self._sent: Dict[Tuple[str, str], List[str]] = {}
+
+    # Polling
+    def _intervals(self) -> Dict[str, float]:
+        # The user and league settings come first: rosters and recomputes depend on them
+        intervals = {"user": self.schedule.leagues_sec}
+        for lid in self.league_ids:
+            intervals[f"league:{lid}"] = self.schedule.leagues_sec
+        intervals["state"] = self.schedule.state_sec
+        intervals["players"] = self.schedule.players_sec
+        intervals["trending"] = self.schedule.trending_sec
+        intervals["projections"] = self.schedule.projections_sec
+        for lid in self.league_ids:
+            intervals[f"rosters:{lid}"] = self.schedule.rosters_sec
+        return intervals
+
+    def _poll(self, source: str) -> bool:
+        """
+        Fetches one input and returns whether it differs from the previous snapshot.
+        """
+        if source == "user":
+            user = self.client.get_user(self.username) or {}
+            changed = self.user is None or user.get("user_id") != self.user.get("user_id")
+            self.user = user
+            if changed:
+                for lid in self.league_ids:  # "my roster" depends on who the user is
+                    self._next_due[f"rosters:{lid}"] = 0.0
+            return changed
+        if source.startswith("league:"):
+            lid = source.split(":", 1)[1]
+            league = self.client.get_league(lid) or {}
+            if league == self.leagues.get(lid):
+                return False
+            self.leagues[lid] = league
+            self.league_versions[lid] = self.league_versions.get(lid, 0) + 1
+            self._league_lookups.pop(lid, None)
+            return True
+        if source == "state":
+            state = self.client.get_state("nfl") or {}
+            changed = state.get("week") != self.state.get("week") or state.get("season") != self.state.get("season")
+            self.state = state
+            if changed:
+                self.week = int(state.get("week") or state.get("leg") or 1)
+                self._next_due["projections"] = 0.0  # new week: load its projections now
+            return changed
+        if source == "players":
+            players = self.client.get_players_index("nfl")
+            previous, self.players = self.players, players
+            return previous is None or _injury_snapshot(previous) != _injury_snapshot(players)
+        if source == "trending":
+            trending = self.client.get_trending_players(
+                "nfl", trend_type="add", hours=self.trending_hours, limit=self.trending_limit
+            ) or []
+            changed = trending != self.trending
+            self.trending = trending
+            return changed
+        if source == "projections":
+            if self.projections is None or self.week is None:
+                return False
+            column = self.projections.week(self.week, current_week=self.week)
+            meta = self.projections.columns.week_meta(self.week) or {}
+            version = (self.week, meta.get("fetched_at"))
+            changed = version != self.proj_version
+            self.proj_version = version
+            self.proj_lookup = build_projection_lookup(column)
+            return changed
+        if source.startswith("rosters:"):
+            lid = source.split(":", 1)[1]
+            rosters = self.client.get_rosters(lid) or []
+            mine = next((r for r in rosters if self.user and r.get("owner_id") == self.user.get("user_id")), None)
+            previous = self.my_rosters.get(lid)
+            self.my_rosters[lid] = mine
+            self.rostered[lid] = rostered_player_ids(rosters)
+            return _roster_key(previous) != _roster_key(mine)
+        raise ValueError(f"Unknown watch source {source!r}")
+
+    def _poll_due(self, now: float) -> List[str]:
+        changed: List[str] = []
+        for source, interval in self._intervals().items():
+            if self._next_due.get(source, 0.0) > now:
+                continue
+            self._next_due[source] = now + interval
+            self.stats.polls[source] = self.stats.polls.get(source, 0) + 1
+            try:
+                if self._poll(source):
+                    changed.append(source)
+                    self.stats.changes[source] = self.stats.changes.get(source, 0) + 1
+            except Exception as exc:
+                # Keep the previous snapshot and try again soon
+                self.stats.poll_errors += 1
+                self._next_due[source] = now + min(interval, self.schedule.retry_sec)
+                self._error(f"poll {source}", exc)
+        return changed
+
+    def _error(self, what: str, exc: BaseException) -> None:
+        self.stats.last_error = f"{what}: {type(exc).__name__}: {exc}"
+        self.on_error(what, exc)
+
+    # Recomputation
+    def _recompute(self, kind: str, lid: str, fingerprint: Hashable, compute: Callable[[], Tuple[str, List[str]]]) -> None:
+        key = (kind, lid)
+        if self._fingerprints.get(key) == fingerprint:
+            self.stats.skipped += 1
+            return
+        self.stats.recomputes += 1
+        try:
+            title, lines = compute()
+        except Exception as exc:
+            # Fingerprint left unset so the next loop tries again
+            self.stats.compute_errors += 1
+            self._error(f"{kind} {lid}", exc)
+            return
+        self._fingerprints[key] = fingerprint
+        if self._sent.get(key) != lines:
+            self._sent[key] = lines
+            self.stats.notifications += 1
+            self.notify(title, lines)
+
+    def _league_lookup(self, lid: str) -> Any:
+        """
+        This week's projections scored with the league's settings, rescored once per
+        projections version.
+        """
+        scoring = compile_scoring(self.leagues[lid].get("scoring_settings"))
+        if scoring is None or self.projections is None or self.week is None:
+            return self.proj_lookup
+        cached = self._league_lookups.get(lid)
+        if cached is None or cached[0] != self.proj_version:
+            lookup = self.projections.scored(self.week, self.proj_lookup, scoring, self.players)
+            cached = self._league_lookups[lid] = (self.proj_version, lookup)
+        return cached[1]
+
+    def _lineup(self, lid: str, roster: Dict[str, Any]) -> Tuple[str, List[str]]:
+        league = self.leagues[lid]
+        starters, _ = optimize_lineup(
+            [str(pid) for pid in (roster.get("players") or [])],
+            league.get("roster_positions", []),
+            self.players,
+            proj_lookup=self._league_lookup(lid),
+        )
+        lines = [f"Slot {idx}: {format_player(self.players, pid) if pid else '[empty]'}" for idx, pid in starters.items()]
+        return f"Lineup update - {league.get('name')} week {self.week}", lines
+
+    def _waivers(self, lid: str, roster: Dict[str, Any]) -> Tuple[str, List[str]]:
+        league = self.leagues[lid]
+        needs = compute_roster_needs(
+            league.get("roster_positions", []), [str(pid) for pid in (roster.get("players") or [])], self.players
+        )
+        suggestions = suggest_trending_adds(self.trending, self.players, needs, rostered=self.rostered.get(lid))
+        # Trending counts move every poll; only the suggested players decide whether to notify
+        lines = [format_player(self.players, pid) for pid, _, _ in suggestions]
+        return f"Waiver update - {league.get('name')}", lines
+
+    def step(self) -> List[str]:
+        """
+        One loop iteration: polls whatever is due and recomputes what changed.
+        Returns the sources that changed.
+        """
+        start = time.perf_counter()
+        changed = self._poll_due(self.clock())
+
+        if self.players is not None:
+            for lid in self.league_ids:
+                roster = self.my_rosters.get(lid)
+                if not roster or lid not in self.leagues:
+                    continue
+                version = self.league_versions[lid]
+                pids = tuple(str(pid) for pid in (roster.get("players") or []))
+                health = _player_fields(self.players, pids)
+                self._recompute(
+                    "lineup",
+                    lid,
+                    (version, self.week, self.proj_version, pids, health),
+                    lambda: self._lineup(lid, roster),
+                )
+                trending_ids = tuple(str(row.get("player_id")) for row in self.trending)
+                rostered = self.rostered.get(lid, set())
+                taken = tuple(pid in rostered for pid in trending_ids)
+                self._recompute(
+                    "waivers",
+                    lid,
+                    (version, pids, health, trending_ids, taken, _player_fields(self.players, trending_ids)),
+                    lambda: self._waivers(lid, roster),
+                )
+
+        elapsed = time.perf_counter() - start
+        self.stats.loops += 1
+        self.stats.last_loop_sec = elapsed
+        self.stats.total_loop_sec += elapsed
+        self.stats.max_loop_sec = max(self.stats.max_loop_sec, elapsed)
+        return changed
+
+    def seconds_until_due(self) -> float:
+        if not self._next_due:
+            return 0.0
+        return max(0.0, min(self._next_due.values()) - self.clock())
+
+    def run(
+        self,
+        max_loops: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        on_loop: Optional[Callable[["Watcher"], None]] = None,
+    ) -> WatchStats:
+        while max_loops is None or self.stats.loops < max_loops:
+            wait = 0.0
+            try:
+                self.step()
+            except Exception as exc:
+                # A failed iteration still counts, so max_loops bounds a persistently failing run
+                self.stats.loops += 1
+                self.stats.loop_errors += 1
+                self._error("loop", exc)
+                wait = self.schedule.retry_sec
+            if on_loop is not None:
+                on_loop(self)
+            if max_loops is not None and self.stats.loops >= max_loops:
+                break
+            sleep(max(wait, self.seconds_until_due()))
+        return self.stats
+
+    def stats_dict(self) -> Dict[str, Any]:
+        return {**asdict(self.stats), "avg_loop_sec": self.stats.avg_loop_sec}
+
+
+def _roster_key(roster: Optional[Dict[str, Any]]) -> Hashable:
+    if roster is None:
+        return None
+    return (tuple(roster.get("players") or []), tuple(roster.get("starters") or []))
+
+
+def _player_fields(players: PlayerIndex, pids: Tuple[str, ...]) -> Tuple[Hashable, ...]:
+    return tuple(
+        (
+            players.injury_status(pid),
+            players.status(pid),
+            players.depth_chart_order(pid),
+            players.depth_chart_position(pid),
+        )
+        for pid in pids
+    )
+
+
+def _injury_snapshot(players: PlayerIndex) -> Dict[str, Tuple[Any, Any]]:
+    return {pid: (players.injury_status(pid), players.status(pid)) for pid in players.ids}
@@ -0,0 +1,91 @@
+import functools
+from urllib.error import HTTPError
+
+from ff_agent import projection_store, reports
+from ff_agent.player_index import PlayerIndex
+
+# L2 pays 0.5 a rushing yard, which makes the scrambling qb2 its best quarterback
+SETTINGS = {"L1": {"pass_yd": 0.04, "rush_yd": 0.1}, "L2": {"pass_yd": 0.04, "rush_yd": 0.5}}
+
+
+class FakeClient:
+    projections_url_variant = None
+
+    def __init__(self):
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def get_players_index(self, sport="nfl", refresh=False):
+        self._count("players")
+        return PlayerIndex.from_players(
+            {
+                "qb1": {"first_name": "A", "last_name": "One", "fantasy_positions": ["QB"], "team": "KC"},
+                "qb2": {"first_name": "B", "last_name": "Two", "fantasy_positions": ["QB"], "team": "BUF", "depth_chart_order": 1},
+                "qb3": {"first_name": "C", "last_name": "Three", "fantasy_positions": ["QB"], "team": "MIA"},
+            }
+        )
+
+    def get_state(self, sport="nfl"):
+        return {"week": 3, "season": "2025"}
+
+    def get_projections(self, season, week, season_type="regular", sport="nfl"):
+        self._count("projections")
+        return [
+            {"player_id": "qb1", "stats": {"pass_yd": 500.0, "pts_ppr": 20.0}},
+            {"player_id": "qb2", "stats": {"rush_yd": 50.0, "pts_ppr": 5.0}},
+            {"player_id": "qb3", "stats": {"pass_yd": 300.0, "pts_ppr": 12.0}},
+        ]
+
+    def get_trending_players(self, sport="nfl", trend_type="add", hours=24, limit=50):
+        self._count("trending")
+        return []
+
+    def get_user(self, username):
+        self._count(f"user:{username}")
+        if username == "ghost":
+            raise HTTPError("https://api.sleeper.app/v1/user/ghost", 404, "Not Found", {}, None)
+        return {"user_id": f"id-{username}"}
+
+    def get_league(self, league_id):
+        self._count(f"league:{league_id}")
+        return {"name": f"League {league_id}", "roster_positions": ["QB", "BN"], "scoring_settings": SETTINGS[league_id]}
+
+    def get_rosters(self, league_id):
+        self._count(f"rosters:{league_id}")
+        return [
+            {"roster_id": 1, "owner_id": "id-alice", "players": ["qb1", "qb2"]},
+            {"roster_id": 2, "owner_id": "id-bob", "players": ["qb3"]},
+        ]
+
+    def get_matchups(self, league_id, week):
+        self._count(f"matchups:{league_id}")
+        return [
+            {"roster_id": 1, "matchup_id": 1, "starters": ["qb1"]},
+            {"roster_id": 2, "matchup_id": 1, "starters": ["qb3"]},
+        ]
+
+
+def test_bulk_reports_fetch_shared_inputs_once(monkeypatch, tmp_path):
+    # The real fetch plan, with the projection store kept under tmp_path
+    monkeypatch.setattr(projection_store, "ProjectionStore", functools.partial(projection_store.ProjectionStore, root=tmp_path))
+    client = FakeClient()
+    pairs = [("alice", "L1"), ("bob", "L1"), ("alice", "L2"), ("ghost", "L1")]
+
+    results = reports.run_bulk_weekly_reports(client, pairs, 2025, concurrency=4)
+
+    assert [(r.username, r.league_id) for r in results] == pairs
+    assert client.calls["players"] == 1 and client.calls["trending"] == 1 and client.calls["projections"] == 1
+    assert client.calls["user:alice"] == 1 and client.calls["rosters:L1"] == 1 and client.calls["matchups:L1"] == 1
+    assert all(not r.error and r.lines for r in results[:3])
+    # The projection, not the depth chart, picks alice's starter
+    starters = results[0].lines[results[0].lines.index("Starters:") + 1]
+    assert "One" in starters and "Two" not in starters
+    # ...under each league's own scoring
+    starters = results[2].lines[results[2].lines.index("Starters:") + 1]
+    assert "Two" in starters and "One" not in starters
+    assert results[1].lines[1].startswith("Roster 2 vs roster 1: win ")
+    assert "proj 12.0" in results[1].lines[1] and "vs 20.0" in results[1].lines[1]
+    # A failing user only fails its own report
+    assert results[3].error.startswith("HTTPError") and not results[3].lines
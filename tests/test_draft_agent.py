@@ -0,0 +1,99 @@
+import argparse
+import random
+from urllib.error import URLError
+
+from ff_agent import cli
+from ff_agent.config import AgentConfig
+from ff_agent.draft_agent import DraftBoard, new_picks
+from ff_agent.waiver_agent import compute_roster_needs
+
+
+def test_board_matches_full_rerank_after_every_pick():
+    rng = random.Random(3)
+    positions = [["QB"], ["RB"], ["WR"], ["TE"], ["RB", "WR"], ["K"]]
+    players_index = {str(i): {"fantasy_positions": rng.choice(positions)} for i in range(300)}
+    proj_lookup = {pid: rng.uniform(0, 25) for pid in players_index}
+    roster_positions = ["QB", "RB", "RB", "WR", "WR", "TE", "FLEX", "K", "BN", "BN"]
+    board = DraftBoard(players_index, proj_lookup, roster_positions)
+
+    order = list(players_index)
+    rng.shuffle(order)
+    mine = []
+    for i, pid in enumerate(order[:120]):
+        is_mine = i % 12 == 0
+        board.apply_pick(pid, mine=is_mine)
+        if is_mine:
+            mine.append(pid)
+        taken = set(order[: i + 1])
+        for pos in ("QB", "RB", "WR", "TE", "K"):
+            expected = sorted(
+                (pid for pid in players_index if pid not in taken and pos in players_index[pid]["fantasy_positions"]),
+                key=lambda p: -proj_lookup[p],
+            )[:3]
+            assert [p for p, _ in board.best_available(pos, 3)] == expected
+    assert board.needs == compute_roster_needs(roster_positions, mine, players_index)
+    assert board.stats.picks == 120 and board.stats.my_picks == len(mine)
+    top = board.recommend(5)
+    assert all(c.player_id not in set(order[:120]) for c in top)
+
+
+def test_new_picks_are_ordered_and_skip_seen():
+    picks = [{"pick_no": 3, "player_id": "c"}, {"pick_no": 1, "player_id": "a"}, {"pick_no": 2, "player_id": "b"}]
+
+    assert [p["player_id"] for p in new_picks(picks, 1)] == ["b", "c"]
+
+
+class FlakyDraftClient:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get_draft(self, draft_id):
+        return {"settings": {"teams": 2, "rounds": 1}}
+
+    def get_draft_picks(self, draft_id):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def close(self):
+        pass
+
+
+def test_draft_assist_backs_off_on_poll_errors_and_keeps_the_board(monkeypatch, capsys):
+    client = FlakyDraftClient(
+        [
+            [{"pick_no": 1, "player_id": "a", "picked_by": "me"}],
+            URLError(TimeoutError("timed out")),
+            ValueError("Expecting value"),
+            [{"pick_no": 1, "player_id": "a", "picked_by": "me"}, {"pick_no": 2, "player_id": "b", "picked_by": "them"}],
+        ]
+    )
+
+    class Plan:
+        def run(self):
+            players = {pid: {"first_name": pid, "last_name": pid, "fantasy_positions": ["QB"]} for pid in "abc"}
+            return {
+                "user": {"user_id": "me"},
+                "players": players,
+                "projections": {"a": 3.0, "b": 2.0, "c": 1.0},
+                "league": {"roster_positions": ["QB"]},
+            }
+
+    sleeps = []
+    monkeypatch.setattr(cli, "load_config", lambda: AgentConfig(username="u", league_id="L1", season=2025))
+    monkeypatch.setattr(cli, "make_client", lambda cfg: client)
+    monkeypatch.setattr(cli, "build_fetch_plan", lambda *a, **kw: Plan())
+    monkeypatch.setattr(cli.time, "sleep", sleeps.append)
+    args = argparse.Namespace(
+        username=None, season=None, league_id=None, draft_id="D1", week="1", refresh_players=False,
+        top=3, once=False, poll_sec=3.0, max_backoff_sec=10.0,
+    )
+
+    cli.cmd_draft_assist(args)
+
+    captured = capsys.readouterr()
+    assert sleeps == [3.0, 6.0, 10.0]
+    assert "poll failed (URLError" in captured.err and "poll failed (ValueError" in captured.err
+    # The pick applied before the outage is kept; the board ends on the last pick
+    assert "pick 2/2" in captured.out and '"picks": 2' in captured.err
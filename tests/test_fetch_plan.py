@@ -0,0 +1,15 @@
+import threading
+
+from ff_agent.fetch_plan import FetchPlan
+
+
+def test_fetch_plan_runs_independent_tasks_concurrently_and_passes_dependencies():
+    barrier = threading.Barrier(2, timeout=2)
+    plan = FetchPlan(max_workers=4)
+    # Both tasks must be in flight at once to get past the barrier
+    plan.add("user", lambda: (barrier.wait(), {"user_id": "u1"})[1])
+    plan.add("rosters", lambda: (barrier.wait(), [{"owner_id": "u1", "roster_id": 3}])[1])
+    plan.add("mine", lambda user, rosters: next(r for r in rosters if r["owner_id"] == user["user_id"]), "user", "rosters")
+
+    assert plan.run()["mine"]["roster_id"] == 3
+    assert plan.timings["mine"][0] >= max(plan.timings["user"][1], plan.timings["rosters"][1])
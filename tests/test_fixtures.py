@@ -0,0 +1,56 @@
+from urllib.error import HTTPError
+
+import pytest
+
+from ff_agent.fixtures import FixtureArchive, ReplayServer
+from ff_agent.sleeper_client import SleeperClient
+
+
+def _archive():
+    archive = FixtureArchive()
+    archive.add_json("/v1/state/nfl", {"week": 4, "season": "2025"})
+    archive.add_json("/v1/players/nfl/trending/add?hours=24&limit=50", [{"player_id": "1", "count": 9}])
+    archive.add_json("/v1/league/L1", {"name": "x" * 2000})
+    return archive
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    with ReplayServer(_archive()) as source:
+        recorder = FixtureArchive()
+        client = SleeperClient(base_url=source.url, recorder=recorder)
+        assert client.get_state()["week"] == 4
+        assert client.get_trending_players(limit=50)[0]["count"] == 9
+        with pytest.raises(HTTPError):
+            client.get_league("missing")
+        client.close()
+    path = recorder.save(tmp_path / "fixtures.zip")
+
+    replayed = FixtureArchive.load(path)
+    assert len(replayed) == 3
+    with ReplayServer(replayed) as server:
+        client = SleeperClient(base_url=server.url, max_retries=0)
+        assert client.get_state() == {"week": 4, "season": "2025"}
+        assert client.get_trending_players(limit=50) == [{"player_id": "1", "count": 9}]
+        with pytest.raises(HTTPError) as exc:
+            client.get_league("missing")
+        assert exc.value.code == 404
+        client.close()
+
+
+def test_replay_server_injects_errors_and_throttles():
+    with ReplayServer(_archive(), error_rate=1.0) as server:
+        client = SleeperClient(base_url=server.url, max_retries=0)
+        with pytest.raises(HTTPError) as exc:
+            client.get_state()
+        assert exc.value.code == 503
+        client.close()
+
+    with ReplayServer(_archive(), rate_per_sec=50.0, burst=1) as server:
+        client = SleeperClient(base_url=server.url, max_retries=3, memo_ttls={})
+        for _ in range(3):
+            assert client.get_league("L1")["name"].startswith("x")
+        client.close()
+        stats = server.stats_dict()
+    assert stats["throttled"] >= 1
+    assert client.stats.retries == stats["throttled"]
+    assert client.stats.wire_bytes < client.stats.decoded_bytes  # served gzipped
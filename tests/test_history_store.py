@@ -0,0 +1,87 @@
+import argparse
+import functools
+
+from ff_agent import cli, history_store
+from ff_agent.config import AgentConfig
+from ff_agent.history_store import HistoryStore
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def get_transactions(self, league_id, week):
+        self.calls.append(("transactions", week))
+        return [
+            {
+                "transaction_id": f"t{week}",
+                "type": "free_agent",
+                "status": "complete",
+                "created": 1000 + week,
+                "roster_ids": [1],
+                "adds": {"p1": 1} if week % 2 else {"p2": 1},
+                "drops": {"p9": 1},
+            }
+        ]
+
+    def get_matchups(self, league_id, week):
+        self.calls.append(("matchups", week))
+        return [
+            {"roster_id": 1, "matchup_id": 1, "points": 100.0 + week, "starters": ["p1"], "players_points": {"p1": 20.0, "p9": 3.0}},
+            {"roster_id": 2, "matchup_id": 1, "points": 90.0 + week, "starters": ["p2"], "players_points": {"p2": 10.0}},
+        ]
+
+
+def test_sync_fetches_only_missing_or_open_weeks_and_answers_queries(tmp_path):
+    client = FakeClient()
+    with HistoryStore(tmp_path / "history.sqlite3") as store:
+        first = store.sync(client, "L1", range(1, 5), current_week=4)
+        assert len(first.fetched) == 8 and first.skipped == 0
+
+        client.calls.clear()
+        second = store.sync(client, "L1", range(1, 6), current_week=5)
+        # Weeks 1-3 were final; week 4 was still open and week 5 is new
+        assert sorted(client.calls) == [("matchups", 4), ("matchups", 5), ("transactions", 4), ("transactions", 5)]
+        assert second.skipped == 6
+
+        adds = store.player_transactions("p1", action="add")
+        assert [a["week"] for a in adds] == [1, 3, 5]
+        assert len(store.player_transactions("p9", action="drop", league_id="L1")) == 5
+        assert store.points_by_roster("L1")[1] == {w: 100.0 + w for w in range(1, 6)}
+        assert [(r["week"], r["starter"]) for r in store.player_points("p9")][:2] == [(1, 0), (2, 0)]
+
+    # Re-syncing an open week replaces its rows instead of duplicating them
+    with HistoryStore(tmp_path / "history.sqlite3") as store:
+        store.sync(client, "L1", [5], current_week=5)
+        assert len(store.player_transactions("p9")) == 5
+
+
+def test_weeks_of_a_past_season_are_final_whatever_the_current_week(tmp_path):
+    client = FakeClient()
+    with HistoryStore(tmp_path / "history.sqlite3") as store:
+        # Last season's league synced early in this season: week 3 of this season says nothing about it
+        store.sync(client, "L0", range(1, 18), current_week=3, season_over=True)
+        client.calls.clear()
+        again = store.sync(client, "L0", range(1, 18), current_week=4, season_over=True)
+        assert client.calls == [] and again.skipped == 34
+
+
+def test_sync_command_treats_an_earlier_seasons_league_as_final(tmp_path, monkeypatch):
+    class SyncClient(FakeClient):
+        def get_state(self, sport):
+            return {"season": "2025", "week": 3}
+
+        def get_league(self, league_id):
+            return {"league_id": league_id, "season": "2024", "settings": {"last_scored_leg": 17}}
+
+    client = SyncClient()
+    monkeypatch.setattr(cli, "load_config", lambda: AgentConfig(league_id="L0"))
+    monkeypatch.setattr(cli, "make_client", lambda cfg: client)
+    monkeypatch.setattr(history_store, "HistoryStore", functools.partial(HistoryStore, tmp_path / "history.sqlite3"))
+    args = argparse.Namespace(league_id=None, weeks=None, force=False)
+
+    cli.cmd_sync(args)
+    assert sorted({week for _, week in client.calls}) == list(range(1, 18))
+    client.calls.clear()
+    cli.cmd_sync(args)
+    assert client.calls == []
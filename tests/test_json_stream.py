@@ -0,0 +1,37 @@
+import io
+import json
+
+import pytest
+
+from ff_agent.json_stream import iter_json_object, iter_projected_records
+
+
+def test_iter_json_object_matches_json_loads_across_chunk_boundaries():
+    payload = {
+        "1": {"name": "Ünïcode ✓", "n": [1, 2.5, -3e2], "flag": True, "none": None},
+        "22": {"nested": {"a": "x\\\"y"}, "num": 1234567890},
+        "333": 42,
+        "4": "str",
+    }
+    raw = json.dumps(payload, ensure_ascii=False, indent=1).encode("utf-8")
+    for chunk_size in (1, 2, 3, 7, 64, 1 << 16):
+        assert dict(iter_json_object(io.BytesIO(raw), chunk_size=chunk_size)) == payload
+
+
+def test_iter_projected_records_keeps_only_requested_fields():
+    raw = b'{"1": {"a": 1, "b": 2, "c": 3}, "2": {"b": 5}}'
+    assert list(iter_projected_records(io.BytesIO(raw), ["a", "b"], chunk_size=4)) == [("1", {"a": 1, "b": 2}), ("2", {"b": 5})]
+
+
+def test_every_prefix_of_valid_json_reads_on_and_malformed_input_fails_early():
+    doc = '{"a": [1, 2.5e-3, -0.5, true, false, null, "x\\u00e9\\ud83d\\ude00\\"\\\\"], "b": {"c": -12E+4}, "d": NaN, "e": -Infinity}'
+    expected = json.loads(doc)
+    for chunk_size in (1, 2, 5):
+        assert dict(iter_json_object(io.BytesIO(doc.encode()), chunk_size=chunk_size)) == expected
+
+    for bad in (b'{"a": [1, 2 x', b'{"a": tx', b'{"a": "\\q', b'{"a" 1', b'{"a": 1 2'):
+        stream = io.BytesIO(bad + b" " * (1 << 20) + b"}")
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_object(stream, chunk_size=64))
+        # Raised from the first chunk rather than after buffering the whole megabyte
+        assert stream.tell() <= 128
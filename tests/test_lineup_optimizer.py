@@ -1,4 +1,14 @@
-from ff_agent.lineup_optimizer import optimize_lineup
+import argparse
+import functools
+import json
+import random
+
+import pytest
+
+from ff_agent import cli, projection_store
+from ff_agent.config import AgentConfig
+from ff_agent.lineup_optimizer import NON_STARTING_SLOTS, SLOT_ELIGIBILITY, optimize_lineup
+from ff_agent.player_index import PlayerIndex
 
 
 def test_optimize_lineup_picks_healthy_bench_over_injured_starter():
@@ -11,4 +21,127 @@ def test_optimize_lineup_picks_healthy_bench_over_injured_starter():
 
     starters, bench = optimize_lineup(roster_player_ids, roster_positions, players_index, projections=None)
 
-    assert starters["0"] == "2"  # healthy QB2 should be chosen
\ No newline at end of file
+    assert starters["0"] == "2"  # healthy QB2 should be chosen
+
+
+def test_flex_listed_first_does_not_steal_the_only_rb():
+    players_index = {
+        "rb": {"fantasy_positions": ["RB"]},
+        "wr1": {"fantasy_positions": ["WR"]},
+        "wr2": {"fantasy_positions": ["WR"]},
+    }
+    projections = [{"player_id": "rb", "pts_ppr": 20.0}, {"player_id": "wr1", "pts_ppr": 15.0}, {"player_id": "wr2", "pts_ppr": 5.0}]
+
+    starters, bench = optimize_lineup(["rb", "wr1", "wr2"], ["FLEX", "RB", "WR", "BN"], players_index, projections)
+
+    assert starters == {"0": "wr2", "1": "rb", "2": "wr1"}
+    assert bench == []
+
+
+def _brute_force_best(candidates, roster_positions):
+    slots = [s for s in roster_positions if s not in NON_STARTING_SLOTS]
+    best = (0, 0.0)
+
+    def rec(i, used, filled, total):
+        nonlocal best
+        if i == len(slots):
+            best = max(best, (filled, round(total, 6)))
+            return
+        rec(i + 1, used, filled, total)
+        allowed = SLOT_ELIGIBILITY.get(slots[i], {slots[i]})
+        for pid, (positions, score) in candidates.items():
+            if pid not in used and any(p in allowed for p in positions):
+                rec(i + 1, used | {pid}, filled + 1, total + score)
+
+    rec(0, frozenset(), 0, 0.0)
+    return best
+
+
+def test_optimize_lineup_matches_brute_force_on_small_rosters():
+    rng = random.Random(11)
+    position_pool = [("QB",), ("RB",), ("WR",), ("TE",), ("K",), ("RB", "WR"), ("WR", "TE"), ("DL",), ("LB", "DB")]
+    slot_pool = ["QB", "RB", "WR", "TE", "K", "FLEX", "SUPER_FLEX", "REC_FLEX", "WRRB_FLEX", "IDP_FLEX", "DL", "BN"]
+    for _ in range(300):
+        roster_positions = [rng.choice(slot_pool) for _ in range(rng.randint(1, 5))]
+        candidates = {
+            str(i): (rng.choice(position_pool), rng.choice([-100.0, 0.0]) + rng.uniform(0, 30))
+            for i in range(rng.randint(1, 7))
+        }
+        players_index = {pid: {"fantasy_positions": list(pos)} for pid, (pos, _) in candidates.items()}
+        projections = [{"player_id": pid, "pts_ppr": score} for pid, (_, score) in candidates.items()]
+
+        starters, bench = optimize_lineup(list(candidates), roster_positions, players_index, projections)
+
+        chosen = [pid for pid in starters.values() if pid]
+        assert len(chosen) == len(set(chosen))
+        for idx, pid in starters.items():
+            if pid:
+                slot = roster_positions[int(idx)]
+                assert set(candidates[pid][0]) & set(SLOT_ELIGIBILITY.get(slot, {slot}))
+        got = (len(chosen), round(sum(candidates[pid][1] for pid in chosen), 6))
+        assert got == _brute_force_best(candidates, roster_positions)
+        assert len(bench) + len(chosen) == len(candidates)
+
+
+class FakeLeagueClient:
+    positions = {"L1": ["QB", "RB", "WR", "FLEX", "BN"], "L2": ["QB", "SUPER_FLEX", "RB", "BN"]}
+    # L2 pays double for passing yards: its quarterbacks project higher
+    settings = {"L1": {"pass_yd": 0.04, "rec_yd": 0.1}, "L2": {"pass_yd": 0.08, "rec_yd": 0.1}}
+    projections_url_variant = None
+
+    def __init__(self):
+        rng = random.Random(5)
+        self.players = {
+            str(i): {"fantasy_positions": [rng.choice(["QB", "RB", "WR", "TE"])], "team": "KC"} for i in range(60)
+        }
+        self.projections = {pid: round(rng.uniform(0, 25), 2) for pid in self.players}
+        self.rosters = {
+            lid: [{"roster_id": r, "owner_id": f"o{r}", "players": rng.sample(sorted(self.players), 8)} for r in range(1, 7)]
+            for lid in self.positions
+        }
+
+    def is_qb(self, pid):
+        return self.players[pid]["fantasy_positions"] == ["QB"]
+
+    def scored(self, league_id):
+        double = league_id == "L2"
+        return {pid: pts * (2 if double and self.is_qb(pid) else 1) for pid, pts in self.projections.items()}
+
+    def get_state(self, sport="nfl"):
+        return {"week": 3, "season": "2025"}
+
+    def get_projections(self, season, week, season_type="regular", sport="nfl"):
+        rows = []
+        for pid, pts in self.projections.items():
+            yards = {"pass_yd": pts * 25} if self.is_qb(pid) else {"rec_yd": pts * 10}
+            rows.append({"player_id": pid, "stats": {"pts_ppr": pts, **yards}})
+        return rows
+
+    def get_players_index(self, sport="nfl", refresh=False):
+        return PlayerIndex.from_players(self.players)
+
+    def get_league(self, league_id):
+        return {"roster_positions": self.positions[league_id], "scoring_settings": self.settings[league_id]}
+
+    def get_rosters(self, league_id):
+        return self.rosters[league_id]
+
+
+def test_league_lineups_scores_each_league_and_pool_matches_serial_optimizer(monkeypatch, tmp_path, capsys):
+    client = FakeLeagueClient()
+    monkeypatch.setattr(cli, "load_config", lambda: AgentConfig(season=2025))
+    monkeypatch.setattr(cli, "make_client", lambda cfg: client)
+    # The real fetch plan, with the projection store kept under tmp_path
+    monkeypatch.setattr(projection_store, "ProjectionStore", functools.partial(projection_store.ProjectionStore, root=tmp_path))
+    args = argparse.Namespace(season=None, league_id=["L1", "L2", "L1"], week="3", processes=2, refresh_players=False)
+
+    cli.cmd_league_lineups(args)
+
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(r["league_id"], r["roster_id"]) for r in rows] == [(lid, r) for lid in ("L1", "L2") for r in range(1, 7)]
+    for row in rows:
+        lid = row["league_id"]
+        roster = client.rosters[lid][row["roster_id"] - 1]
+        starters, _ = optimize_lineup(roster["players"], client.positions[lid], client.players, proj_lookup=client.scored(lid))
+        assert row["starters"] == starters
+        assert row["scores"] == pytest.approx({pid: client.scored(lid)[pid] for pid in starters.values() if pid}, rel=1e-5)
@@ -0,0 +1,109 @@
+import argparse
+import functools
+import math
+from statistics import NormalDist
+
+from ff_agent import cli, projection_store
+from ff_agent.config import AgentConfig
+from ff_agent.matchup_sim import TeamProjection, pair_matchups, simulate_matchups, simulate_week, team_projection
+
+
+def test_win_probability_matches_normal_model():
+    a = TeamProjection(1, [], 110.0, 20.0)
+    b = TeamProjection(2, [], 100.0, 25.0)
+    (result,) = simulate_matchups([(1, a, b)], sims=200_000, seed=3)
+    expected = 1.0 - NormalDist().cdf((b.mean - a.mean) / math.hypot(a.sd, b.sd))
+    assert abs(result.win_prob_a - expected) < 0.005
+    assert abs(result.percentiles_a[50] - 110.0) < 0.1
+    assert abs(result.percentiles_b[90] - (100.0 + 25.0 * NormalDist().inv_cdf(0.9))) < 0.3
+
+
+def test_starters_are_drawn_one_by_one_and_floored_at_zero():
+    players_index = {"k1": {"fantasy_positions": ["K"]}, "qb1": {"fantasy_positions": ["QB"]}}
+    kicker = team_projection(1, ["k1"], players_index, {"k1": 1.0})  # sd floors at MIN_PLAYER_SD
+    nobody = team_projection(2, [], players_index, {})
+    assert kicker.components == [(1.0, 2.0)]
+
+    (result,) = simulate_matchups([(1, kicker, nobody)], sims=100_000, seed=1)
+    p_zero = NormalDist().cdf(-0.5)  # a draw below zero scores 0 and ties the empty lineup
+    assert abs(result.win_prob_a - (1.0 - p_zero + 0.5 * p_zero)) < 0.01
+    assert result.percentiles_a[5] == result.percentiles_a[25] == 0.0
+    assert result.percentiles_a[95] > 1.0 + 1.6 * 2.0 - 0.2
+
+
+def test_results_do_not_depend_on_process_count():
+    pairs = [(1, TeamProjection(1, [], 95.0, 18.0), TeamProjection(2, [], 101.0, 22.0))]
+    one = simulate_matchups(pairs, sims=50_000, seed=9, processes=1, chunk_size=20_000)
+    two = simulate_matchups(pairs, sims=50_000, seed=9, processes=2, chunk_size=20_000)
+    assert one[0].win_prob_a == two[0].win_prob_a
+    assert one[0].margin_percentiles == two[0].margin_percentiles
+
+
+def test_simulate_week_pairs_matchups_and_uses_starters():
+    players_index = {
+        "qb1": {"fantasy_positions": ["QB"]},
+        "qb2": {"fantasy_positions": ["QB"]},
+        "rb1": {"fantasy_positions": ["RB"]},
+    }
+    proj_lookup = {"qb1": 30.0, "qb2": 10.0, "rb1": 12.0}
+    matchups = [
+        {"roster_id": 2, "matchup_id": 1, "starters": ["qb2"], "players": ["qb2"]},
+        {"roster_id": 1, "matchup_id": 1, "starters": [], "players": ["qb1", "rb1"]},
+        {"roster_id": 3, "matchup_id": None, "starters": ["rb1"], "players": ["rb1"]},
+    ]
+    pairs, byes = pair_matchups(matchups)
+    assert [(mid, a["roster_id"], b["roster_id"]) for mid, a, b in pairs] == [(1, 1, 2)]
+    assert [e["roster_id"] for e in byes] == [3]
+
+    week = simulate_week(matchups, players_index, proj_lookup, roster_positions=["QB"], sims=20_000)
+    result = week.for_roster(2)
+    assert result.team_a.starters == ["qb1"]  # no starters set: optimal lineup
+    assert result.team_b.mean == 10.0
+    assert result.win_prob_a > 0.9
+
+
+class LeagueScoringClient:
+    """
+    One matchup of two quarterbacks in a league that pays 0.1 a passing yard, 2.5 times
+    the standard rate.
+    """
+
+    projections_url_variant = None
+
+    def get_state(self, sport="nfl"):
+        return {"week": 13, "season": "2025"}
+
+    def get_league(self, league_id):
+        return {
+            "name": "Big Passing",
+            "roster_positions": ["QB"],
+            "scoring_settings": {"pass_yd": 0.1},
+            "settings": {"playoff_week_start": 15, "playoff_teams": 2},
+        }
+
+    def get_players_index(self, sport="nfl", refresh=False):
+        return {"qb1": {"fantasy_positions": ["QB"]}, "qb2": {"fantasy_positions": ["QB"]}}
+
+    def get_projections(self, season, week, season_type="regular", sport="nfl"):
+        return [
+            {"player_id": "qb1", "stats": {"pass_yd": 200.0, "pts_ppr": 8.0}},
+            {"player_id": "qb2", "stats": {"pass_yd": 150.0, "pts_ppr": 6.0}},
+        ]
+
+    def get_rosters(self, league_id):
+        return [{"roster_id": i, "players": [f"qb{i}"], "settings": {"wins": 6, "losses": 6}} for i in (1, 2)]
+
+    def get_matchups(self, league_id, week):
+        return [{"roster_id": i, "matchup_id": 1, "starters": [f"qb{i}"]} for i in (1, 2)]
+
+
+def test_simulate_matchup_uses_league_scoring(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(cli, "load_config", lambda: AgentConfig(season=2025, league_id="L1"))
+    monkeypatch.setattr(cli, "make_client", lambda cfg: LeagueScoringClient())
+    monkeypatch.setattr(projection_store, "ProjectionStore", functools.partial(projection_store.ProjectionStore, root=tmp_path))
+    args = argparse.Namespace(season=None, league_id=None, week="auto", sims=2_000, seed=1, processes=1, refresh_players=False)
+
+    cli.cmd_simulate_matchup(args)
+
+    out = capsys.readouterr().out
+    assert "proj 20.0" in out and "vs 15.0" in out
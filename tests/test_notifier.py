@@ -0,0 +1,181 @@
+import http.client
+import json
+import threading
+from urllib.error import HTTPError, URLError
+
+from ff_agent.notifier import SlackDispatcher
+
+
+def test_dispatcher_coalesces_messages_per_webhook(tmp_path):
+    posts = []
+    started, release = threading.Event(), threading.Event()
+
+    def post(url, text, timeout):
+        posts.append((url, text))
+        started.set()
+        release.wait(5)
+
+    dispatcher = SlackDispatcher(outbox_path=tmp_path / "outbox.json", post=post)
+    dispatcher.submit("https://hook/a", "first", ["x"])
+    assert started.wait(5)
+    # Queued while the first POST is in flight: sent together afterwards
+    dispatcher.submit("https://hook/a", "second", ["y"])
+    dispatcher.submit("https://hook/a", "third", ["z"])
+    release.set()
+    stats = dispatcher.close(deadline_sec=5)
+
+    assert len(posts) == 2
+    assert posts[1][1] == "*second*\n• y\n\n*third*\n• z"
+    assert stats.delivered == 3 and stats.posts == 2 and stats.failed == 0
+
+
+def test_dispatcher_retries_transient_errors_and_gives_up_on_permanent_ones(tmp_path):
+    calls = []
+
+    def post(url, text, timeout):
+        calls.append(url)
+        if url.endswith("bad"):
+            raise HTTPError(url, 404, "Not Found", {}, None)
+        if len(calls) == 1:
+            raise HTTPError(url, 503, "Unavailable", {}, None)
+
+    dispatcher = SlackDispatcher(outbox_path=tmp_path / "outbox.json", backoff_sec=0.01, post=post)
+    dispatcher.submit("https://hook/ok", "retry me", [])
+    assert dispatcher.flush(5)
+    dispatcher.submit("https://hook/bad", "lost", [])
+    stats = dispatcher.close(deadline_sec=5)
+
+    assert calls == ["https://hook/ok", "https://hook/ok", "https://hook/bad"]
+    assert stats.delivered == 1 and stats.retries == 1 and stats.failed == 1
+
+
+def test_undelivered_messages_are_persisted_for_the_next_run(tmp_path):
+    outbox = tmp_path / "outbox.json"
+
+    def down(url, text, timeout):
+        raise URLError(ConnectionRefusedError(111, "Connection refused"))
+
+    first = SlackDispatcher(outbox_path=outbox, backoff_sec=10, post=down)
+    first.submit("https://hook/a", "pending", ["line"])
+    stats = first.close(deadline_sec=1)
+    assert stats.persisted == 1 and stats.delivered == 0 and outbox.exists()
+
+    sent = []
+    second = SlackDispatcher(outbox_path=outbox, post=lambda url, text, timeout: sent.append(text))
+    stats = second.close(deadline_sec=5)
+    assert sent == ["*pending*\n• line"]
+    assert stats.restored == 1 and stats.delivered == 1 and not outbox.exists()
+
+
+def test_malformed_webhook_urls_are_not_retried(tmp_path):
+    calls = []
+
+    def post(url, text, timeout):
+        calls.append(url)
+        if url.startswith("htps:"):
+            raise URLError("unknown url type: htps")
+        raise ValueError(f"unknown url type: {url!r}")
+
+    dispatcher = SlackDispatcher(outbox_path=tmp_path / "outbox.json", backoff_sec=0.01, post=post)
+    dispatcher.submit("htps://hook/typo", "scheme", [])
+    dispatcher.submit("hooks.slack.com/x", "no scheme", [])
+    stats = dispatcher.close(deadline_sec=5)
+
+    assert calls == ["htps://hook/typo", "hooks.slack.com/x"]
+    assert stats.failed == 2 and stats.retries == 0 and stats.persisted == 0
+
+
+def test_malformed_outbox_rows_are_skipped(tmp_path):
+    outbox = tmp_path / "outbox.json"
+    good = {"webhook_url": "https://hook/a", "title": "kept", "lines": ["x"], "queued_at": 1.0}
+    outbox.write_text(json.dumps([good, {"title": "no url"}, "junk", {**good, "queued_at": "soon"}, {**good, "lines": 3}]))
+
+    sent = []
+    dispatcher = SlackDispatcher(outbox_path=outbox, post=lambda url, text, timeout: sent.append(text))
+    stats = dispatcher.close(deadline_sec=5)
+
+    assert sent == ["*kept*\n• x"]
+    assert stats.restored == 1 and stats.skipped == 4 and not outbox.exists()
+
+
+def test_broken_responses_are_retried_and_unexpected_errors_counted(tmp_path):
+    calls = []
+
+    def post(url, text, timeout):
+        calls.append(url)
+        if url.endswith("cut") and calls.count(url) == 1:
+            raise http.client.IncompleteRead(b"ok", 10)
+        if url.endswith("odd"):
+            raise RuntimeError("surprise")
+
+    dispatcher = SlackDispatcher(outbox_path=tmp_path / "outbox.json", backoff_sec=0.01, post=post)
+    dispatcher.submit("https://hook/cut", "retried", [])
+    assert dispatcher.flush(5)
+    dispatcher.submit("https://hook/odd", "given up", [])
+    assert dispatcher.flush(5)
+    # The worker survived both
+    dispatcher.submit("https://hook/cut", "after", [])
+    stats = dispatcher.close(deadline_sec=5)
+
+    assert calls == ["https://hook/cut", "https://hook/cut", "https://hook/odd", "https://hook/cut"]
+    assert stats.delivered == 2 and stats.retries == 1 and stats.failed == 1 and stats.persisted == 0
+
+
+def test_batches_in_flight_at_the_deadline_are_persisted(tmp_path):
+    outbox = tmp_path / "outbox.json"
+    started, release = threading.Event(), threading.Event()
+    outcome = []
+
+    def post(url, text, timeout):
+        started.set()
+        release.wait(5)
+        if outcome:
+            raise outcome[0]
+
+    # The post fails after close: the saved copy stays for the next run
+    outcome.append(URLError(TimeoutError("timed out")))
+    dispatcher = SlackDispatcher(outbox_path=outbox, backoff_sec=10, post=post)
+    dispatcher.submit("https://hook/a", "slow", ["x"])
+    assert started.wait(5)
+    stats = dispatcher.close(deadline_sec=0.05)
+    assert stats.persisted == 1 and [r["title"] for r in json.loads(outbox.read_text())] == ["slow"]
+    release.set()
+    dispatcher._threads[0].join(5)
+    assert [r["title"] for r in json.loads(outbox.read_text())] == ["slow"]
+
+    # The post succeeds after close: it is taken out of the outbox again
+    started.clear(), release.clear(), outcome.clear()
+    outbox.unlink()
+    dispatcher = SlackDispatcher(outbox_path=outbox, post=post)
+    dispatcher.submit("https://hook/a", "late", ["y"])
+    assert started.wait(5)
+    stats = dispatcher.close(deadline_sec=0.05)
+    assert stats.persisted == 1 and outbox.exists()
+    release.set()
+    dispatcher._threads[0].join(5)
+    assert not outbox.exists() and stats.persisted == 0 and stats.delivered == 1
+
+
+def test_outbox_is_claimed_by_one_dispatcher_and_merged_on_save(tmp_path):
+    outbox = tmp_path / "outbox.json"
+    row = {"webhook_url": "https://hook/a", "title": "waiting", "lines": [], "queued_at": 1.0}
+    outbox.write_text(json.dumps([row]))
+    release = threading.Event()
+    sent = []
+
+    def post(url, text, timeout):
+        release.wait(5)
+        sent.append(text)
+
+    first = SlackDispatcher(outbox_path=outbox, post=post)
+    second = SlackDispatcher(outbox_path=outbox, post=post)
+    assert first.stats.restored == 1 and second.stats.restored == 0 and not outbox.exists()
+
+    # Rows saved by another process meanwhile survive this one's save
+    outbox.write_text(json.dumps([{**row, "title": "other"}]))
+    second.submit("https://hook/b", "mine", [])
+    second.close(deadline_sec=0.05)
+    assert sorted(r["title"] for r in json.loads(outbox.read_text())) == ["mine", "other"]
+    release.set()
+    first.close(deadline_sec=5)
+    assert sent.count("*waiting*\n") == 1
@@ -0,0 +1,38 @@
+from ff_agent.player_index import PlayerIndex, as_player_index, format_player
+
+
+def test_player_index_matches_dict_accessors():
+    players = {
+        "1": {"first_name": "A", "last_name": "QB", "fantasy_positions": ["QB"], "team": "KC", "depth_chart_order": 1},
+        "2": {"first_name": "B", "last_name": "RB", "position": "RB", "injury_status": "Out"},
+        "3": {"first_name": "C", "last_name": "X", "fantasy_positions": ["RB", "WR"], "status": "IR"},
+    }
+    index = PlayerIndex.from_players(players)
+    view = as_player_index(players)
+
+    for pid in ["1", "2", "3", "missing"]:
+        for accessor in ("positions", "primary_position", "name", "team", "depth_chart_order", "is_injured"):
+            assert getattr(index, accessor)(pid) == getattr(view, accessor)(pid), (pid, accessor)
+    assert index.positions("3") is index.positions_at(index.ordinal("3"))
+    assert format_player(index, "1") == "A QB (QB KC)"
+    assert format_player(index, "missing") == "missing (- -)"
+
+
+def test_snapshot_round_trip(tmp_path):
+    index = PlayerIndex.from_players(
+        {
+            "1": {"first_name": "A", "last_name": "One", "fantasy_positions": ["RB", "WR"], "team": "KC", "injury_status": "Out"},
+            "2": {"first_name": "B", "last_name": "Two", "position": "K", "depth_chart_order": 2, "depth_chart_position": "K"},
+        }
+    )
+    path = tmp_path / "players.bin"
+    index.save_snapshot(path, source="v1")
+
+    assert PlayerIndex.load_snapshot(path, source="v2") is None
+    loaded = PlayerIndex.load_snapshot(path, source="v1")
+    assert loaded.ids == ["1", "2"]
+    assert loaded.positions("1") == ("RB", "WR") and loaded.is_injured("1") and loaded.team("2") is None
+    assert loaded.depth_chart_order("2") == 2 and loaded.depth_chart_position("2") == "K" and loaded.name("2") == "B Two"
+    loaded.add("3", {"fantasy_positions": ["RB"], "team": "KC"})
+    assert loaded.team("3") == "KC" and loaded.primary_position("3") == "RB" and len(loaded) == 3
+    assert PlayerIndex.load_snapshot(tmp_path / "missing.bin") is None
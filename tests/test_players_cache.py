@@ -0,0 +1,73 @@
+import io
+from urllib.error import HTTPError
+
+from ff_agent.sleeper_client import SleeperClient
+from ff_agent.utils import DiskCache
+
+
+class FakeResponse(io.BytesIO):
+    def __init__(self, body, headers=None):
+        super().__init__(body)
+        self.headers = headers or {}
+
+
+class FakeClient(SleeperClient):
+    def __init__(self, cache, responses, **kwargs):
+        super().__init__(cache=cache, **kwargs)
+        self.responses = list(responses)
+        self.requests = []
+
+    def _open(self, url, params=None, headers=None):
+        self.requests.append(dict(headers or {}))
+        status, body, resp_headers = self.responses.pop(0)
+        if status == 304:
+            raise HTTPError(url, 304, "Not Modified", hdrs=resp_headers, fp=None)
+        return FakeResponse(body, resp_headers)
+
+
+def test_players_cache_serves_within_ttl_and_revalidates_after(tmp_path):
+    cache = DiskCache(tmp_path)
+    body = b'{"1": {"position": "QB"}}'
+    client = FakeClient(cache, [(200, body, {"ETag": '"v1"'}), (304, b"", {})], players_ttl_sec=60)
+
+    assert client.get_all_players() == {"1": {"position": "QB"}}
+    assert client.get_all_players() == {"1": {"position": "QB"}}
+    assert len(client.requests) == 1
+    assert cache.stats.hits == 1
+
+    client.players_ttl_sec = 0
+    assert client.get_all_players() == {"1": {"position": "QB"}}
+    assert client.requests[-1] == {"If-None-Match": '"v1"'}
+    assert cache.entry("players_nfl").revalidations == 1
+
+
+def test_players_index_is_streamed_and_cached_in_projected_form(tmp_path):
+    cache = DiskCache(tmp_path)
+    body = b'{"1": {"first_name": "A", "last_name": "B", "fantasy_positions": ["QB"], "college": "X"}, "2": {"position": "K"}}'
+    client = FakeClient(cache, [(200, body, {})])
+
+    index = client.get_players_index()
+    assert index.primary_position("1") == "QB" and index.primary_position("2") == "K"
+    assert cache.load("player_records_nfl")["1"] == {"first_name": "A", "last_name": "B", "fantasy_positions": ["QB"]}
+
+
+def test_players_index_snapshot_is_used_within_ttl_and_rebuilt_after_refetch(tmp_path):
+    cache = DiskCache(tmp_path)
+    v1 = b'{"1": {"first_name": "A", "last_name": "B", "fantasy_positions": ["QB"], "team": "KC", "depth_chart_order": 1}}'
+    v2 = b'{"1": {"first_name": "A", "last_name": "B", "fantasy_positions": ["QB"], "team": "BUF"}}'
+    client = FakeClient(cache, [(200, v1, {}), (200, v2, {})], players_ttl_sec=60)
+
+    first = client.get_players_index()
+    snapshot = cache.sidecar_path("player_records_nfl", "index")
+    assert snapshot.exists()
+    cache.store("player_records_nfl", cache.load("player_records_nfl"))  # same records, new payload version
+    second = client.get_players_index()  # snapshot no longer matches: rebuilt from the cached JSON
+    third = client.get_players_index()  # from the rewritten snapshot
+    assert len(client.requests) == 1
+    assert [i.team("1") for i in (first, second, third)] == ["KC", "KC", "KC"]
+    assert third.depth_chart_order("1") == 1 and third.positions("1") == ("QB",) and third.name("1") == "A B"
+
+    assert client.get_players_index(refresh=True).team("1") == "BUF"
+    assert client.get_players_index().team("1") == "BUF"
+    cache.remove("player_records_nfl")
+    assert not snapshot.exists()
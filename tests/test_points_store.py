@@ -0,0 +1,55 @@
+import statistics
+
+from ff_agent.lineup_optimizer import optimize_lineup
+from ff_agent.points_store import PointsStore, column_key
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+        self.leagues = {
+            "L25": {"league_id": "L25", "season": "2025", "previous_league_id": "L24", "settings": {"last_scored_leg": 4}},
+            "L24": {"league_id": "L24", "season": "2024", "previous_league_id": None, "settings": {"last_scored_leg": 4}},
+        }
+
+    def get_league(self, league_id):
+        return self.leagues.get(league_id)
+
+    def get_matchups(self, league_id, week):
+        self.calls.append((league_id, week))
+        base = 10.0 if league_id == "L24" else 20.0
+        return [
+            {"roster_id": 1, "players_points": {"qb": base + week, "rb": 5.0}},
+            {"roster_id": 2, "players_points": {"wr": 8.0} if week % 2 else {}},
+        ]
+
+
+def test_backfill_follows_previous_seasons_and_skips_final_weeks(tmp_path):
+    client = FakeClient()
+    store = PointsStore("L25", root=tmp_path)
+
+    first = store.backfill(client, seasons=2, current=(2025, 3))
+    assert first.league_ids == ["L25", "L24"]
+    assert sorted(first.fetched) == [(2024, 1), (2024, 2), (2024, 3), (2024, 4), (2025, 1), (2025, 2)]
+
+    client.calls.clear()
+    second = PointsStore("L25", root=tmp_path).backfill(client, seasons=2, current=(2025, 4))
+    assert client.calls == [("L25", 3)] and second.skipped == 6
+    assert store.keys()[0] == column_key(2024, 1)
+
+    summaries = PointsStore("L25", root=tmp_path).aggregates(recent=2)
+    qb = [11.0, 12.0, 13.0, 14.0, 21.0, 22.0, 23.0]
+    assert summaries["qb"].games == 7
+    assert abs(summaries["qb"].mean - statistics.mean(qb)) < 1e-4
+    assert abs(summaries["qb"].stdev - statistics.pstdev(qb)) < 1e-4
+    assert abs(summaries["qb"].recent_mean - 22.5) < 1e-4
+    assert summaries["wr"].games == 4 and summaries["rb"].trend == 0
+
+
+def test_optimize_lineup_scores_unprojected_players_from_history():
+    players_index = {"a": {"fantasy_positions": ["RB"]}, "b": {"fantasy_positions": ["RB"]}}
+
+    starters, bench = optimize_lineup(["a", "b"], ["RB", "BN"], players_index, proj_lookup={}, history={"b": 12.0})
+
+    assert list(starters.values()) == ["b"]
+    assert bench[0].player_id == "a" and bench[0].reason == "heuristic"
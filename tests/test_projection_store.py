@@ -0,0 +1,68 @@
+import threading
+
+from ff_agent.column_store import WeekColumnStore
+from ff_agent.lineup_optimizer import build_projection_lookup
+from ff_agent.projection_store import ProjectionStore
+from ff_agent.sleeper_client import SleeperClient
+
+
+class FakeClient(SleeperClient):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def get_projections(self, season, week, season_type="regular", sport="nfl"):
+        self.calls.append(week)
+        self.projections_url_variant = 1
+        if week == 4:
+            return None
+        return [{"player_id": str(100 + week), "pts_ppr": float(week)}, {"player_id": "7", "pts_half_ppr": 1.5}]
+
+
+def test_projection_store_prefetches_and_serves_final_weeks_from_disk(tmp_path):
+    client = FakeClient()
+    store = ProjectionStore(client, 2025, root=tmp_path)
+    assert sorted(store.prefetch(range(1, 5), current_week=3)) == [1, 2, 3, 4]
+
+    week2 = store.week(2, current_week=3)
+    assert dict(week2) == {"102": 2.0, "7": 1.5}
+    assert build_projection_lookup(week2) is week2
+    assert store.week(4, current_week=3) is None
+
+    # A fresh store over the same directory: past weeks are final, week 3 still fresh within the TTL
+    reopened = ProjectionStore(FakeClient(), 2025, root=tmp_path)
+    assert reopened.prefetch(range(1, 5), current_week=3) == []
+    assert reopened.client.projections_url_variant == 1
+    # Once week 3 is in the past it is fetched one last time
+    assert reopened.prefetch(range(1, 5), current_week=4) == [3]
+
+
+def test_column_stores_sharing_a_directory_keep_each_others_ids_and_weeks(tmp_path):
+    a = WeekColumnStore(tmp_path)
+    b = WeekColumnStore(tmp_path)  # opened before a wrote anything
+    a.write_week(1, {"x": 1.0, "y": 2.0}, {"n": 1})
+    b.write_week(2, {"z": 3.0, "x": 4.0}, {"n": 2})
+    a.write_week(3, {"w": 5.0}, {"n": 3})
+    b.update_meta(url_variant=1)
+
+    for store in (a, b, WeekColumnStore(tmp_path)):
+        assert dict(store.column(1)) == {"x": 1.0, "y": 2.0}
+        assert dict(store.column(2)) == {"z": 3.0, "x": 4.0}
+        assert dict(store.column(3)) == {"w": 5.0}
+        assert store.weeks() == [1, 2, 3]
+        assert store.meta["url_variant"] == 1
+
+    # Many instances writing at once: every week maps its values to its own players
+    def writer(week):
+        store = WeekColumnStore(tmp_path / "race")
+        store.write_week(week, {f"p{week}-{i}": float(week * 100 + i) for i in range(50)}, {"n": week})
+
+    threads = [threading.Thread(target=writer, args=(week,)) for week in range(1, 13)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store = WeekColumnStore(tmp_path / "race")
+    assert store.weeks() == list(range(1, 13))
+    for week in range(1, 13):
+        assert dict(store.column(week)) == {f"p{week}-{i}": float(week * 100 + i) for i in range(50)}
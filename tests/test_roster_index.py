@@ -0,0 +1,113 @@
+import argparse
+
+from ff_agent import cli, roster_index
+from ff_agent.config import AgentConfig
+from ff_agent.player_index import PlayerIndex
+from ff_agent.roster_index import RosterIndex
+
+
+def test_index_follows_roster_diffs():
+    index = RosterIndex()
+    index.update_league("L1", [
+        {"roster_id": 1, "owner_id": "u1", "players": ["a", "b"], "starters": ["a"]},
+        {"roster_id": 2, "owner_id": "u2", "players": ["c"], "starters": [], "reserve": ["d"]},
+    ])
+    index.update_league("L2", [{"roster_id": 1, "owner_id": "u1", "players": ["a"], "starters": []}])
+    assert {(r.league_id, r.starter) for r in index.lookup("a")} == {("L1", True), ("L2", False)}
+    assert [r.roster_id for r in index.lookup("d")] == [2]
+
+    # Same payload again touches nothing; a bench swap and a drop touch only those entries
+    assert index.update_league("L2", [{"roster_id": 1, "owner_id": "u1", "players": ["a"], "starters": []}]) == 0
+    touched = index.update_league("L1", [
+        {"roster_id": 1, "owner_id": "u1", "players": ["a", "b"], "starters": ["b"]},
+        {"roster_id": 2, "owner_id": "u2", "players": ["c"], "starters": []},
+    ])
+    assert touched == 3
+    assert [r.starter for r in index.lookup("b")] == [True]
+    assert index.lookup("d") == []
+
+    index.remove_league("L2")
+    assert [r.league_id for r in index.lookup("a")] == ["L1"] and index.roster_count == 2
+
+
+def test_injury_alerts_fan_out_to_affected_rosters():
+    before = PlayerIndex.from_players({
+        "a": {"injury_status": None}, "b": {"injury_status": "Questionable"}, "c": {"injury_status": "Out"}, "x": {}
+    })
+    after = PlayerIndex.from_players({
+        "b": {"injury_status": "Out"}, "a": {"injury_status": "Questionable"}, "c": {}, "x": {}, "n": {"injury_status": "IR"}
+    })
+    assert sorted(after.injury_changes(before)) == [
+        ("a", None, "Questionable"), ("b", "Questionable", "Out"), ("c", "Out", None), ("n", None, "IR")
+    ]
+    assert PlayerIndex.from_players({"a": {"injury_status": "Out"}}).injury_changes(
+        PlayerIndex.from_players({"a": {"injury_status": "Out"}})
+    ) == []
+
+    index = RosterIndex()
+    index.update_league("L1", [
+        {"roster_id": 1, "owner_id": "me", "players": ["a", "b"], "starters": ["b"]},
+        {"roster_id": 2, "owner_id": "other", "players": ["c", "x"], "starters": ["c"]},
+    ])
+    scan = index.injury_alerts(before, after, owner_id="me")
+    assert scan.changed_players == 4
+    assert [(a.player_id, a.after, a.rosters[0].starter) for a in scan.alerts] == [("b", "Out", True), ("a", "Questionable", False)]
+    assert [a.player_id for a in index.injury_alerts(before, after).alerts] == ["b", "c", "a"]
+
+
+def test_saved_index_resumes_from_its_fingerprints(tmp_path):
+    rosters = [{"roster_id": 1, "owner_id": "u1", "players": ["a", "b"], "starters": ["a"]}]
+    index = RosterIndex()
+    index.update_league("L1", rosters)
+    index.save(tmp_path / "index.pickle")
+
+    loaded = RosterIndex.load(tmp_path / "index.pickle")
+    assert loaded.league_ids == ["L1"] and [r.starter for r in loaded.lookup("a")] == [True]
+    assert loaded.update_league("L1", rosters) == 0
+    assert RosterIndex.load(tmp_path / "missing.pickle") is None
+    (tmp_path / "junk.pickle").write_bytes(b"not a pickle")
+    assert RosterIndex.load(tmp_path / "junk.pickle") is None
+
+
+class InjuryClient:
+    players_ttl_sec = 12 * 3600.0
+
+    def __init__(self):
+        self.roster_calls = []
+
+    def get_user(self, username):
+        return {"user_id": "me"}
+
+    def get_user_leagues(self, user_id, season):
+        return [{"league_id": "L1"}, {"league_id": "L2"}]
+
+    def get_players_index(self, sport="nfl", refresh=False):
+        return PlayerIndex.from_players({"a": {"injury_status": "Out"}, "b": {}})
+
+    def get_rosters(self, league_id):
+        self.roster_calls.append(league_id)
+        return [{"roster_id": 1, "owner_id": "me", "players": ["a", "b"], "starters": ["a"]}]
+
+
+def test_injury_alerts_dedupes_leagues_and_reuses_the_saved_index(monkeypatch, tmp_path, capsys):
+    client = InjuryClient()
+    PlayerIndex.from_players({"a": {}, "b": {}}).save_snapshot(tmp_path / "baseline.bin")
+    monkeypatch.setattr(cli, "load_config", lambda: AgentConfig(username="u", season=2025))
+    monkeypatch.setattr(cli, "make_client", lambda cfg: client)
+    monkeypatch.setattr(roster_index, "DEFAULT_BASELINE_PATH", tmp_path / "baseline.bin")
+    monkeypatch.setattr(roster_index, "DEFAULT_ROSTER_INDEX_PATH", tmp_path / "rosters.pickle")
+    args = argparse.Namespace(
+        league_id=["L1"], username=None, season=None, all_leagues=True, all_rosters=False,
+        previous=None, current=None, refresh_players=False, players_max_age_min=10.0,
+    )
+
+    cli.cmd_injury_alerts(args)
+    first = capsys.readouterr()
+    assert sorted(client.roster_calls) == ["L1", "L2"]
+    assert client.players_ttl_sec == 600.0
+    assert "Healthy -> Out" in first.out and "(4 roster entries changed)" in first.err
+
+    cli.cmd_injury_alerts(args)
+    second = capsys.readouterr()
+    assert "(0 roster entries changed)" in second.err
+    assert "Healthy -> Out" not in second.out
@@ -0,0 +1,105 @@
+import math
+
+from ff_agent.lineup_optimizer import optimize_lineup
+from ff_agent.projection_store import ProjectionStore
+from ff_agent.scoring import band_share, compile_scoring
+from ff_agent.sleeper_client import SleeperClient
+
+ROWS = [
+    {"player_id": "qb", "stats": {"pass_yd": 250.0, "pass_td": 2.0, "pass_int": 1.0, "pts_ppr": 17.0}},
+    {"player_id": "te", "stats": {"rec": 6.0, "rec_yd": 60.0, "pts_ppr": 12.0}},
+    {"player_id": "wr", "stats": {"rec": 5.0, "rec_yd": 75.0, "pts_ppr": 12.5}},
+]
+PLAYERS = {"qb": {"fantasy_positions": ["QB"]}, "te": {"fantasy_positions": ["TE"]}, "wr": {"fantasy_positions": ["WR"]}}
+SETTINGS = {"pass_yd": 0.04, "pass_td": 6, "pass_int": -2, "rec": 1, "rec_yd": 0.1, "bonus_rec_te": 0.5, "fum": 0}
+
+
+class FakeClient(SleeperClient):
+    def get_projections(self, season, week, season_type="regular", sport="nfl"):
+        return ROWS
+
+
+def test_league_settings_score_raw_stats_with_position_bonuses():
+    scoring = compile_scoring(SETTINGS)
+    assert compile_scoring(dict(SETTINGS)) is scoring and compile_scoring({}) is None
+
+    points = scoring.score_rows(ROWS, PLAYERS)
+    assert points == {"qb": 20.0, "te": 15.0, "wr": 12.5}
+
+
+def test_stored_stats_matrix_feeds_the_lineup(tmp_path):
+    store = ProjectionStore(FakeClient(), 2025, root=tmp_path)
+    column = store.week(1, current_week=1)
+    assert dict(column) == {"qb": 17.0, "te": 12.0, "wr": 12.5}
+
+    scored = store.scored(1, column, compile_scoring(SETTINGS), PLAYERS)
+    assert {pid: round(pts, 3) for pid, pts in scored.items()} == {"qb": 20.0, "te": 15.0, "wr": 12.5}
+    assert store.scored(1, column, None, PLAYERS) is column
+
+    # With TE premium the tight end wins the flex spot that standard PPR gives the receiver
+    flex = ["FLEX", "BN"]
+    assert list(optimize_lineup(["te", "wr"], flex, PLAYERS, projections=column)[0].values()) == ["wr"]
+    assert list(optimize_lineup(["te", "wr"], flex, PLAYERS, projections=scored)[0].values()) == ["te"]
+
+
+def test_threshold_bonuses_count_their_expected_value(tmp_path):
+    settings = {**SETTINGS, "bonus_rec_yd_100": 3, "bonus_pass_yd_300": 2, "bonus_rush_rec_yd_100": 1}
+    scoring = compile_scoring(settings)
+    assert sorted(scoring.bands) == [
+        (("pass_yd",), 300.0, math.inf, 2.0), (("rec_yd",), 100.0, math.inf, 3.0), (("rush_yd", "rec_yd"), 100.0, math.inf, 1.0)
+    ]
+
+    # Projected exactly at the line: half the bonus
+    assert scoring.score({"rec_yd": 100.0}) == 10.0 + 1.5 + 0.5
+
+    def over(line, mean):
+        return 0.5 * math.erfc((line - mean) / (0.4 * mean * math.sqrt(2)))
+
+    points = scoring.score_rows(ROWS, PLAYERS)
+    expected = {"qb": 20.0 + 2 * over(300, 250), "te": 15.0 + 4 * over(100, 60), "wr": 12.5 + 4 * over(100, 75)}
+    assert {pid: round(pts, 9) for pid, pts in points.items()} == {pid: round(pts, 9) for pid, pts in expected.items()}
+
+    store = ProjectionStore(FakeClient(), 2025, root=tmp_path)
+    scored = store.scored(1, store.week(1, current_week=1), scoring, PLAYERS)
+    assert {pid: round(pts, 4) for pid, pts in scored.items()} == {pid: round(pts, 4) for pid, pts in points.items()}
+
+
+DEF_SETTINGS = {
+    "sack": 1, "int": 2, "pts_allow_0": 10, "pts_allow_1_6": 7, "pts_allow_7_13": 4, "pts_allow_14_20": 1,
+    "pts_allow_21_27": 0, "pts_allow_28_34": -1, "pts_allow_35p": -4, "yds_allow_0_100": 5, "yds_allow_100_199": 3,
+    "yds_allow_200_299": 2, "yds_allow_300_349": 0, "yds_allow_350_399": -1, "yds_allow_400_449": -3,
+}
+
+
+def test_defense_points_and_yards_allowed_tiers(tmp_path):
+    scoring = compile_scoring(DEF_SETTINGS)
+    assert "pts_allow_1_6" not in scoring.weights and scoring.bands == ()
+    assert ((("pts_allow",), 1.0, 7.0, 7.0)) in scoring.position_bands["DEF"]
+    assert ((("pts_allow",), 35.0, math.inf, -4.0)) in scoring.position_bands["DEF"]
+
+    def tiers(mean, bands):
+        return sum(points * band_share(mean, low, high) for low, high, points in bands)
+
+    pts_tiers = [(0, 1, 10), (1, 7, 7), (7, 14, 4), (14, 21, 1), (28, 35, -1), (35, math.inf, -4)]
+    yds_tiers = [(0, 101, 5), (100, 200, 3), (200, 300, 2), (350, 400, -1), (400, 450, -3)]
+    expected = 3 + 2 + tiers(6, pts_tiers) + tiers(250, yds_tiers)
+    assert expected > 5 + 3
+
+    rows = [
+        {"player_id": "SF", "stats": {"pts_allow": 6, "yds_allow": 250, "sack": 3, "int": 1, "pts_ppr": 12}},
+        {"player_id": "wr", "stats": {"rec": 5.0, "pts_ppr": 12.5}},
+    ]
+    players = {"SF": {"fantasy_positions": ["DEF"]}, "wr": {"fantasy_positions": ["WR"]}}
+    points = scoring.score_rows(rows, players)
+    assert round(points["SF"], 9) == round(expected, 9)
+    # No defense stats, no tier points, even for a position the bands would cover
+    assert points["wr"] == 0.0
+    assert scoring.score({"pts_allow": 6, "yds_allow": 250, "sack": 3, "int": 1}, "DEF") == points["SF"]
+
+    class DefenseClient(FakeClient):
+        def get_projections(self, season, week, season_type="regular", sport="nfl"):
+            return rows
+
+    store = ProjectionStore(DefenseClient(), 2025, root=tmp_path)
+    scored = store.scored(1, store.week(1, current_week=1), scoring, players)
+    assert round(scored["SF"], 4) == round(expected, 4) and scored["wr"] == 0.0
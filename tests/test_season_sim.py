@@ -0,0 +1,122 @@
+import argparse
+import functools
+
+from ff_agent import cli, projection_store, season_sim
+from ff_agent.config import AgentConfig
+from ff_agent.season_sim import attach_model, build_season_model, playoff_format, share_model, simulate_season
+
+
+def _league():
+    players_index = {f"qb{i}": {"fantasy_positions": ["QB"]} for i in range(1, 5)}
+    rosters = [
+        {"roster_id": i, "players": [f"qb{i}"], "settings": {"wins": w, "losses": 3 - w, "fpts": 300 + i}}
+        for i, w in zip(range(1, 5), (3, 2, 1, 0))
+    ]
+    weekly_matchups = {
+        week: [
+            {"roster_id": 1, "matchup_id": 1},
+            {"roster_id": 2 if week == 4 else 4, "matchup_id": 1},
+            {"roster_id": 3, "matchup_id": 2},
+            {"roster_id": 4 if week == 4 else 2, "matchup_id": 2},
+        ]
+        for week in (4, 5)
+    }
+    weekly_projections = {week: {"qb1": 20.0, "qb2": 20.0, "qb3": 20.0, "qb4": 20.0} for week in (4, 5)}
+    return build_season_model(rosters, weekly_matchups, weekly_projections, players_index, ["QB"])
+
+
+def test_playoff_format_counts_byes():
+    assert playoff_format({"settings": {"playoff_week_start": 15, "playoff_teams": 6}}) == (15, 6, 2)
+    assert playoff_format({"settings": {"playoff_teams": 4}}) == (15, 4, 0)
+
+
+def test_playoff_odds_reflect_standings_and_do_not_depend_on_processes():
+    model = _league()
+    assert list(model.opponent[:4]) == [1, 0, 3, 2]
+
+    one = simulate_season(model, playoff_teams=2, byes=1, sims=4000, seed=1, chunk_size=1000)
+    two = simulate_season(model, playoff_teams=2, byes=1, sims=4000, seed=1, processes=2, chunk_size=1000)
+    assert [(t.roster_id, t.playoff_prob, t.seed_probs) for t in one.teams] == [
+        (t.roster_id, t.playoff_prob, t.seed_probs) for t in two.teams
+    ]
+
+    odds = {t.roster_id: t for t in one.teams}
+    assert [t.roster_id for t in one.teams] == [1, 2, 3, 4]  # evenly matched: standings decide
+    assert odds[1].playoff_prob > 0.9 and odds[4].playoff_prob < 0.1
+    assert abs(sum(t.playoff_prob for t in one.teams) - 2.0) < 1e-9
+    assert abs(sum(t.bye_prob for t in one.teams) - 1.0) < 1e-9
+    assert abs(odds[1].projected_wins - 4.0) < 0.1
+
+
+def test_model_arrays_round_trip_through_shared_memory():
+    model = _league()
+    block, spec = share_model(model)
+    try:
+        attached, shared = attach_model(spec)
+        assert shared.roster_ids == model.roster_ids and shared.weeks == model.weeks
+        for name in ("opponent", "mean", "sd", "wins", "points"):
+            assert list(getattr(shared, name)) == list(getattr(model, name))
+        on_shared = simulate_season(shared, playoff_teams=2, sims=500, seed=2)
+        assert on_shared.teams == simulate_season(model, playoff_teams=2, sims=500, seed=2).teams
+        for name in ("opponent", "mean", "sd", "wins", "points"):
+            getattr(shared, name).release()
+        attached.close()
+    finally:
+        block.close()
+        block.unlink()
+
+
+class LeagueScoringClient:
+    """
+    One matchup of two quarterbacks in a league that pays 0.1 a passing yard, 2.5 times
+    the standard rate.
+    """
+
+    projections_url_variant = None
+
+    def get_state(self, sport="nfl"):
+        return {"week": 13, "season": "2025"}
+
+    def get_league(self, league_id):
+        return {
+            "name": "Big Passing",
+            "roster_positions": ["QB"],
+            "scoring_settings": {"pass_yd": 0.1},
+            "settings": {"playoff_week_start": 15, "playoff_teams": 2},
+        }
+
+    def get_players_index(self, sport="nfl", refresh=False):
+        return {"qb1": {"fantasy_positions": ["QB"]}, "qb2": {"fantasy_positions": ["QB"]}}
+
+    def get_projections(self, season, week, season_type="regular", sport="nfl"):
+        return [
+            {"player_id": "qb1", "stats": {"pass_yd": 200.0, "pts_ppr": 8.0}},
+            {"player_id": "qb2", "stats": {"pass_yd": 150.0, "pts_ppr": 6.0}},
+        ]
+
+    def get_rosters(self, league_id):
+        return [{"roster_id": i, "players": [f"qb{i}"], "settings": {"wins": 6, "losses": 6}} for i in (1, 2)]
+
+    def get_matchups(self, league_id, week):
+        return [{"roster_id": i, "matchup_id": 1, "starters": [f"qb{i}"]} for i in (1, 2)]
+
+
+def test_playoff_odds_project_with_league_scoring(monkeypatch, tmp_path, capsys):
+    weekly_projections = []
+
+    def build(rosters, matchups, projections, players, roster_positions):
+        weekly_projections.append(projections)
+        return build_season_model(rosters, matchups, projections, players, roster_positions)
+
+    monkeypatch.setattr(season_sim, "build_season_model", build)
+    monkeypatch.setattr(cli, "load_config", lambda: AgentConfig(season=2025, league_id="L1"))
+    monkeypatch.setattr(cli, "make_client", lambda cfg: LeagueScoringClient())
+    monkeypatch.setattr(projection_store, "ProjectionStore", functools.partial(projection_store.ProjectionStore, root=tmp_path))
+    args = argparse.Namespace(season=None, league_id=None, sims=500, seed=1, processes=1, refresh_players=False)
+
+    cli.cmd_playoff_odds(args)
+
+    (projections,) = weekly_projections
+    assert sorted(projections) == [13, 14]
+    assert {pid: round(pts, 3) for pid, pts in projections[13].items()} == {"qb1": 20.0, "qb2": 15.0}
+    assert "2 weeks left" in capsys.readouterr().out
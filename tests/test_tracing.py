@@ -0,0 +1,42 @@
+import threading
+
+from ff_agent import tracing
+from ff_agent.fetch_plan import FetchPlan
+
+
+@tracing.traced("work")
+def work(x):
+    return x * 2
+
+
+def test_disabled_tracing_is_a_passthrough():
+    assert tracing.TRACER is None
+    assert work(2) == 4
+    with tracing.span("anything", n=1) as span:
+        span.set(more=2)
+    tracing.record_request("/x", 200, 0.1, 10, 20, 0, False)
+
+
+def test_spans_nest_across_fetch_plan_threads_and_group_repeats():
+    tracer = tracing.start("run")
+    try:
+        with tracing.span("fetch"):
+            plan = FetchPlan(max_workers=4)
+            plan.add("a", lambda: tracing.record_request("/v1/a", 200, 0.01, 100, 300, 1, False) or 1)
+            plan.add("b", lambda a: [work(i) for i in range(3)], "a")
+            plan.run()
+        thread = threading.Thread(target=work, args=(1,))
+        thread.start()
+        thread.join()
+    finally:
+        assert tracing.stop() is tracer
+    assert tracing.TRACER is None
+
+    tree = tracer.to_dict()
+    fetch, background = tree["children"]
+    assert fetch["name"] == "fetch" and background["name"] == "work"  # other threads attach to the root
+    task_a, task_b = fetch["children"]
+    request = task_a["children"][0]
+    assert request["name"] == "GET /v1/a" and request["attrs"]["wire_bytes"] == 100 and request["attrs"]["retries"] == 1
+    assert task_b["children"] == [{**task_b["children"][0], "name": "work", "calls": 3}]
+    assert tree["requests"]["count"] == 1 and tree["requests"]["decoded_bytes"] == 300
@@ -0,0 +1,53 @@
+import random
+
+from ff_agent.trade_agent import build_team_indexes, evaluate_trades
+
+
+def _full_value(pids, roster_positions, players_index, proj_lookup):
+    teams = build_team_indexes({0: pids}, roster_positions, players_index, proj_lookup)
+    return teams[0].value
+
+
+def test_incremental_trade_value_matches_full_reoptimization():
+    rng = random.Random(5)
+    positions = [["QB"], ["RB"], ["WR"], ["TE"], ["RB", "WR"], ["K"]]
+    players_index = {str(i): {"fantasy_positions": rng.choice(positions)} for i in range(60)}
+    proj_lookup = {pid: rng.uniform(0, 25) for pid in players_index}
+    roster_positions = ["QB", "RB", "RB", "WR", "WR", "TE", "FLEX", "SUPER_FLEX", "K", "BN", "BN"]
+    rosters = {rid: [str(i) for i in range(rid * 15, rid * 15 + 15)] for rid in range(4)}
+    teams = build_team_indexes(rosters, roster_positions, players_index, proj_lookup)
+
+    for _ in range(300):
+        a, b = rng.sample(list(rosters), 2)
+        gives = rng.sample(rosters[a], rng.choice([1, 2]))
+        gets = rng.sample(rosters[b], 1)
+        receive = [pc for pc in teams[b].ranked if pc.player_id in gets]
+        expected = _full_value([p for p in rosters[a] if p not in gives] + gets, roster_positions, players_index, proj_lookup)
+        assert abs(teams[a].value_after(gives, receive) - expected) < 1e-9
+
+
+def test_evaluate_trades_returns_mutually_beneficial_swaps():
+    players_index = {
+        "qb1": {"fantasy_positions": ["QB"]},
+        "qb2": {"fantasy_positions": ["QB"]},
+        "rb1": {"fantasy_positions": ["RB"]},
+        "rb2": {"fantasy_positions": ["RB"]},
+    }
+    proj_lookup = {"qb1": 20.0, "qb2": 18.0, "rb1": 15.0, "rb2": 12.0}
+    # Team 1 has two QBs and no RB; team 2 the reverse
+    teams = build_team_indexes({1: ["qb1", "qb2"], 2: ["rb1", "rb2"]}, ["QB", "RB"], players_index, proj_lookup)
+
+    result = evaluate_trades(teams, two_for_one=False)
+
+    assert [(t.gives, t.receives) for t in result.candidates][0] == (("qb2",), ("rb1",))
+    assert result.evaluated == 4
+
+
+def test_value_after_ignores_given_players_without_a_position():
+    players_index = {"qb1": {"fantasy_positions": ["QB"]}, "rb1": {"fantasy_positions": ["RB"]}, "coach": {}}
+    proj_lookup = {"qb1": 20.0, "rb1": 15.0}
+    teams = build_team_indexes({1: ["qb1", "coach"], 2: ["rb1"]}, ["QB", "RB"], players_index, proj_lookup)
+
+    assert "coach" not in teams[1].rank_of
+    assert teams[1].value_after(["coach"], teams[2].ranked) == 35.0
+    assert teams[1].value_after(["coach", "qb1"], []) == 0.0
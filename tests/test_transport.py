@@ -0,0 +1,54 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ff_agent.sleeper_client import SleeperClient
+
+
+def _serve(handler_cls):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_transport_reuses_connections_gunzips_and_honors_retry_after():
+    calls = {"throttled": 0}
+    state = {"week": 3, "season_type": "regular" * 50}
+    payload = json.dumps(state).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path.startswith("/v1/league/") and calls["throttled"] == 0:
+                calls["throttled"] += 1
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = gzip.compress(payload) if "gzip" in (self.headers.get("Accept-Encoding") or "") else payload
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = _serve(Handler)
+    client = SleeperClient(base_url=f"http://127.0.0.1:{server.server_address[1]}", memo_ttls={})
+    try:
+        assert client.get_state() == state
+        assert client.get_state() == state
+        assert client.get_league("L1") == state
+    finally:
+        client.close()
+        server.shutdown()
+
+    assert client.stats.connections_opened == 1
+    assert client.stats.requests == 4  # includes the 429
+    assert client.timings[-1].retries == 1
+    assert client.timings[0].wire_bytes < client.timings[0].decoded_bytes
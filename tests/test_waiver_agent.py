@@ -0,0 +1,40 @@
+import random
+
+from ff_agent.trade_agent import build_team_indexes
+from ff_agent.waiver_agent import rank_free_agents, rostered_player_ids, suggest_trending_adds
+
+
+def test_free_agent_gain_matches_full_reoptimization():
+    rng = random.Random(11)
+    positions = [["QB"], ["RB"], ["WR"], ["TE"], ["RB", "WR"], ["K"]]
+    players_index = {str(i): {"fantasy_positions": rng.choice(positions)} for i in range(200)}
+    proj_lookup = {pid: rng.uniform(0, 25) for pid in players_index}
+    roster_positions = ["QB", "RB", "RB", "WR", "WR", "TE", "FLEX", "K", "BN", "BN", "BN"]
+    rosters = [
+        {"roster_id": rid, "players": [str(i) for i in range(rid * 11, rid * 11 + 11)], "reserve": [str(150 + rid)]}
+        for rid in range(4)
+    ]
+    rostered = rostered_player_ids(rosters)
+    mine = rosters[0]["players"]
+
+    search = rank_free_agents(mine, roster_positions, rostered, players_index, proj_lookup, num_teams=4, limit=None)
+
+    assert search.pool_size == len(players_index) - len(rostered)
+    assert not rostered & {fa.player_id for fa in search.candidates}
+    base = build_team_indexes({0: mine}, roster_positions, players_index, proj_lookup)[0].value
+    for fa in search.candidates:
+        after = [pid for pid in mine if pid != fa.drop] + [fa.player_id]
+        expected = build_team_indexes({0: after}, roster_positions, players_index, proj_lookup)[0].value - base
+        assert abs(fa.gain - expected) < 1e-9
+        assert abs(fa.vor - (fa.score - search.replacement[fa.position])) < 1e-9
+    gains = [fa.gain for fa in search.candidates]
+    assert gains == sorted(gains, reverse=True) and gains[0] > 0
+
+
+def test_trending_adds_skip_rostered_players():
+    players_index = {"1": {"fantasy_positions": ["RB"]}, "2": {"fantasy_positions": ["RB"]}}
+    trending = [{"player_id": "1", "count": 90}, {"player_id": "2", "count": 40}]
+
+    suggestions = suggest_trending_adds(trending, players_index, {"RB": 1}, rostered={"1"})
+
+    assert suggestions == [("2", "RB", 40)]
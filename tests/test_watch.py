@@ -0,0 +1,120 @@
+from ff_agent.player_index import PlayerIndex
+from ff_agent.watch import WatchSchedule, Watcher
+
+
+class FakeClient:
+    def __init__(self):
+        self.players = {
+            "qb1": {"first_name": "A", "last_name": "One", "fantasy_positions": ["QB"], "team": "KC"},
+            "qb2": {"first_name": "B", "last_name": "Two", "fantasy_positions": ["QB"], "team": "BUF", "depth_chart_order": 1},
+            "rb1": {"first_name": "C", "last_name": "Three", "fantasy_positions": ["RB"], "team": "SF"},
+        }
+        self.roster_players = ["qb1", "qb2"]
+        self.calls = {}
+        self.failing = set()
+        self.league = {"name": "Test", "roster_positions": ["QB", "BN"]}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if name in self.failing:
+            raise OSError(f"{name} unavailable")
+
+    def get_user(self, username):
+        self._count("user")
+        return {"user_id": "u1"}
+
+    def get_league(self, league_id):
+        self._count("league")
+        return dict(self.league)
+
+    def get_state(self, sport="nfl"):
+        self._count("state")
+        return {"week": 3, "season": "2025"}
+
+    def get_rosters(self, league_id):
+        self._count("rosters")
+        return [{"roster_id": 1, "owner_id": "u1", "players": list(self.roster_players)}]
+
+    def get_trending_players(self, sport="nfl", trend_type="add", hours=24, limit=50):
+        self._count("trending")
+        return [{"player_id": "rb1", "count": 10 * self.calls["trending"]}]
+
+    def get_players_index(self, sport="nfl", refresh=False):
+        self._count("players")
+        return PlayerIndex.from_players(self.players)
+
+
+def test_watcher_recomputes_and_notifies_only_on_changes():
+    client = FakeClient()
+    now = [0.0]
+    sent = []
+    schedule = WatchSchedule(state_sec=100, rosters_sec=10, trending_sec=10, players_sec=10, projections_sec=100)
+    watcher = Watcher(client, "me", ["L1"], schedule, notify=lambda title, lines: sent.append((title, lines)), clock=lambda: now[0])
+
+    watcher.step()
+    assert [title for title, _ in sent] == ["Lineup update - Test week 3", "Waiver update - Test"]
+    assert sent[0][1] == ["Slot 0: B Two (QB BUF)"]
+
+    # Nothing relevant changed (trending counts move, the suggested players do not)
+    now[0] = 10.0
+    watcher.step()
+    assert len(sent) == 2
+    assert watcher.stats.recomputes == 2 and watcher.stats.skipped == 2
+    assert watcher.stats.polls["trending"] == 2 and watcher.stats.polls["state"] == 1
+
+    # The starter gets hurt: the lineup is recomputed and a new recommendation goes out
+    client.players["qb2"]["injury_status"] = "Out"
+    now[0] = 20.0
+    watcher.step()
+    assert sent[-1] == ("Lineup update - Test week 3", ["Slot 0: A One (QB KC)"])
+    assert watcher.stats.notifications == 3  # waivers were re-run but came out the same
+    assert watcher.stats.changes["players"] == 2
+    assert watcher.stats.loops == 3 and watcher.stats.max_loop_sec > 0
+
+
+def test_watcher_retries_failed_user_and_league_fetches_and_refreshes_settings():
+    client = FakeClient()
+    client.failing = {"user", "league"}
+    now = [0.0]
+    sent = []
+    errors = []
+    schedule = WatchSchedule(
+        state_sec=100, rosters_sec=100, trending_sec=100, players_sec=100, projections_sec=100, leagues_sec=50, retry_sec=5
+    )
+    watcher = Watcher(
+        client,
+        "me",
+        ["L1"],
+        schedule,
+        notify=lambda title, lines: sent.append((title, lines)),
+        clock=lambda: now[0],
+        on_error=lambda what, exc: errors.append(what),
+    )
+
+    watcher.run(max_loops=1, sleep=lambda sec: None)  # network down on the first loop: no crash
+    assert errors == ["poll user", "poll league:L1"] and sent == []
+    assert watcher.seconds_until_due() == 5.0
+
+    client.failing = set()
+    now[0] = 5.0
+    watcher.step()
+    assert client.calls["user"] == 2 and client.calls["league"] == 2
+    assert [title for title, _ in sent] == ["Lineup update - Test week 3", "Waiver update - Test"]
+
+    # League settings are refreshed on their schedule; a change re-runs the lineup
+    client.league = {"name": "Superflex", "roster_positions": ["QB", "QB"]}
+    now[0] = 55.0
+    watcher.step()
+    assert watcher.league_versions["L1"] == 2
+    assert sent[-1] == ("Lineup update - Superflex week 3", ["Slot 0: B Two (QB BUF)", "Slot 1: A One (QB KC)"])
+
+    # A recompute that raises is reported and retried, not fatal
+    client.league = {"name": "Broken", "roster_positions": None}
+    now[0] = 105.0
+    watcher.run(max_loops=watcher.stats.loops + 1, sleep=lambda sec: None)
+    assert errors[-2:] == ["lineup L1", "waivers L1"] and watcher.stats.compute_errors == 2
+    assert watcher.stats.last_error.startswith("waivers L1: TypeError")
+    client.league = {"name": "Fixed", "roster_positions": ["QB", "BN"]}
+    now[0] = 155.0
+    watcher.step()
+    assert sent[-1] == ("Lineup update - Fixed week 3", ["Slot 0: B Two (QB BUF)"])